@@ -0,0 +1,108 @@
+"""Provisioning overrides: bundle import vs. saving them one by one.
+
+N system entries and an override for each are generated, exported to a
+bundle and imported into an empty user directory: the manifest is
+streamed, every file hashed, the overrides written in one batch and
+mimeinfo.cache refreshed once. Importing again must find everything
+unchanged. The baseline writes each override on its own followed by a
+cache refresh, as one save per file in the editor does. The imported
+files must match the originals byte for byte; with --max-import-ms the
+script exits 1 if the import took longer.
+
+Usage: python benchmarks/bench_bundle.py [--entries N] [--max-import-ms MS]
+"""
+import argparse
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate  # noqa: E402
+from dotdesktop.bulk import commit  # noqa: E402
+from dotdesktop.bundle import export_bundle, plan_import  # noqa: E402
+from dotdesktop.mimeinfo import update_cache  # noqa: E402
+from dotdesktop.writer import write_atomic  # noqa: E402
+
+
+def import_bundle(data, user_dir, system_dirs):
+    """Plan, commit and refresh; returns ``(written, unchanged, ms)``."""
+    start = time.perf_counter()
+    files, unchanged, _ = plan_import(io.BytesIO(data), user_dir, system_dirs)
+    if files:
+        commit(files, (), user_dir)
+        update_cache(user_dir, files)
+    return len(files), unchanged, (time.perf_counter() - start) * 1000
+
+
+def read_all(directory):
+    contents = {}
+    for name in os.listdir(directory):
+        if name.endswith(".desktop"):
+            with open(os.path.join(directory, name), "rb") as fh:
+                contents[name] = fh.read()
+    return contents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1000)
+    parser.add_argument("--max-import-ms", type=float, help="fail if the cold import takes longer")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        system_dirs = [os.path.join(tmp, "system")]
+        generate(system_dirs[0], args.entries)
+        source = os.path.join(tmp, "source")
+        generate(source, args.entries)
+        # Overrides differ from the system files by one line
+        for name in os.listdir(source):
+            path = os.path.join(source, name)
+            with open(path, encoding="utf-8") as fh:
+                text = fh.read()
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(text.replace("StartupNotify=true", "StartupNotify=false"))
+        print(f"entries: {args.entries}")
+
+        out = io.BytesIO()
+        start = time.perf_counter()
+        manifest = export_bundle(out, source, system_dirs)
+        export_ms = (time.perf_counter() - start) * 1000
+        data = out.getvalue()
+        print(f"  export                {export_ms:9.1f} ms  ({len(manifest['entries'])} overrides, "
+              f"{len(data) / 1024:.0f} KiB)")
+
+        target = os.path.join(tmp, "user")
+        os.makedirs(target)
+        written, _, import_ms = import_bundle(data, target, system_dirs)
+        if written != args.entries or read_all(target) != read_all(source):
+            sys.exit("imported overrides differ from the exported ones")
+        print(f"  import                {import_ms:9.1f} ms  ({written} written)")
+        written, unchanged, again_ms = import_bundle(data, target, system_dirs)
+        if written or unchanged != args.entries:
+            sys.exit(f"re-import wrote {written} files")
+        print(f"  import again          {again_ms:9.1f} ms  ({unchanged} unchanged)")
+
+        baseline = os.path.join(tmp, "baseline")
+        os.makedirs(baseline)
+        texts = {name: text.decode("utf-8") for name, text in read_all(source).items()}
+        start = time.perf_counter()
+        for name, text in sorted(texts.items()):
+            path = os.path.join(baseline, name)
+            write_atomic(path, text)
+            update_cache(baseline, [path])
+        baseline_ms = (time.perf_counter() - start) * 1000
+        print(f"  one save per file     {baseline_ms:9.1f} ms  (x{baseline_ms / import_ms:.1f} the import)")
+        shutil.rmtree(baseline)
+
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        print(f"FAIL: import took {import_ms:.1f} ms (limit {args.max_import_ms:.0f} ms)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Search latency per keystroke: AppListModel vs. the old QListWidget loop.
+
+Each keystroke is timed from filter call through the repaint of the view,
+running offscreen, without the search debounce. Records are synthetic; no
+files are touched. The legacy loop only understands plain substrings, so
+its numbers for field queries are for comparison of cost only.
+
+Usage: python benchmarks/bench_filter.py [--entries N] [--legacy]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import Qt  # noqa: E402
+from PySide6.QtWidgets import QApplication, QListView, QListWidget, QListWidgetItem  # noqa: E402
+
+from desktop_editor import AppListDelegate, AppListModel, IconCache  # noqa: E402
+from dotdesktop.entry import DesktopEntry  # noqa: E402
+
+QUERIES = ["s", "sy", "syn", "synt", "synth", "synthe", "synthet", "syntheti", "synthetic",
+           "synthetic ", "synthetic a", "synthetic ap", "synthetic app", "synthetic app 4",
+           "synthetic app 42", "", "code", "org.bench.app1", "zzz", "",
+           "cat:development", "cat:development exec:electron", "exec:electron", "editor", ""]
+
+CATEGORIES = ["Development;IDE;", "Utility;", "Network;WebBrowser;", "Graphics;", "Office;"]
+EXECS = ["/usr/bin/code %F", "/opt/app/electron %U", "/usr/bin/firefox %u", "env GDK_BACKEND=x11 gimp"]
+
+
+def make_entries(count):
+    batch = []
+    for i in range(count):
+        filename = f"org.bench.App{i}.desktop"
+        entry = DesktopEntry(f"/usr/share/applications/{filename}")
+        entry.name = f"Synthetic App {i}"
+        entry.generic_name = "Text Editor" if i % 7 == 0 else "Benchmark Tool"
+        entry.keywords = f"bench;tool{i % 100};"
+        entry.exec = EXECS[i % len(EXECS)]
+        entry.categories = CATEGORIES[i % len(CATEGORIES)]
+        entry.icon = f"bench-icon-{i % 50}"
+        batch.append((filename, entry))
+    return batch
+
+
+def run_model(app, batch):
+    model = AppListModel("/home/user/.local/share/applications")
+    view = QListView()
+    view.setModel(model)
+    view.setItemDelegate(AppListDelegate(IconCache(parent=view), view))
+    view.setUniformItemSizes(True)
+    view.resize(400, 800)
+    view.show()
+    start = time.perf_counter()
+    model.update_entries(batch)
+    print(f"model + search index build: {(time.perf_counter() - start) * 1000:.1f} ms")
+    app.processEvents()
+    return time_queries(app, model.set_filter, view)
+
+
+def run_legacy(app, batch):
+    view = QListWidget()
+    view.setItemDelegate(AppListDelegate(IconCache(parent=view), view))
+    for filename, entry in batch:
+        item = QListWidgetItem()
+        item.setData(Qt.UserRole, entry.path)
+        item.setData(Qt.UserRole + 1, entry.name)
+        item.setData(Qt.UserRole + 2, filename)
+        item.setData(Qt.UserRole + 3, False)
+        item.setData(Qt.UserRole + 4, entry.icon)
+        item.setText(f"{entry.name} {filename}")
+        view.addItem(item)
+    view.resize(400, 800)
+    view.show()
+    app.processEvents()
+
+    def filter_list(text):
+        for i in range(view.count()):
+            item = view.item(i)
+            item.setHidden(text.lower() not in item.text().lower())
+
+    return time_queries(app, filter_list, view)
+
+
+def time_queries(app, apply_filter, view):
+    timings = []
+    for text in QUERIES:
+        start = time.perf_counter()
+        apply_filter(text)
+        view.viewport().repaint()
+        app.processEvents()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label, timings):
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{label:<14} p50 {statistics.median(timings):7.2f} ms   p95 {p95:7.2f} ms   "
+          f"max {max(timings):7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=50000)
+    parser.add_argument("--legacy", action="store_true", help="also time the old QListWidget loop")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    batch = make_entries(args.entries)
+    print(f"entries: {args.entries}  keystrokes: {len(QUERIES)}")
+    report("AppListModel", run_model(app, batch))
+    if args.legacy:
+        report("QListWidget", run_legacy(app, batch))
+
+
+if __name__ == "__main__":
+    main()
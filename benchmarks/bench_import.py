@@ -0,0 +1,130 @@
+"""Cold import cost of the Qt-free core and of the GUI, via ``python -X importtime``.
+
+Each target is imported in a fresh interpreter ``--repeat`` times and the
+median cumulative time is reported, with the slowest modules it pulled in.
+``--startup`` also times interpreter start to the first shown window.
+With ``--max-core-ms`` the script exits 1 when the core goes over budget,
+so it can run as a regression check.
+
+Usage: python benchmarks/bench_import.py [--repeat R] [--top K] [--startup] [--max-core-ms MS]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CORE_MODULES = ["dotdesktop.entry", "dotdesktop.index", "dotdesktop.launch", "dotdesktop.paths",
+                "dotdesktop.presets", "dotdesktop.resolver", "dotdesktop.scanner", "dotdesktop.writer"]
+TARGETS = [
+    ("core", CORE_MODULES),
+    ("cli", ["dotdesktop.cli"]),
+    ("gui", ["desktop_editor"]),
+]
+
+STARTUP_SCRIPT = """
+import sys, time
+from PySide6.QtWidgets import QApplication
+import desktop_editor
+app = QApplication(sys.argv[:1])
+window = desktop_editor.DesktopEntryEditor()
+window.show()
+app.processEvents()
+print(time.perf_counter())
+window.close()
+"""
+
+
+def child_env(home):
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    # A throwaway cache dir keeps the window from reading or writing the real scan index
+    env["XDG_CACHE_HOME"] = os.path.join(home, "cache")
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def import_times(modules, env, baseline=()):
+    """Return ``({module: (self_us, cumulative_us)}, total_us)`` for one cold import.
+
+    Top-level modules named in ``baseline`` (interpreter startup) are left
+    out of the total.
+    """
+    code = "import " + ", ".join(modules) if modules else "pass"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          env=env, cwd=ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+        # Top-level imports are not indented; their cumulative times add up to the total
+        if not name.startswith("  ", 1) and name.strip() not in baseline:
+            total += int(cumulative_us)
+    return times, total
+
+
+def measure(label, modules, env, baseline, repeat, top):
+    # The first run compiles any stale bytecode; only warm-cache imports are timed
+    import_times(modules, env)
+    totals = []
+    for _ in range(repeat):
+        times, total = import_times(modules, env, baseline)
+        totals.append(total)
+    median_ms = statistics.median(totals) / 1000
+    print(f"{label:<6} median {median_ms:7.1f} ms   min {min(totals) / 1000:7.1f} ms   "
+          f"({', '.join(modules) if len(modules) == 1 else f'{len(modules)} modules'})")
+    slowest = sorted(((name, t) for name, t in times.items() if name not in baseline), key=lambda item: item[1][0], reverse=True)[:top]
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"         {self_us / 1000:6.1f} ms self  {cumulative_us / 1000:6.1f} ms cumul  {name}")
+    return median_ms
+
+
+def measure_startup(env, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], env=env, cwd=ROOT,
+                              capture_output=True, text=True, check=True)
+        shown = float(proc.stdout.split()[-1])
+        # perf_counter is system-wide on Linux, so the child's reading is comparable
+        timings.append((shown - start) * 1000)
+    print(f"startup median {statistics.median(timings):7.1f} ms   min {min(timings):7.1f} ms   "
+          f"(process start to first shown window)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="slowest modules to list per target")
+    parser.add_argument("--startup", action="store_true", help="also time GUI startup to first paint")
+    parser.add_argument("--max-core-ms", type=float, default=None,
+                        help="fail if the core import median exceeds this budget")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        env = child_env(home)
+        baseline = set(import_times([], env)[0])
+        results = {label: measure(label, modules, env, baseline, args.repeat, args.top)
+                   for label, modules in TARGETS}
+        leaked = [name for name in import_times(["dotdesktop.cli"], env)[0]
+                  if name.startswith("PySide6")]
+        print(f"PySide6 modules imported by the CLI: {len(leaked)}")
+        if args.startup:
+            measure_startup(env, args.repeat)
+
+    if leaked:
+        return 1
+    if args.max_core_ms is not None and results["core"] > args.max_core_ms:
+        print(f"core import {results['core']:.1f} ms exceeds budget {args.max_core_ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""Memory held per 10k entries by each layer of the entry pipeline (tracemalloc).
+
+A synthetic corpus is scanned into a scan index, which is saved and loaded
+back (the warm-start path), then fed to an EntryStore and a SearchIndex as
+the list model does. Each layer is measured as the growth in traced
+memory while it is built. The records are also built from the index rows
+with and without interning, to show what interning saves. --legacy also
+measures the old layout: one ConfigParser per entry (tracemalloc) and a
+QListWidgetItem with five roles per entry (RSS, since Qt allocates
+outside Python's tracer).
+
+Usage: python benchmarks/bench_memory.py [--entries N] [--legacy]
+"""
+import argparse
+import configparser
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate  # noqa: E402
+from dotdesktop.entry import ENTRY_KEYS, DesktopEntry, parse_desktop_entry  # noqa: E402
+from dotdesktop.index import ScanIndex  # noqa: E402
+from dotdesktop.scanner import scan_all  # noqa: E402
+from dotdesktop.search import SearchIndex  # noqa: E402
+from dotdesktop.store import EntryStore  # noqa: E402
+
+
+def traced(build):
+    """Return ``(result, bytes)``: what ``build()`` returns and the memory it still holds."""
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    return result, tracemalloc.get_traced_memory()[0] - before
+
+
+def rss_bytes():
+    with open("/proc/self/statm") as fh:
+        return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def uninterned(path, row):
+    """Like DesktopEntry.from_row, but every record keeps its own strings."""
+    entry = DesktopEntry.__new__(DesktopEntry)
+    entry.path = path
+    for attr, value in zip(ENTRY_KEYS.values(), row):
+        setattr(entry, attr, value)
+    return entry
+
+
+def load_records(index_path, build):
+    """Records built with ``build(path, row)`` from the rows of a saved index."""
+    with open(index_path, encoding="utf-8") as fh:
+        rows = json.load(fh)["entries"]
+    return [build(p, row) for p, (_, row) in rows.items()]
+
+
+def build_store(entries):
+    store = EntryStore()
+    for entry_id, entry in entries:
+        store.put(entry_id, entry)
+    return store
+
+
+def build_search(store):
+    search = SearchIndex()
+    for slot, entry_id in enumerate(store.ids):
+        search.add(slot, entry_id, store.entries[slot])
+    return search
+
+
+def load_configparsers(paths):
+    parsers = []
+    for path in paths:
+        config = configparser.ConfigParser(interpolation=None)
+        config.read(path)
+        parsers.append(config)
+    return parsers
+
+
+def legacy_list_widget(paths):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtCore import Qt
+    from PySide6.QtWidgets import QApplication, QListWidget, QListWidgetItem
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    view = QListWidget()
+    entries = [(os.path.basename(p), parse_desktop_entry(p)) for p in paths]
+    gc.collect()
+    before = rss_bytes()
+    for filename, entry in entries:
+        item = QListWidgetItem()
+        item.setData(Qt.UserRole, entry.path)
+        item.setData(Qt.UserRole + 1, entry.name)
+        item.setData(Qt.UserRole + 2, filename)
+        item.setData(Qt.UserRole + 3, False)
+        item.setData(Qt.UserRole + 4, entry.icon)
+        item.setText(f"{entry.name} {filename}")
+        view.addItem(item)
+    app.processEvents()
+    return rss_bytes() - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=10000)
+    parser.add_argument("--legacy", action="store_true",
+                        help="also measure ConfigParser objects and QListWidget items")
+    args = parser.parse_args()
+    per_10k = 10000 / args.entries
+
+    def report(label, size):
+        print(f"{label:<26} {size * per_10k / 2**20:8.2f} MiB per 10k   "
+              f"{size / args.entries:7.0f} B/entry")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = os.path.join(tmp, "applications")
+        paths = generate(directory, args.entries)
+        # Files younger than the racy window are never indexed; age them
+        past = time.time() - 3600
+        for path in paths + [directory]:
+            os.utime(path, (past, past))
+        index_path = os.path.join(tmp, "index.json")
+        warm = ScanIndex(index_path)
+        scan_all([directory], warm)
+        warm.save()
+        del warm
+
+        print(f"entries: {args.entries}")
+        # Qt first, before freed Python memory can hide its growth in RSS
+        if args.legacy:
+            report("QListWidget items (RSS)", legacy_list_widget(paths))
+
+        tracemalloc.start()
+        _, size = traced(lambda: load_records(index_path, uninterned))
+        report("records, not interned", size)
+        _, size = traced(lambda: load_records(index_path, DesktopEntry.from_row))
+        report("records", size)
+        index, size = traced(lambda: ScanIndex.load(index_path))
+        report("scan index (with records)", size)
+        entries = sorted((os.path.basename(p), e) for p, (_, e) in index.entries.items())
+        store, size = traced(lambda: build_store(entries))
+        report("entry store", size)
+        _, size = traced(lambda: build_search(store))
+        report("search index", size)
+        if args.legacy:
+            _, size = traced(lambda: load_configparsers(paths))
+            report("ConfigParser per entry", size)
+        tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Refreshing mimeinfo.cache: update-desktop-database vs. in-process rebuild and update.
+
+A directory of N synthetic entries is written and its cache built three
+ways: by the external tool (skipped if it is not installed), by a full
+in-process rebuild, and incrementally after editing one entry's MimeType
+at a time, which is what a save in the editor does. Every result must
+list the same handlers per MIME type as a full rebuild. Reverse lookups
+("what handles text/plain") are timed on the index too.
+
+Usage: python benchmarks/bench_mime.py [--entries N] [--edits E] [--repeat R]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate  # noqa: E402
+from dotdesktop.mimeinfo import MimeIndex, cache_path, rebuild_cache, update_cache  # noqa: E402
+
+
+def timed(run, repeat):
+    """Median wall time of ``run()`` in ms."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def handlers(directory):
+    """``{MIME type: {desktop ID, ...}}`` from the directory's cache."""
+    cache = MimeIndex.load(cache_path(directory))
+    return {mime_type: set(cache.handlers(mime_type)) for mime_type in cache}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--edits", type=int, default=50, help="single-entry updates to time")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = generate(tmp, args.entries)
+        print(f"entries: {args.entries}")
+
+        rebuild_ms = timed(lambda: rebuild_cache(tmp), args.repeat)
+        expected = handlers(tmp)
+        print(f"  in-process rebuild      {rebuild_ms:9.1f} ms  ({len(expected)} MIME types)")
+
+        program = shutil.which("update-desktop-database")
+        external_ms = None
+        if program:
+            external_ms = timed(lambda: subprocess.run([program, tmp], check=True), args.repeat)
+            if handlers(tmp) != expected:
+                sys.exit("update-desktop-database and the in-process rebuild disagree")
+            print(f"  update-desktop-database {external_ms:9.1f} ms")
+        else:
+            print("  update-desktop-database not installed, skipped")
+
+        samples = []
+        step = max(1, len(paths) // max(args.edits, 1))
+        for i, path in enumerate(paths[::step][:args.edits]):
+            with open(path, encoding="utf-8") as fh:
+                text = fh.read()
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(text.replace("MimeType=text/plain;", f"MimeType=text/html;text/x-edit-{i % 3};"))
+            start = time.perf_counter()
+            update_cache(tmp, [path])
+            samples.append((time.perf_counter() - start) * 1000)
+        incremental = handlers(tmp)
+        rebuild_cache(tmp)
+        if incremental != handlers(tmp):
+            sys.exit("incremental updates and a full rebuild disagree")
+        update_ms = statistics.median(samples)
+        print(f"  incremental update      {update_ms:9.1f} ms  (median of {len(samples)} edits)")
+        if external_ms is not None:
+            print(f"  speedup vs external:    rebuild x{external_ms / rebuild_ms:.1f}, "
+                  f"update x{external_ms / update_ms:.1f}")
+
+        index = MimeIndex.load(cache_path(tmp))
+        lookups = 10000
+        start = time.perf_counter()
+        for i in range(lookups):
+            index.handlers(f"text/x-bench-{i % args.entries}")
+        unique_us = (time.perf_counter() - start) * 1e6 / lookups
+        start = time.perf_counter()
+        for _ in range(100):
+            index.handlers("text/plain")
+        shared_us = (time.perf_counter() - start) * 1e6 / 100
+        print(f"  reverse lookup          {unique_us:9.2f} us (1 handler), "
+              f"{shared_us:.1f} us (text/plain, {len(index.handlers('text/plain'))} handlers)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""Holding the Down arrow through the list: main-thread time per row.
+
+The editor window runs offscreen over a synthetic corpus in a temporary
+XDG tree. Each step sends one Down key press to the list, then waits for
+the next auto-repeat (--repeat-ms, 33 ms is a typical 30 Hz key repeat)
+while processing events, so deferred form updates and prefetch results
+land as they would for a user. Reported per row is the time the GUI
+thread spent busy, against the 16.7 ms budget of a 60 fps frame.
+
+Usage: python benchmarks/bench_navigate.py [--entries N] [--repeat-ms MS]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1000)
+    parser.add_argument("--repeat-ms", type=float, default=33.0, help="key auto-repeat interval")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    os.environ["XDG_DATA_HOME"] = os.path.join(tmp.name, "home")
+    os.environ["XDG_DATA_DIRS"] = os.path.join(tmp.name, "share")
+    os.environ["XDG_CACHE_HOME"] = os.path.join(tmp.name, "cache")
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from benchmarks.corpus import generate
+    generate(os.path.join(tmp.name, "share", "applications"), args.entries)
+
+    from PySide6.QtCore import Qt
+    from PySide6.QtTest import QTest
+    from PySide6.QtWidgets import QApplication
+
+    import desktop_editor
+
+    app = QApplication(sys.argv[:1])
+    window = desktop_editor.DesktopEntryEditor()
+    window.show()
+    deadline = time.perf_counter() + 30
+    while window.app_model.rowCount() < args.entries and time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+    view = window.app_list
+    view.setFocus()
+    view.setCurrentIndex(window.app_model.index(0))
+
+    busy = []
+    loaded = 0
+    previous_path = None
+    for _ in range(window.app_model.rowCount() - 1):
+        step_end = time.perf_counter() + args.repeat_ms / 1000
+        spent = 0.0
+        t0 = time.perf_counter()
+        QTest.keyClick(view, Qt.Key_Down)
+        app.processEvents()
+        spent += time.perf_counter() - t0
+        while time.perf_counter() < step_end:
+            t0 = time.perf_counter()
+            app.processEvents()
+            spent += time.perf_counter() - t0
+            time.sleep(0.001)
+        busy.append(spent * 1000)
+        if window.current_file_path != previous_path:
+            previous_path = window.current_file_path
+            loaded += 1
+
+    window.close()
+    busy.sort()
+    p95 = busy[int(len(busy) * 0.95)]
+    print(f"rows: {len(busy)}  form loads: {loaded}  key repeat: {args.repeat_ms:.0f} ms")
+    print(f"busy per row: median {statistics.median(busy):.2f} ms  p95 {p95:.2f} ms  "
+          f"max {busy[-1]:.2f} ms")
+    print(f"rows over a 60 fps frame (16.7 ms): {sum(1 for b in busy if b > 16.7)}")
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
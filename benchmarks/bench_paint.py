@@ -0,0 +1,167 @@
+"""List painting throughput: cached row layouts and QStaticText vs. per-row layout.
+
+Rows are painted offscreen into a QImage the size of a list viewport,
+one screenful per frame, scrolling one row per frame and moving the hover
+highlight, the way the list repaints while the mouse moves over it. The
+legacy delegate is the previous paint(): new colours per row, two font
+changes and a drawText layout for each string. Both run without the
+METRICS timer. Reported is rows painted per second, warm (row cache
+filled) and cold (cache cleared every frame, as after a model change).
+
+Usage: python benchmarks/bench_paint.py [--entries N] [--frames F] [--width PX] [--height PX]
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QRect, Qt  # noqa: E402
+from PySide6.QtGui import QColor, QImage, QPainter  # noqa: E402
+from PySide6.QtWidgets import QApplication, QListView, QStyle, QStyleOptionViewItem  # noqa: E402
+
+from benchmarks.bench_filter import make_entries  # noqa: E402
+from desktop_editor import (AppListDelegate, AppListModel, IconCache,  # noqa: E402
+                            FileRole, IconRole, NameRole, OverrideRole, ToolkitRole)
+
+USER_DIR = "/home/user/.local/share/applications"
+
+
+class LegacyDelegate(AppListDelegate):
+    # The paint() this change replaced
+    def paint(self, painter, option, index):
+        name = index.data(NameRole)
+        filename = index.data(FileRole)
+        is_override = index.data(OverrideRole)
+        icon_source = index.data(IconRole)
+        badge = self.BADGES.get(index.data(ToolkitRole))
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        bg_rect = option.rect
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(bg_rect, QColor("#3584e4"))
+            text_color = QColor("white")
+            subtext_color = QColor("#e0e0e0")
+        elif option.state & QStyle.State_MouseOver:
+            painter.fillRect(bg_rect, QColor("#3a3a3a"))
+            text_color = QColor("white")
+            subtext_color = QColor("#aaaaaa")
+        else:
+            text_color = QColor("white")
+            subtext_color = QColor("#888888")
+
+        icon_rect = QRect(bg_rect.left() + 10, bg_rect.top() + 10, 40, 40)
+
+        # Cached and pre-scaled; a miss paints the placeholder until it loads
+        pixmap = self.icon_cache.pixmap(icon_source)
+        if not pixmap.isNull():
+            painter.drawPixmap(icon_rect, pixmap)
+
+        text_rect = QRect(icon_rect.right() + 15, bg_rect.top() + 8, bg_rect.width() - 70, 20)
+        subtext_rect = QRect(icon_rect.right() + 15, bg_rect.top() + 32, bg_rect.width() - 70, 18)
+
+        font = painter.font()
+        if badge:
+            font.setPointSize(8)
+            font.setBold(True)
+            painter.setFont(font)
+            badge_width = painter.fontMetrics().horizontalAdvance(badge) + 12
+            badge_rect = QRect(bg_rect.right() - badge_width - 10, bg_rect.top() + 9, badge_width, 18)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor(0, 0, 0, 90))
+            painter.drawRoundedRect(badge_rect, 4, 4)
+            painter.setPen(subtext_color)
+            painter.drawText(badge_rect, Qt.AlignCenter, badge)
+            text_rect.setRight(badge_rect.left() - 6)
+        font.setPointSize(11)
+        font.setBold(True)
+        painter.setFont(font)
+        painter.setPen(text_color)
+        painter.drawText(text_rect, Qt.AlignLeft | Qt.AlignVCenter, name)
+
+        font.setPointSize(9)
+        font.setBold(False)
+        painter.setFont(font)
+        painter.setPen(subtext_color)
+
+        sub_text = filename
+        if is_override:
+            painter.setPen(QColor("#57e389"))
+            sub_text = f"USER OVERRIDE • {filename}"
+
+        painter.drawText(subtext_rect, Qt.AlignLeft | Qt.AlignVCenter, sub_text)
+        painter.restore()
+
+
+def paint_frames(delegate, paint, model, view, frames, width, height, cold):
+    rows_per_frame = height // 60 + 1
+    image = QImage(width, height, QImage.Format_ARGB32_Premultiplied)
+    option = QStyleOptionViewItem()
+    option.font = view.font()
+    option.palette = view.palette()
+    painted = 0
+    start = time.perf_counter()
+    for frame in range(frames):
+        if cold:
+            delegate.invalidate()
+        image.fill(0)
+        painter = QPainter(image)
+        first = frame % max(1, model.rowCount() - rows_per_frame)
+        for i in range(rows_per_frame):
+            option.rect = QRect(0, i * 60, width, 60)
+            option.state = QStyle.State_Enabled
+            if i == frame % rows_per_frame:
+                option.state |= QStyle.State_MouseOver
+            if i == 2:
+                option.state |= QStyle.State_Selected
+            paint(delegate, painter, option, model.index(first + i))
+            painted += 1
+        painter.end()
+    return painted / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--width", type=int, default=400)
+    parser.add_argument("--height", type=int, default=800)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])
+    model = AppListModel(USER_DIR)
+    batch = make_entries(args.entries)
+    for i, (filename, entry) in enumerate(batch):
+        if i % 5 == 0:
+            entry.path = os.path.join(USER_DIR, filename)
+    model.update_entries(batch)
+    view = QListView()
+    view.setModel(model)
+    icons = IconCache(parent=view)
+    # Icons are loaded in the background; paint the placeholder for all rows
+    icons.pixmap = lambda icon_source: icons.placeholder
+
+    cached = AppListDelegate(icons, view)
+    legacy = LegacyDelegate(icons, view)
+    current_paint = AppListDelegate.paint.__wrapped__
+    legacy_paint = LegacyDelegate.paint
+    # Warm up both (font setup, glyph caches)
+    paint_frames(cached, current_paint, model, view, 20, args.width, args.height, False)
+    paint_frames(legacy, legacy_paint, model, view, 20, args.width, args.height, False)
+
+    old = paint_frames(legacy, legacy_paint, model, view, args.frames, args.width, args.height, False)
+    warm = paint_frames(cached, current_paint, model, view, args.frames, args.width, args.height, False)
+    cold = paint_frames(cached, current_paint, model, view, args.frames, args.width, args.height, True)
+    print(f"viewport:         {args.width}x{args.height}, {args.frames} frames, {args.entries} entries")
+    print(f"per-row layout:   {old:10.0f} rows/s")
+    print(f"cached (warm):    {warm:10.0f} rows/s  {warm / old:5.2f}x")
+    print(f"cached (cold):    {cold:10.0f} rows/s  {cold / old:5.2f}x")
+    print(f"row cache:        {len(cached._rows)} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Files parsed per second: streaming DesktopEntry parser vs. two ConfigParsers.
+
+Usage: python benchmarks/bench_parse.py [--count N] [--repeat R] [--dir PATH]
+"""
+import argparse
+import configparser
+import glob
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate  # noqa: E402
+from dotdesktop.entry import parse_desktop_entry  # noqa: E402
+
+
+def configparser_path(path):
+    # The previous scan: get_app_name() and get_icon_name() each built a parser.
+    results = []
+    for key in ("Name", "Icon"):
+        try:
+            cfg = configparser.ConfigParser(interpolation=None)
+            cfg.read(path)
+            if "Desktop Entry" in cfg:
+                results.append(cfg["Desktop Entry"].get(key))
+        except Exception:
+            results.append(None)
+    return results
+
+
+def streaming_path(path):
+    entry = parse_desktop_entry(path)
+    return entry.display_name, entry.icon
+
+
+def measure(func, paths, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path in paths:
+            func(path)
+        best = min(best, time.perf_counter() - start)
+    return len(paths) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=2000, help="synthetic files to generate")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--dir", help="benchmark real .desktop files in this directory instead")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.dir:
+            paths = sorted(glob.glob(os.path.join(args.dir, "*.desktop")))
+        else:
+            paths = generate(tmp, args.count)
+
+        old = measure(configparser_path, paths, args.repeat)
+        new = measure(streaming_path, paths, args.repeat)
+
+    print(f"files:            {len(paths)}")
+    print(f"configparser x2:  {old:10.0f} files/s")
+    print(f"streaming parser: {new:10.0f} files/s")
+    print(f"speedup:          {new / old:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Cold scan wall time for 1..W workers over a synthetic tree of N entries.
+
+The tree mimics SEARCH_DIRS plus USER_DIR: entries are spread over several
+system directories and a slice of them is overridden in a user directory.
+Every run must produce the same merged result, so precedence is checked too.
+
+Usage: python benchmarks/bench_scan.py [--entries N] [--max-workers W] [--threads]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate  # noqa: E402
+from dotdesktop.scanner import scan_all  # noqa: E402
+
+
+def build_tree(root, entries, system_dirs=4, override_ratio=0.05):
+    directories = [os.path.join(root, f"system{i}") for i in range(system_dirs)]
+    per_dir = entries // system_dirs
+    for i, directory in enumerate(directories):
+        generate(directory, per_dir, start=i * per_dir)
+    user_dir = os.path.join(root, "user")
+    generate(user_dir, int(entries * override_ratio))
+    return directories + [user_dir]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=20000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--threads", action="store_true", help="use a thread pool instead of processes")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directories = build_tree(tmp, args.entries)
+        user_dir = directories[-1]
+        print(f"entries: {args.entries}  directories: {len(directories)}  "
+              f"pool: {'threads' if args.threads else 'processes'}")
+        baseline = None
+        for workers in range(1, args.max_workers + 1):
+            start = time.perf_counter()
+            merged = scan_all(directories, workers=workers, use_processes=not args.threads)
+            elapsed = time.perf_counter() - start
+            result = {f: e.path for f, e in merged.items()}
+            if baseline is None:
+                baseline = result
+                assert all(p.startswith(user_dir) for f, p in result.items()
+                           if os.path.exists(os.path.join(user_dir, f))), "USER_DIR lost precedence"
+            assert result == baseline, f"merge differs with {workers} workers"
+            print(f"workers={workers:<3} {elapsed * 1000:9.1f} ms  {len(merged) / elapsed:10.0f} entries/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""End-to-end editor benchmarks over synthetic XDG trees, written as JSON.
+
+For each corpus size a tree is generated in a temporary directory (see
+corpus.generate_tree: translations, actions, missing icons, user
+overrides, malformed files) and a headless DesktopEntryEditor is run
+against it in a child process (paths are fixed at import time):
+
+  cold_scan_ms     window creation to scan complete, ignoring the index
+  warm_scan_ms     the same with the index written by the cold scan
+  search_ms        filter + repaint per query (debounce bypassed)
+  select_ms        filling the form for a row (frame deferral bypassed)
+  save_refresh_ms  Save until the list shows the override
+
+--compare OLD.json prints the change per metric and exits 1 if any got
+slower by more than --threshold percent and --min-delta-ms.
+
+Usage: python benchmarks/bench_suite.py [--sizes 1000,10000,100000] [--output FILE]
+                                        [--compare OLD.json] [--threshold PCT]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.corpus import generate_tree  # noqa: E402
+
+QUERIES = ["s", "sy", "syn", "synthetic", "synthetic app", "synthetic app 4", "org.bench",
+           "cat:development", "exec:firefox", "cat:network exec:firefox", "zzz", ""]
+
+
+def summary(samples):
+    samples = sorted(samples)
+    return {
+        "n": len(samples),
+        "p50": round(samples[len(samples) // 2], 3),
+        "p95": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "max": round(samples[-1], 3),
+        "mean": round(statistics.fmean(samples), 3),
+    }
+
+
+def backdate(root, seconds=3600):
+    """Age every file so the scan index trusts it (see index.RACY_WINDOW_NS)."""
+    past = time.time() - seconds
+    for directory, _, files in os.walk(root):
+        for name in files:
+            os.utime(os.path.join(directory, name), (past, past))
+        os.utime(directory, (past, past))
+
+
+def run_child(args):
+    from PySide6.QtWidgets import QApplication, QMessageBox
+
+    import desktop_editor
+    from desktop_editor import FileRole, PathRole
+
+    # Dialogs would block a headless run
+    for name in ("information", "warning", "critical"):
+        setattr(QMessageBox, name, staticmethod(lambda *a, **k: QMessageBox.Ok))
+    QMessageBox.question = staticmethod(lambda *a, **k: QMessageBox.Yes)
+    app = QApplication(sys.argv[:1])
+    rng = random.Random(args.seed)
+
+    def wait(condition, timeout=600):
+        deadline = time.perf_counter() + timeout
+        while not condition():
+            if time.perf_counter() > deadline:
+                raise RuntimeError("timed out")
+            app.processEvents()
+            time.sleep(0.0005)
+
+    def open_window(rebuild_index):
+        start = time.perf_counter()
+        window = desktop_editor.DesktopEntryEditor(rebuild_index=rebuild_index)
+        window.show()
+        wait(lambda: window.scan_worker is not None)
+        wait(lambda: window.scan_worker is None)
+        return window, (time.perf_counter() - start) * 1000
+
+    window, cold = open_window(True)
+    entries = window.app_model.entry_count()
+    window.close()
+    window, warm = open_window(False)
+    view = window.app_list
+    model = window.app_model
+
+    search = []
+    for _ in range(args.rounds):
+        for query in QUERIES:
+            start = time.perf_counter()
+            window.search_bar.setText(query)
+            window.filter_list()
+            view.viewport().repaint()
+            search.append((time.perf_counter() - start) * 1000)
+    window.search_timer.stop()
+
+    select = []
+    for _ in range(args.selections):
+        index = model.index(rng.randrange(model.rowCount()))
+        start = time.perf_counter()
+        view.setCurrentIndex(index)
+        window.select_timer.stop()
+        window.load_selected_app(index)
+        window.right_panel.repaint()
+        select.append((time.perf_counter() - start) * 1000)
+
+    saves = []
+    user_dir = desktop_editor.USER_DIR
+    candidates = [r for r in range(model.rowCount())
+                  if not model.index(r).data(PathRole).startswith(user_dir)]
+    for row in rng.sample(candidates, min(args.saves, len(candidates))):
+        index = model.index(row)
+        entry_id = index.data(FileRole)
+        view.setCurrentIndex(index)
+        window.select_timer.stop()
+        window.load_selected_app(index)
+        window.name_edit.setText(f"Saved {row}")
+        start = time.perf_counter()
+        window.save_entry()
+        wait(lambda: (model.index_for_name(entry_id).data(PathRole) or "").startswith(user_dir))
+        saves.append((time.perf_counter() - start) * 1000)
+    window.close()
+
+    return {
+        "entries": entries,
+        "cold_scan_ms": round(cold, 3),
+        "warm_scan_ms": round(warm, 3),
+        "search_ms": summary(search),
+        "select_ms": summary(select),
+        "save_refresh_ms": summary(saves),
+    }
+
+
+def run_size(size, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        env = generate_tree(tmp, size, seed=args.seed)
+        backdate(tmp)
+        print(f"[{size}] corpus generated in {time.perf_counter() - started:.1f} s", file=sys.stderr)
+        env = dict(os.environ, QT_QPA_PLATFORM="offscreen", **env)
+        command = [sys.executable, os.path.abspath(__file__), "--child", "--seed", str(args.seed),
+                   "--rounds", str(args.rounds), "--selections", str(args.selections),
+                   "--saves", str(args.saves)]
+        result = subprocess.run(command, env=env, cwd=ROOT, stdout=subprocess.PIPE, check=True,
+                                text=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def flatten(results):
+    """``{"size/metric[.stat]": value}`` for the numbers worth comparing."""
+    flat = {}
+    for size, metrics in results.items():
+        for name, value in metrics.items():
+            if isinstance(value, dict):
+                for stat in ("p50", "p95"):
+                    flat[f"{size}/{name}.{stat}"] = value[stat]
+            elif name.endswith("_ms"):
+                flat[f"{size}/{name}"] = value
+    return flat
+
+
+def compare(old, new, threshold, min_delta):
+    """Print the change per metric; returns the number of regressions."""
+    old_flat, new_flat = flatten(old["results"]), flatten(new["results"])
+    regressions = 0
+    for key in sorted(new_flat.keys() & old_flat.keys()):
+        before, after = old_flat[key], new_flat[key]
+        change = (after - before) / before * 100 if before else 0.0
+        flag = ""
+        if change > threshold and after - before > min_delta:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{key:<36} {before:10.2f} -> {after:10.2f} ms  {change:+7.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="comma-separated corpus sizes (default 1000,10000,100000)")
+    parser.add_argument("--output", default="bench-results.json", help="JSON results file")
+    parser.add_argument("--compare", metavar="OLD", help="earlier JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="percent slowdown counted as a regression (default 10)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                        help="ignore slowdowns smaller than this, in ms (default 1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rounds", type=int, default=3, help="passes over the search queries")
+    parser.add_argument("--selections", type=int, default=200)
+    parser.add_argument("--saves", type=int, default=10)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args)))
+        return 0
+
+    import PySide6
+
+    results = {}
+    for size in (int(s) for s in args.sizes.split(",")):
+        results[str(size)] = result = run_size(size, args)
+        print(f"[{size}] cold {result['cold_scan_ms']:.0f} ms  warm {result['warm_scan_ms']:.0f} ms  "
+              f"search p95 {result['search_ms']['p95']:.1f} ms  "
+              f"select p95 {result['select_ms']['p95']:.1f} ms  "
+              f"save p95 {result['save_refresh_ms']['p95']:.1f} ms", file=sys.stderr)
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "pyside6": PySide6.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            old = json.load(fh)
+        return 1 if compare(old, report, args.threshold, args.min_delta_ms) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
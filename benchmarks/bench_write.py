@@ -0,0 +1,100 @@
+"""Saving an edited entry: DesktopDocument line patching vs. ConfigParser rewrite.
+
+Before timing, every file is checked to round-trip byte for byte through
+DesktopDocument, and an Exec edit must change exactly one line; the
+hand-written edge cases are in tests/test_document.py. The benchmark
+then reports files/s for load + edit + render and the number of lines
+each approach changes per file.
+
+Usage: python benchmarks/bench_write.py [--count N] [--repeat R] [--dir PATH]
+"""
+import argparse
+import configparser
+import difflib
+import glob
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate  # noqa: E402
+from dotdesktop.document import DesktopDocument  # noqa: E402
+
+
+def read_text(path):
+    with open(path, encoding="utf-8", errors="surrogateescape", newline="") as fh:
+        return fh.read()
+
+
+def changed_lines(old, new):
+    diff = difflib.ndiff(old.splitlines(), new.splitlines())
+    return sum(1 for line in diff if line.startswith("+ "))
+
+
+def check_corpus(paths):
+    for path in paths:
+        original = read_text(path)
+        document = DesktopDocument.load(path)
+        assert document.text() == original, f"{path}: round trip changed the file"
+        document["Desktop Entry"]["Exec"] = "edited %U"
+        assert changed_lines(original, document.text()) == 1, f"{path}: edit touched other lines"
+
+
+def configparser_save(path):
+    # The previous save_entry: parse everything, write everything back
+    config = configparser.ConfigParser(interpolation=None)
+    config.optionxform = str
+    config.read(path)
+    config["Desktop Entry"]["Exec"] = "edited %U"
+    buf = io.StringIO()
+    config.write(buf, space_around_delimiters=False)
+    return buf.getvalue()
+
+
+def document_save(path):
+    document = DesktopDocument.load(path)
+    document["Desktop Entry"]["Exec"] = "edited %U"
+    return document.text()
+
+
+def measure(func, paths, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path in paths:
+            func(path)
+        best = min(best, time.perf_counter() - start)
+    return len(paths) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=2000, help="synthetic files to generate")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--dir", help="benchmark real .desktop files in this directory instead")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.dir:
+            paths = sorted(glob.glob(os.path.join(args.dir, "*.desktop")))
+        else:
+            paths = generate(os.path.join(tmp, "applications"), args.count)
+        check_corpus(paths)
+        print(f"round trips:      {len(paths)} files byte-identical")
+
+        old = measure(configparser_save, paths, args.repeat)
+        new = measure(document_save, paths, args.repeat)
+        old_lines = sum(changed_lines(read_text(p), configparser_save(p)) for p in paths)
+        new_lines = sum(changed_lines(read_text(p), document_save(p)) for p in paths)
+
+    print(f"files:            {len(paths)}")
+    print(f"configparser:     {old:10.0f} files/s  {old_lines / len(paths):5.1f} lines changed/file")
+    print(f"document patch:   {new:10.0f} files/s  {new_lines / len(paths):5.1f} lines changed/file")
+    print(f"speedup:          {new / old:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Synthetic .desktop corpora for the benchmark scripts."""
+import os
+import random
+
+TEMPLATE = """\
+[Desktop Entry]
+Type=Application
+Name=Synthetic App {i}
+Name[de]=Synthetische Anwendung {i}
+Name[fr]=Application synthétique {i}
+GenericName=Benchmark Tool
+Comment=Generated entry number {i} for benchmarking
+Comment[de]=Generierter Eintrag {i}
+Exec={exec_} %U
+Icon={icon}
+Terminal=false
+Categories={categories}
+Keywords=bench;synthetic;test;
+MimeType=text/plain;text/x-bench-{i};
+StartupNotify=true
+Actions=new-window;new-private-window;
+
+[Desktop Action new-window]
+Name=New Window
+Exec={exec_} --new-window
+
+[Desktop Action new-private-window]
+Name=New Private Window
+Exec={exec_} --private-window
+"""
+
+EXECS = ["/usr/bin/code", "firefox", "/opt/app/electron", "gedit", "kate"]
+CATEGORIES = ["Development;IDE;", "Network;WebBrowser;", "Utility;GTK;", "Qt;KDE;Office;"]
+
+
+def generate(directory, count, start=0):
+    """Write ``count`` synthetic entries into ``directory``; return their paths."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(start, start + count):
+        path = os.path.join(directory, f"org.bench.App{i}.desktop")
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(TEMPLATE.format(
+                i=i,
+                exec_=EXECS[i % len(EXECS)],
+                icon=f"bench-icon-{i % 50}",
+                categories=CATEGORIES[i % len(CATEGORIES)],
+            ))
+        paths.append(path)
+    return paths
+
+
+LOCALES = ["de", "fr", "es", "it", "ja", "zh_CN", "pt_BR", "ru", "pl", "nl", "sv", "ko"]
+
+MALFORMED = [
+    b"\x7fELF\x02\x01\x01\x00 not a desktop file\n",
+    b"Name=No group header\nExec=nothing\n",
+    b"[Desktop Entry]\nType=Application\nExec=noname\n",
+    b"[Desktop Entry]\nName=Bad \xff\xfe bytes\nExec=bad\n",
+    b"",
+]
+
+
+def realistic_entry(i, rng):
+    """Text of entry ``i``: a mix of translations, actions and (missing) icons."""
+    exec_ = EXECS[i % len(EXECS)]
+    lines = ["[Desktop Entry]", "Type=Application", f"Name=Synthetic App {i}"]
+    for locale in rng.sample(LOCALES, rng.choice((0, 0, 2, 6, len(LOCALES)))):
+        lines.append(f"Name[{locale}]=App {i} ({locale})")
+        lines.append(f"Comment[{locale}]=Localized comment {i}")
+    lines.append(f"GenericName=Benchmark Tool {i % 7}")
+    lines.append(f"Comment=Generated entry number {i}")
+    lines.append(f"Exec={exec_} %U")
+    roll = rng.random()
+    if roll < 0.1:
+        lines.append(f"Icon=/nonexistent/icons/missing-{i}.png")
+    elif roll < 0.2:
+        lines.append(f"Icon=missing-theme-icon-{i}")
+    else:
+        lines.append(f"Icon=bench-icon-{i % 50}")
+    lines.append(f"Categories={CATEGORIES[i % len(CATEGORIES)]}")
+    lines.append("Keywords=bench;synthetic;test;")
+    if rng.random() < 0.05:
+        lines.append("NoDisplay=true")
+    actions = ["new-window", "new-private-window"][:rng.choice((0, 0, 1, 2))]
+    if actions:
+        lines.append("Actions=" + ";".join(actions) + ";")
+    for action in actions:
+        lines += ["", f"[Desktop Action {action}]", f"Name={action.replace('-', ' ').title()}",
+                  f"Exec={exec_} --{action}"]
+    return "\n".join(lines) + "\n"
+
+
+def generate_tree(root, count, seed=0, override_ratio=0.05, malformed_ratio=0.01):
+    """Populate an XDG data tree under ``root`` with about ``count`` entries.
+
+    System entries go to ``root/usr/share/applications`` (a tenth of them
+    in a ``kde4`` subdirectory) and ``root/flatpak/exports/share/applications``;
+    a share of them get a user override in ``root/home/applications``, and
+    a few files are malformed. The same ``seed`` gives the same tree.
+    Returns the environment (XDG_DATA_HOME, XDG_DATA_DIRS, XDG_CACHE_HOME,
+    HOME) that makes the editor scan it.
+    """
+    rng = random.Random(seed)
+    system = os.path.join(root, "usr", "share", "applications")
+    flatpak = os.path.join(root, "flatpak", "exports", "share", "applications")
+    user = os.path.join(root, "home", "applications")
+    for directory in (system, os.path.join(system, "kde4"), flatpak, user):
+        os.makedirs(directory, exist_ok=True)
+
+    def write(path, data):
+        with open(path, "wb") as fh:
+            fh.write(data)
+
+    for i in range(count):
+        if rng.random() < malformed_ratio:
+            write(os.path.join(system, f"org.bench.Broken{i}.desktop"), rng.choice(MALFORMED))
+            continue
+        if i % 10 == 0:
+            directory = os.path.join(system, "kde4")
+        elif i % 10 == 1:
+            directory = flatpak
+        else:
+            directory = system
+        filename = f"org.bench.App{i}.desktop"
+        text = realistic_entry(i, rng)
+        write(os.path.join(directory, filename), text.encode("utf-8"))
+        if rng.random() < override_ratio and directory != os.path.join(system, "kde4"):
+            write(os.path.join(user, filename),
+                  text.replace("Exec=", "Exec=env GDK_BACKEND=wayland ", 1).encode("utf-8"))
+    return {
+        "HOME": root,
+        "XDG_DATA_HOME": os.path.join(root, "home"),
+        "XDG_DATA_DIRS": os.path.join(root, "flatpak", "exports", "share") + ":"
+                         + os.path.join(root, "usr", "share"),
+        "XDG_CACHE_HOME": os.path.join(root, "cache"),
+    }
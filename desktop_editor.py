@@ -1,103 +1,1507 @@
 import sys
 import os
+import argparse
+import functools
+import logging
+import logging.handlers
 import shutil
-import configparser
+import signal
 import subprocess
-import traceback
-import shlex  # [SECURE] Added for safe command parsing
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                               QHBoxLayout, QListWidget, QListWidgetItem, QLabel, 
+                               QHBoxLayout, QListView, QLabel, 
                                QLineEdit, QPushButton, QFileDialog, QComboBox, 
-                               QTextEdit, QMessageBox, QSplitter, QFrame, QGroupBox, 
+                               QMessageBox, QSplitter, QFrame, QGroupBox, 
                                QTabWidget, QStyledItemDelegate, QStyle, QPlainTextEdit,
-                               QScrollArea, QCheckBox)
-from PySide6.QtCore import Qt, QSize, QRect
-from PySide6.QtGui import QIcon, QAction, QPainter, QColor, QFont, QBrush, QPen, QPalette
-
-# Extended paths to find Snap, Flatpak, and System apps
-SEARCH_DIRS = [
-    "/usr/share/applications",
-    "/usr/local/share/applications",
-    "/var/lib/snapd/desktop/applications",
-    "/var/lib/flatpak/exports/share/applications",
-    os.path.expanduser("~/.local/share/flatpak/exports/share/applications"),
-]
-
-# Changes always save here to override the system
-USER_DIR = os.path.expanduser("~/.local/share/applications")
+                               QScrollArea, QCheckBox, QProgressBar, QAbstractItemView,
+                               QTableWidget, QTableWidgetItem, QHeaderView, QDialog, QSpinBox)
+from PySide6.QtCore import (Qt, QSize, QRect, QObject, QStringListModel, QModelIndex,
+                             QRunnable, QThreadPool, QTimer, Signal, QEvent, QFileSystemWatcher,
+                             QProcess, QStandardPaths)
+from PySide6.QtGui import (QIcon, QPainter, QColor, QFont, QPen, QImage, QImageReader,
+                           QPixmap, QFontMetrics, QStaticText, QTransform)
+
+from dotdesktop.bulk import add_categories, commit, inject_preset, plan_edit, set_hidden
+from dotdesktop.document import DocumentCache
+from dotdesktop.entry import parse_desktop_entry
+from dotdesktop.icons import IconTheme
+from dotdesktop.index import ScanIndex, stat_key
+from dotdesktop.launch import exec_args, strip_field_codes
+from dotdesktop.metrics import METRICS
+from dotdesktop.mimeinfo import MimeIndex, handled_types, mime_types, update_cache
+from dotdesktop.paths import SEARCH_DIRS, USER_DIR
+from dotdesktop.presets import PRESETS, TOOLKITS, guess_toolkit
+from dotdesktop.resolver import EntryResolver
+from dotdesktop.scanner import desktop_id, iter_entries, list_tree, read_entry, rescan_directory
+from dotdesktop.search import SearchIndex
+from dotdesktop.startup import LaunchResult, process_tree, sample, summarize
+from dotdesktop.store import EntryStore
+from dotdesktop.toolkit import ToolkitDetector
+from dotdesktop.validate import ValidationCache, validate_entries
+from dotdesktop.writer import override_path, read_document, write_atomic
+
+# --- ICON CACHE ---
+def render_icon_image(icon_source, size, theme):
+    """Find an Icon= value's file in ``theme`` and decode it to a ``size`` pixel QImage.
+
+    Runs on the icon loader thread, so only QImageReader and QImage are
+    used: QIcon and QPixmap belong to the GUI thread, where the cache
+    turns the image into a pixmap. A null image means neither the icon
+    nor the generic fallback was found.
+    """
+    path = theme.find(icon_source) if icon_source else None
+    if path is None:
+        path = theme.find("application-x-executable")
+    if path is None:
+        return QImage()
+    reader = QImageReader(path)
+    if reader.size().isValid():
+        reader.setScaledSize(reader.size().scaled(size, size, Qt.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull() or (image.width() == size and image.height() == size):
+        return image
+    # Centre non-square icons so the row does not stretch them
+    square = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+    square.fill(Qt.transparent)
+    painter = QPainter(square)
+    painter.drawImage((size - image.width()) // 2, (size - image.height()) // 2, image)
+    painter.end()
+    return square
+
+class IconCache(QObject):
+    """Pre-scaled list icons, keyed by the raw Icon= value, in a bounded LRU.
+
+    pixmap() never touches the filesystem: a miss returns the placeholder and
+    queues the icon for a single background loader, which renders the most
+    recently requested (i.e. visible) icons first. icon_ready fires on the
+    GUI thread once a pixmap is cached. invalidate() drops everything, e.g.
+    after an icon theme change; results from before that are discarded.
+    """
+    icon_ready = Signal(str)
+    _loaded = Signal(int, str, QImage)
+
+    def __init__(self, size=40, max_entries=1024, device_pixel_ratio=1.0, parent=None):
+        super().__init__(parent)
+        self.size = size
+        self.max_entries = max_entries
+        self.device_pixel_ratio = device_pixel_ratio
+        self._pixmaps = OrderedDict()
+        self._queue = deque()
+        self._queued = set()        # in _queue
+        self._in_flight = set()     # popped by the loader, not stored yet
+        self._lock = threading.Lock()
+        self._draining = False
+        self._generation = 0
+        self._theme = self._icon_theme()
+        # One loader thread, so each theme's files are listed once
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._loaded.connect(self._store)
+        self.placeholder = self._to_pixmap(render_icon_image(None, self.pixel_size(), self._theme))
+
+    def _icon_theme(self):
+        # The theme name is read here, on the GUI thread; the loader only does file lookups
+        return IconTheme(QIcon.themeName(), size=self.pixel_size())
+
+    def pixel_size(self):
+        return int(round(self.size * self.device_pixel_ratio))
+
+    def _to_pixmap(self, image):
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(self.device_pixel_ratio)
+        return pixmap
+
+    def pixmap(self, icon_source):
+        if not icon_source:
+            return self.placeholder
+        pixmap = self._pixmaps.get(icon_source)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(icon_source)
+            METRICS.count("icons.hits")
+            return pixmap
+        METRICS.count("icons.misses")
+        with self._lock:
+            if icon_source in self._in_flight:
+                return self.placeholder
+            if icon_source in self._queued:
+                # Re-requested: move it to the front of the line
+                self._queue.remove(icon_source)
+            self._queue.append(icon_source)
+            self._queued.add(icon_source)
+            start = not self._draining
+            self._draining = True
+        if start:
+            self._pool.start(self._drain)
+        return self.placeholder
+
+    def _drain(self):
+        size = self.pixel_size()
+        while True:
+            with self._lock:
+                if not self._queue:
+                    self._draining = False
+                    return
+                icon_source = self._queue.pop()
+                self._queued.discard(icon_source)
+                self._in_flight.add(icon_source)
+                generation = self._generation
+                theme = self._theme
+            self._loaded.emit(generation, icon_source, render_icon_image(icon_source, size, theme))
+
+    def _store(self, generation, icon_source, image):
+        with self._lock:
+            self._in_flight.discard(icon_source)
+        if generation != self._generation:
+            return
+        self._pixmaps[icon_source] = self._to_pixmap(image)
+        while len(self._pixmaps) > self.max_entries:
+            self._pixmaps.popitem(last=False)
+        self.icon_ready.emit(icon_source)
+
+    def invalidate(self):
+        with self._lock:
+            self._queue.clear()
+            self._queued.clear()
+            self._in_flight.clear()
+            self._generation += 1
+            self._theme = self._icon_theme()
+        self._pixmaps.clear()
+        self.placeholder = self._to_pixmap(render_icon_image(None, self.pixel_size(), self._theme))
+
+    def shutdown(self):
+        with self._lock:
+            self._queue.clear()
+        self._pool.waitForDone()
 
 # --- CUSTOM DELEGATE FOR MODERN LIST ---
 class AppListDelegate(QStyledItemDelegate):
+    """Paints a list row: icon, validation marker, name, file name and a toolkit badge.
+
+    Fonts, colours and pens are built once, and again only if the view's
+    font changes. Each row's strings are laid out once into QStaticText
+    objects (elided to the row width, glyphs prepared) and kept with the
+    row's other data in a bounded cache keyed by row, so hover and scroll
+    repaints neither query the model nor lay out text. A different width
+    relays the row out; watch_model() clears the cache whenever the rows'
+    data changes, and invalidate() does so for anything else (toolkits
+    detected after the scan).
+    """
+    BADGES = {"electron": "Electron", "gecko": "Gecko", "qt": "Qt", "gtk": "GTK"}
+    ROW_CACHE_SIZE = 2048
+    SELECTED_BG = QColor("#3584e4")
+    HOVER_BG = QColor("#3a3a3a")
+    BADGE_BG = QColor(0, 0, 0, 90)
+    TEXT_PEN = QPen(QColor("white"))
+    SUBTEXT_PENS = {"selected": QPen(QColor("#e0e0e0")), "hover": QPen(QColor("#aaaaaa")),
+                    "normal": QPen(QColor("#888888"))}
+    OVERRIDE_PEN = QPen(QColor("#57e389"))
+    PROBLEM_COLORS = {"error": QColor("#e01b24"), "warning": QColor("#f6d32d")}
+
+    def __init__(self, icon_cache, parent=None):
+        super().__init__(parent)
+        self.icon_cache = icon_cache
+        self._font_key = None
+        self._rows = OrderedDict()      # row -> _RowLayout
+
     def sizeHint(self, option, index):
-        return QSize(option.rect.width(), 60) 
+        # Width 0: rows take the viewport width instead of overhanging it
+        return QSize(0, 60)
+
+    def watch_model(self, model):
+        for signal in (model.modelReset, model.dataChanged, model.layoutChanged, model.rowsInserted,
+                       model.rowsRemoved, model.rowsMoved):
+            signal.connect(self.invalidate)
 
+    def invalidate(self, *args):
+        self._rows.clear()
+
+    def _set_fonts(self, base):
+        """Build the name, file name and badge fonts from the view font ``base``."""
+        self._font_key = base.key()
+        self._fonts = {}
+        for style, size, bold in (("name", 11, True), ("sub", 9, False), ("badge", 8, True)):
+            font = QFont(base)
+            font.setPointSize(size)
+            font.setBold(bold)
+            self._fonts[style] = (font, QFontMetrics(font))
+        self._badges = {}
+        self._rows.clear()
+
+    def static_text(self, style, text, width=None):
+        """``text`` laid out in the ``style`` font, elided to ``width`` if given."""
+        font, metrics = self._fonts[style]
+        if width is not None:
+            text = metrics.elidedText(text, Qt.ElideRight, width)
+        static = QStaticText(text)
+        static.setTextFormat(Qt.PlainText)
+        static.setPerformanceHint(QStaticText.AggressiveCaching)
+        static.prepare(QTransform(), font)
+        return static
+
+    def layout(self, index, width):
+        row = index.row()
+        layout = self._rows.get(row)
+        if layout is not None and layout.width == width:
+            self._rows.move_to_end(row)
+            return layout
+        layout = _RowLayout()
+        layout.width = width
+        layout.icon_source = index.data(IconRole)
+        layout.is_override = index.data(OverrideRole)
+        layout.problem = self.PROBLEM_COLORS.get(index.data(ProblemRole))
+        badge = self.BADGES.get(index.data(ToolkitRole))
+        name_width = width - 70
+        layout.badge = None
+        if badge:
+            if badge not in self._badges:
+                advance = self._fonts["badge"][1].horizontalAdvance(badge)
+                self._badges[badge] = (advance + 12, self.static_text("badge", badge))
+            layout.badge = self._badges[badge]
+            # Right-aligned 10px from the edge, with 6px between name and badge
+            name_width -= layout.badge[0] + 12
+        filename = index.data(FileRole)
+        sub_text = f"USER OVERRIDE • {filename}" if layout.is_override else filename
+        layout.name = self.static_text("name", index.data(NameRole), name_width)
+        layout.sub = self.static_text("sub", sub_text, width - 70)
+        self._rows[row] = layout
+        if len(self._rows) > self.ROW_CACHE_SIZE:
+            self._rows.popitem(last=False)
+        return layout
+
+    @METRICS.timed("list.paint")
     def paint(self, painter, option, index):
-        path = index.data(Qt.UserRole)
-        name = index.data(Qt.UserRole + 1)
-        filename = index.data(Qt.UserRole + 2)
-        is_override = index.data(Qt.UserRole + 3)
-        icon_source = index.data(Qt.UserRole + 4) 
+        if option.font.key() != self._font_key:
+            self._set_fonts(option.font)
+        bg_rect = option.rect
+        layout = self.layout(index, bg_rect.width())
         
         painter.save()
         painter.setRenderHint(QPainter.Antialiasing)
         
-        bg_rect = option.rect
         if option.state & QStyle.State_Selected:
-            painter.fillRect(bg_rect, QColor("#3584e4"))
-            text_color = QColor("white")
-            subtext_color = QColor("#e0e0e0")
+            painter.fillRect(bg_rect, self.SELECTED_BG)
+            subtext_pen = self.SUBTEXT_PENS["selected"]
         elif option.state & QStyle.State_MouseOver:
-            painter.fillRect(bg_rect, QColor("#3a3a3a"))
-            text_color = QColor("white")
-            subtext_color = QColor("#aaaaaa")
+            painter.fillRect(bg_rect, self.HOVER_BG)
+            subtext_pen = self.SUBTEXT_PENS["hover"]
         else:
-            text_color = QColor("white")
-            subtext_color = QColor("#888888")
-
-        icon_rect = QRect(bg_rect.left() + 10, bg_rect.top() + 10, 40, 40)
-        
-        if icon_source and os.path.isabs(icon_source) and os.path.exists(icon_source):
-            icon = QIcon(icon_source)
-        elif icon_source:
-            icon = QIcon.fromTheme(icon_source, QIcon.fromTheme("application-x-executable"))
-        else:
-            icon = QIcon.fromTheme("application-x-executable")
-            
-        icon.paint(painter, icon_rect)
+            subtext_pen = self.SUBTEXT_PENS["normal"]
 
-        text_rect = QRect(icon_rect.right() + 15, bg_rect.top() + 8, bg_rect.width() - 70, 20)
-        subtext_rect = QRect(icon_rect.right() + 15, bg_rect.top() + 32, bg_rect.width() - 70, 18)
+        left = bg_rect.left()
+        top = bg_rect.top()
+        # Cached and pre-scaled; a miss paints the placeholder until it loads
+        pixmap = self.icon_cache.pixmap(layout.icon_source)
+        if not pixmap.isNull():
+            painter.drawPixmap(QRect(left + 10, top + 10, 40, 40), pixmap)
+        if layout.problem is not None:
+            # Validation result: a dot on the icon's bottom-right corner
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(layout.problem)
+            painter.drawEllipse(left + 39, top + 39, 12, 12)
 
-        font = painter.font()
-        font.setPointSize(11)
-        font.setBold(True)
+        fonts = self._fonts
+        if layout.badge:
+            badge_width, badge_text = layout.badge
+            badge_rect = QRect(bg_rect.right() - badge_width - 10, top + 9, badge_width, 18)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(self.BADGE_BG)
+            painter.drawRoundedRect(badge_rect, 4, 4)
+            painter.setPen(subtext_pen)
+            font, metrics = fonts["badge"]
+            painter.setFont(font)
+            painter.drawStaticText(badge_rect.left() + 6, top + 9 + (18 - metrics.height()) // 2,
+                                   badge_text)
+        # Text is centred vertically in a 20px band at +8 and an 18px band at +32
+        font, metrics = fonts["name"]
         painter.setFont(font)
-        painter.setPen(text_color)
-        painter.drawText(text_rect, Qt.AlignLeft | Qt.AlignVCenter, name)
-
-        font.setPointSize(9)
-        font.setBold(False)
+        painter.setPen(self.TEXT_PEN)
+        painter.drawStaticText(left + 64, top + 8 + (20 - metrics.height()) // 2, layout.name)
+        font, metrics = fonts["sub"]
         painter.setFont(font)
-        painter.setPen(subtext_color)
-        
-        sub_text = filename
-        if is_override:
-            painter.setPen(QColor("#57e389"))
-            sub_text = f"USER OVERRIDE • {filename}"
-            
-        painter.drawText(subtext_rect, Qt.AlignLeft | Qt.AlignVCenter, sub_text)
+        painter.setPen(self.OVERRIDE_PEN if layout.is_override else subtext_pen)
+        painter.drawStaticText(left + 64, top + 32 + (18 - metrics.height()) // 2, layout.sub)
         painter.restore()
 
+class _RowLayout:
+    __slots__ = ("width", "icon_source", "is_override", "problem", "badge", "name", "sub")
+
+# --- APP LIST MODEL ---
+PathRole = Qt.UserRole
+NameRole = Qt.UserRole + 1
+FileRole = Qt.UserRole + 2
+OverrideRole = Qt.UserRole + 3
+IconRole = Qt.UserRole + 4
+EntryRole = Qt.UserRole + 5
+ToolkitRole = Qt.UserRole + 6
+ProblemRole = Qt.UserRole + 7
+
+class AppListModel(QStringListModel):
+    """Flat, filterable list of desktop entries, one row per desktop ID.
+
+    Records live in an EntryStore and are referred to by slot; a later
+    entry for the same ID replaces the record in its slot. ``_order`` holds
+    every slot sorted by ID and ``_visible`` the slots matching the current
+    filter. Filtering goes through a SearchIndex kept in step with the
+    store; matches are ranked by score, ties in ID order.
+
+    Only data() is implemented in Python. Row counts and indexes come from
+    the C++ string list (one empty string per visible row), so QListView
+    can lay out tens of thousands of rows without calling back into Python
+    for each one. Publishing a new row set resets the model; callers keep
+    the selection themselves (see DesktopEntryEditor.refresh_list).
+    """
+
+    def __init__(self, user_dir, parent=None, detector=None):
+        super().__init__(parent)
+        self.user_dir = user_dir
+        # Answers ToolkitRole from memory; without one only the Exec heuristics are used
+        self.detector = detector
+        self.filter_text = ""
+        # path -> [(severity, message)] from the last validation run
+        self.problems = {}
+        self._reset_storage()
+
+    def _reset_storage(self):
+        self.store = EntryStore()
+        self._search = SearchIndex()
+        self._mime = MimeIndex()   # MIME type -> desktop IDs of the listed entries
+        self._order = []        # slots sorted by desktop ID
+        self._visible = []      # row -> slot
+        self._rows = None       # slot -> row, built on demand
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        slot = self._visible[index.row()]
+        entry = self.store.entries[slot]
+        if role == Qt.DisplayRole:
+            return f"{entry.display_name} {self.store.ids[slot]}"
+        if role == PathRole:
+            return entry.path
+        if role == NameRole:
+            return entry.display_name
+        if role == FileRole:
+            return self.store.ids[slot]
+        if role == OverrideRole:
+            return entry.path.startswith(self.user_dir + os.sep)
+        if role == IconRole:
+            return entry.icon or None
+        if role == EntryRole:
+            return entry
+        if role == ToolkitRole:
+            return self.detector.cached(entry) if self.detector else guess_toolkit(entry)
+        if role == ProblemRole:
+            issues = self.problems.get(entry.path)
+            if not issues:
+                return None
+            return "error" if any(severity == "error" for severity, _ in issues) else "warning"
+        if role == Qt.ToolTipRole:
+            issues = self.problems.get(entry.path)
+            return "\n".join(f"{severity}: {message}" for severity, message in issues) if issues else None
+        return None
+
+    def clear(self):
+        self._reset_storage()
+        self.setStringList([])
+
+    def entry_count(self):
+        return len(self.store)
+
+    def remove_entries(self, entry_ids):
+        """Drop the rows for ``entry_ids``; their slots are left empty."""
+        removed = False
+        for entry_id in entry_ids:
+            slot, previous = self.store.remove(entry_id)
+            if slot is None:
+                continue
+            self._search.discard(slot, entry_id, previous)
+            self._mime.discard(entry_id, handled_types(previous))
+            removed = True
+        if removed:
+            entries = self.store.entries
+            self._order = [slot for slot in self._order if entries[slot] is not None]
+            self._publish(self._matching(self.filter_text))
+
+    def update_entries(self, batch):
+        """Insert or replace ``(desktop_id, DesktopEntry)`` pairs; later pairs win."""
+        added = []
+        changed = False
+        for entry_id, entry in batch:
+            slot, previous = self.store.put(entry_id, entry)
+            if previous is None:
+                added.append(slot)
+            else:
+                self._search.discard(slot, entry_id, previous)
+                self._mime.discard(entry_id, handled_types(previous))
+                changed = True
+            self._search.add(slot, entry_id, entry)
+            self._mime.add(entry_id, handled_types(entry))
+
+        if added:
+            ids = self.store.ids
+            added.sort(key=ids.__getitem__)
+            # Two sorted runs: Timsort merges them in linear time
+            self._order.extend(added)
+            self._order.sort(key=ids.__getitem__)
+        if added or (changed and self.filter_text):
+            self._publish(self._matching(self.filter_text))
+        elif changed:
+            self.dataChanged.emit(self.index(0), self.index(len(self._visible) - 1))
+
+    def set_filter(self, text):
+        """Show the entries matching ``text`` (see dotdesktop.search.parse_query)."""
+        text = text.strip()
+        if text == self.filter_text:
+            return
+        self.filter_text = text
+        self._publish(self._matching(text))
+
+    def _matching(self, text):
+        scores = self._search.search(text) if text else None
+        if scores is None:
+            return list(self._order)
+        visible = [slot for slot in self._order if slot in scores]
+        # Stable sort: equal scores stay in filename order
+        visible.sort(key=scores.__getitem__, reverse=True)
+        return visible
+
+    def _publish(self, visible):
+        self._visible = visible
+        self._rows = None
+        self.setStringList([""] * len(visible))
+
+    def set_problems(self, problems):
+        """Flag rows from ``{path: [(severity, message)]}`` (see dotdesktop.validate)."""
+        self.problems = problems
+        if self._visible:
+            self.dataChanged.emit(self.index(0), self.index(len(self._visible) - 1))
+
+    def mime_handlers(self, mime_type):
+        """Desktop IDs of the listed entries that handle ``mime_type``, sorted."""
+        return sorted(self._mime.handlers(mime_type))
+
+    def index_for_name(self, entry_id):
+        slot = self.store.slot(entry_id)
+        if slot is None:
+            return QModelIndex()
+        if self._rows is None:
+            self._rows = {slot: row for row, slot in enumerate(self._visible)}
+        row = self._rows.get(slot)
+        return self.index(row) if row is not None else QModelIndex()
+
+    def index_for_path(self, entry_id, path):
+        """Row of ``entry_id``, if it is listed from ``path`` and not from a file shadowing it."""
+        index = self.index_for_name(entry_id)
+        if index.isValid() and index.data(PathRole) != path:
+            return QModelIndex()
+        return index
+
+# --- BACKGROUND SCANNER ---
+class ScanSignals(QObject):
+    log = Signal(str, int)               # message, logging level
+    batch = Signal(object)               # [(filename, DesktopEntry), ...]
+    progress = Signal(int, int)          # done, total
+    finished = Signal(bool, bool)        # cancelled or failed, sandbox_detected
+
+class ScanWorker(QRunnable):
+    """Scans the given directories off the GUI thread.
+
+    Results are streamed back in batches, in directory order, so a later
+    directory (USER_DIR last) replaces an earlier entry with the same name.
+    The index is only touched from this thread while the scan is running;
+    with ``workers > 1`` parsing itself is spread over a process pool.
+    """
+    BATCH_SIZE = 200
+
+    def __init__(self, directories, index=None, rebuild_index=False, workers=1, trace=False,
+                 detector=None):
+        super().__init__()
+        self.directories = directories
+        self.index = index
+        # Inspects each entry's executable once every file is in
+        self.detector = detector
+        self._entries = []
+        self.rebuild_index = rebuild_index
+        self.workers = workers
+        # Every directory walked, subdirectories included, for the watcher
+        self.scanned_dirs = []
+        # Per-file DEBUG lines; off unless the log level asks for them
+        self.trace = trace
+        self.signals = ScanSignals()
+        self._cancelled = False
+        self.sandbox_detected = False
+        # Python keeps the worker alive for its result; don't let Qt delete it
+        self.setAutoDelete(False)
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def run(self):
+        # finished always follows, or the editor would wait on this scan forever
+        complete = False
+        try:
+            complete = self.scan()
+        except Exception as e:
+            self.signals.log.emit(f"[SCAN] [ERROR] Scan failed: {type(e).__name__}: {e}", logging.ERROR)
+        finally:
+            self.signals.finished.emit(not complete, self.sandbox_detected)
+
+    def scan(self):
+        """Stream every entry back; returns False if cancelled before the end."""
+        started = time.perf_counter()
+        signals = self.signals
+        if self.detector is not None:
+            # Binaries are re-resolved and re-checked against the index on every full scan
+            self.detector.forget()
+        if self.index is None:
+            self.index = ScanIndex() if self.rebuild_index else ScanIndex.load()
+        index = self.index
+        if index.load_error:
+            signals.log.emit(f"[CACHE] Scan index unusable ({index.load_error}), rebuilding.",
+                             logging.WARNING)
+            index.load_error = None
+        index.begin_scan()
+
+        listings = []
+        for directory in self.directories:
+            if self._cancelled: break
+            if not os.path.exists(directory): continue
+            
+            # [SECURE] Ensure we don't follow symlinks for directories unless explicitly desired, 
+            # though here we just read. 
+            signals.log.emit(f"[SCAN] Reading: {directory}", logging.INFO)
+            listed = time.perf_counter()
+            try:
+                tree = list_tree(directory, index, cancelled=self.is_cancelled)
+            except PermissionError:
+                signals.log.emit(f"   -> [ERROR] Permission Denied: {directory}", logging.WARNING)
+                continue
+            except OSError as e:
+                signals.log.emit(f"   -> [ERROR] {str(e)}", logging.WARNING)
+                continue
+            list_ms = (time.perf_counter() - listed) * 1000
+            METRICS.record("scan.list_dir", list_ms)
+            count = sum(len(names) for _, names, _, _ in tree)
+            signals.log.emit(f"   -> Found {count} .desktop files"
+                             + (f" in {len(tree)} directories" if len(tree) > 1 else "")
+                             + f" ({list_ms:.1f} ms).", logging.INFO)
+            if directory == "/usr/share/applications" and count < 10:
+                self.sandbox_detected = True
+            listings.extend(tree)
+        self.scanned_dirs = [listing[0] for listing in listings]
+
+        total = sum(len(names) for _, names, _, _ in listings)
+        signals.progress.emit(0, total)
+        try:
+            self.stream_entries(listings, index, self.workers, total)
+        except (OSError, RuntimeError) as e:
+            if self.workers <= 1:
+                raise
+            # Re-emitted rows simply replace the ones already delivered
+            signals.log.emit(f"[SCAN] Parallel scan failed ({e}), retrying serially.", logging.WARNING)
+            self.stream_entries(listings, index, 1, total)
+        if self._cancelled:
+            return False
+
+        if self.detector is not None:
+            self.detector.index = index
+            with METRICS.timer("scan.toolkits"):
+                self.detector.detect_all(self._entries, cancelled=self.is_cancelled)
+        if self._cancelled:
+            return False
+        index.prune()
+        try:
+            with METRICS.timer("scan.index_save"):
+                index.save()
+        except OSError as e:
+            signals.log.emit(f"[CACHE] Could not write scan index: {e}", logging.WARNING)
+        METRICS.record("scan.total", (time.perf_counter() - started) * 1000)
+        return True
+
+    def stream_entries(self, listings, index, workers, total):
+        METRICS.count("scan.files", total)
+        done = 0
+        for batch in iter_entries(listings, index, workers, chunk_size=self.BATCH_SIZE,
+                                  cancelled=self.is_cancelled):
+            done += len(batch)
+            self._entries.extend(entry for _, entry in batch)
+            if self.trace:
+                self.signals.log.emit("\n".join(f"   [FILE] {entry.path}" for _, entry in batch),
+                                      logging.DEBUG)
+            self.signals.batch.emit(batch)
+            self.signals.progress.emit(done, total)
+
+# --- BULK EDITS ---
+class BulkSignals(QObject):
+    progress = Signal(int, int)          # done, total
+    finished = Signal(list, int, str)    # paths written or removed, unchanged, error ("" if none)
+
+class BulkWorker(QRunnable):
+    """Applies one bulk edit (or removal) to many entries off the GUI thread.
+
+    Every override is prepared in memory first; if any entry fails nothing
+    is written. The files are then committed as one transaction, so a
+    failed rename rolls the whole batch back.
+    """
+    PROGRESS_EVERY = 25
+
+    def __init__(self, entries, bulk_edit, removals, user_dir, cache=None):
+        super().__init__()
+        self.entries = entries
+        self.bulk_edit = bulk_edit
+        self.removals = removals
+        self.user_dir = user_dir
+        self.cache = cache
+        self.signals = BulkSignals()
+        self.setAutoDelete(False)
+
+    def progress(self, done, total):
+        if done % self.PROGRESS_EVERY == 0 or done == total:
+            self.signals.progress.emit(done, total)
+
+    def run(self):
+        files, unchanged, errors = {}, 0, []
+        if self.bulk_edit is not None:
+            with METRICS.timer("bulk.plan"):
+                files, unchanged, errors = plan_edit(self.entries, self.bulk_edit, self.user_dir,
+                                                     self.cache, self.progress)
+        if errors:
+            details = "\n".join(f"{entry_id}: {message}" for entry_id, message in errors[:20])
+            more = f"\n... and {len(errors) - 20} more" if len(errors) > 20 else ""
+            self.signals.finished.emit([], unchanged, f"{len(errors)} entries could not be edited, "
+                                       f"nothing was written:\n{details}{more}")
+            return
+        try:
+            commit(files, self.removals, self.user_dir)
+        except OSError as e:
+            self.signals.finished.emit([], unchanged, f"Writing failed, all changes were rolled back:\n{e}")
+            return
+        self.signals.finished.emit(list(files) + list(self.removals), unchanged, "")
+
+# --- VALIDATION ---
+class ValidateSignals(QObject):
+    finished = Signal(object, int, float)    # {path: issues}, entries checked afresh, ms
+
+class ValidateWorker(QRunnable):
+    """Validates every listed entry off the GUI thread (see dotdesktop.validate).
+
+    The cache is only used from this thread while the worker runs; files
+    whose stat key and Exec binary are unchanged are not checked again.
+    """
+
+    def __init__(self, entries, cache=None, rebuild=False, workers=1):
+        super().__init__()
+        self.entries = entries
+        self.cache = cache
+        self.rebuild = rebuild
+        self.workers = workers
+        self.signals = ValidateSignals()
+        self.setAutoDelete(False)
+
+    def run(self):
+        started = time.perf_counter()
+        if self.cache is None:
+            self.cache = ValidationCache.load()
+        if self.rebuild:
+            self.cache.clear()
+        with METRICS.timer("validate.total"):
+            problems, checked = validate_entries(self.entries, self.cache, self.workers)
+        try:
+            self.cache.save()
+        except OSError:
+            pass
+        self.signals.finished.emit(problems, checked, (time.perf_counter() - started) * 1000)
+
+class ValidationPanel(QWidget):
+    """Problems found by the last validation run, one row per issue.
+
+    Double-clicking a row opens the entry in the editor.
+    """
+    COLUMNS = ["Severity", "Entry", "Problem", "File"]
+    entry_activated = Signal(str)            # path
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        top = QHBoxLayout()
+        self.summary_label = QLabel("Not validated yet.")
+        top.addWidget(self.summary_label, 1)
+        self.errors_only = QCheckBox("Errors only")
+        self.errors_only.toggled.connect(lambda _checked: self.show_results(self.rows))
+        top.addWidget(self.errors_only)
+        self.validate_btn = QPushButton("Validate")
+        self.validate_btn.setToolTip("Check entries changed since the last run")
+        top.addWidget(self.validate_btn)
+        self.revalidate_btn = QPushButton("Revalidate All")
+        self.revalidate_btn.setToolTip("Forget cached results and check every entry again")
+        top.addWidget(self.revalidate_btn)
+        layout.addLayout(top)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSortingEnabled(True)
+        self.table.cellDoubleClicked.connect(
+            lambda row, _column: self.entry_activated.emit(self.table.item(row, 3).text()))
+        layout.addWidget(self.table)
+        self.rows = []
+
+    def set_running(self, running):
+        self.validate_btn.setEnabled(not running)
+        self.revalidate_btn.setEnabled(not running)
+        if running:
+            self.summary_label.setText("Validating...")
+
+    def show_results(self, rows, summary=None):
+        """``rows`` is ``[(severity, desktop ID, message, path)]``."""
+        self.rows = rows
+        if summary is not None:
+            self.summary_label.setText(summary)
+        if self.errors_only.isChecked():
+            rows = [row for row in rows if row[0] == "error"]
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            for c, text in enumerate(row):
+                item = QTableWidgetItem(text)
+                if c == 0:
+                    item.setForeground(AppListDelegate.PROBLEM_COLORS[text])
+                self.table.setItem(r, c, item)
+        self.table.setSortingEnabled(True)
+
+# --- TEST RUN ---
+def readiness_mode(marker):
+    """How a launch counts as ready: "marker", "window" (X11, needs xdotool) or "idle"."""
+    if marker:
+        return "marker"
+    if os.environ.get("DISPLAY") and shutil.which("xdotool"):
+        return "window"
+    return "idle"
+
+class LaunchProfiler(QObject):
+    """Runs one command under QProcess and measures its startup.
+
+    stdout and stderr are forwarded line by line as they arrive. Readiness
+    is judged one way per run (see readiness_mode): the marker text showing
+    up in the output, xdotool finding a visible window with the process's
+    PID, or the process tree going idle (below IDLE_CPU of a core for
+    IDLE_MS) after it has used some CPU. Memory and CPU of the whole tree
+    are sampled from /proc every SAMPLE_MS until it exits.
+
+    With ``stop_after_ms`` the tree is ended that long after readiness, or
+    at ``timeout_ms`` without it, so runs can be repeated back to back.
+
+    A ``detached`` run is not tied to the editor: it is started with
+    subprocess.Popen in its own session (QProcess would kill it when the
+    editor exits) and its output goes to unnamed files that are tailed on
+    every sample, so it never writes into a closed pipe. detach() stops
+    watching it and leaves it running.
+    """
+    SAMPLE_MS = 100
+    IDLE_MS = 500
+    IDLE_CPU = 0.2
+    KILL_AFTER_MS = 2000
+    MAX_LINE = 4096
+    output = Signal(str, int)            # line, logging level
+    ready = Signal(float)                # ms from start
+    finished = Signal(object)            # LaunchResult
+
+    def __init__(self, label, args, marker="", timeout_ms=20000, stop_after_ms=None, detached=False,
+                 parent=None):
+        super().__init__(parent)
+        self.result = LaunchResult(label, args)
+        self.detached = detached
+        self.popen = None
+        self.logs = {}                   # channel -> output file being tailed (detached runs)
+        self.marker = marker
+        self.mode = readiness_mode(marker)
+        self.timeout_ms = timeout_ms
+        self.stop_after_ms = stop_after_ms
+        self.started = None
+        self.stopping = False
+        self.last_cpu = 0.0
+        self.last_busy = None
+        self.partial = {}                # channel -> unterminated output
+        self.probe = None
+        self.process = QProcess(self)
+        # [SECURE] The program is executed directly, never through a shell
+        self.process.setProgram(args[0])
+        self.process.setArguments(args[1:])
+        self.process.readyReadStandardOutput.connect(
+            lambda: self.read_output("out", self.process.readAllStandardOutput()))
+        self.process.readyReadStandardError.connect(
+            lambda: self.read_output("err", self.process.readAllStandardError()))
+        self.process.errorOccurred.connect(self.on_error)
+        self.process.finished.connect(self.on_finished)
+        self.sampler = QTimer(self)
+        self.sampler.setInterval(self.SAMPLE_MS)
+        self.sampler.timeout.connect(self.on_sample)
+        self.stop_timer = QTimer(self)
+        self.stop_timer.setSingleShot(True)
+        self.stop_timer.timeout.connect(self.stop)
+        self.kill_timer = QTimer(self)
+        self.kill_timer.setSingleShot(True)
+        self.kill_timer.timeout.connect(lambda: self.signal_tree(signal.SIGKILL))
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.last_busy = self.started
+        if self.detached:
+            self.start_detached()
+        else:
+            self.process.start()
+        self.sampler.start()
+
+    def start_detached(self):
+        writers = {}
+        try:
+            for channel in ("out", "err"):
+                fd, path = tempfile.mkstemp(prefix="dotdesktop-run-")
+                writers[channel] = os.fdopen(fd, "wb")
+                self.logs[channel] = open(path, "rb")
+                # Unnamed from here on; gone once neither side has it open
+                os.remove(path)
+            # [SECURE] The program is executed directly, never through a shell
+            self.popen = subprocess.Popen(self.result.args, stdin=subprocess.DEVNULL,
+                                          stdout=writers["out"], stderr=writers["err"],
+                                          start_new_session=True)
+        except OSError as e:
+            self.result.status = "failed"
+            self.result.error = str(e)
+            QTimer.singleShot(0, self.finish)
+        finally:
+            for fh in writers.values():
+                fh.close()
+
+    def pid(self):
+        if not self.detached:
+            return self.process.processId()
+        return self.popen.pid if self.popen is not None else 0
+
+    def is_running(self):
+        if not self.detached:
+            return self.process.state() != QProcess.NotRunning
+        return self.popen is not None and self.popen.poll() is None
+
+    def read_logs(self):
+        for channel, fh in self.logs.items():
+            data = fh.read()
+            if data:
+                self.read_output(channel, data)
+
+    def detach(self):
+        """Stop watching the program and leave it running; for closing windows."""
+        if self.result.status is not None: return
+        self.sampler.stop()
+        self.read_logs()
+        for fh in self.logs.values():
+            fh.close()
+        self.logs = {}
+        self.output.emit(f"[TEST] {self.result.label} left running (PID {self.pid()}).",
+                         logging.INFO)
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def mark_ready(self, ms, how):
+        if self.result.ready_ms is not None: return
+        self.result.ready_ms = ms
+        self.result.ready_by = how
+        self.ready.emit(ms)
+        if self.stop_after_ms is not None:
+            self.stop_timer.start(self.stop_after_ms)
+
+    def read_output(self, channel, data):
+        text = self.partial.pop(channel, "") + bytes(data).decode("utf-8", "replace")
+        lines = text.split("\n")
+        # A line without its newline yet waits for the rest (bounded)
+        if len(lines[-1]) < self.MAX_LINE:
+            self.partial[channel] = lines.pop()
+        for line in lines:
+            if self.mode == "marker" and self.marker in line:
+                self.mark_ready(self.elapsed_ms(), "marker")
+            self.output.emit(f"[{channel.upper()}] {line.rstrip()}", logging.INFO)
+
+    def on_sample(self):
+        if self.detached:
+            self.read_logs()
+            if self.popen is not None and not self.is_running():
+                code = self.popen.returncode
+                # A negative code is the signal that ended it
+                self.on_finished(code, QProcess.CrashExit if code < 0 else QProcess.NormalExit)
+                return
+        pid = self.pid()
+        if not pid: return
+        rss, cpu = sample(process_tree(pid))
+        self.result.peak_rss_kib = max(self.result.peak_rss_kib, rss)
+        now = time.perf_counter()
+        if self.result.ready_ms is None:
+            if self.mode == "idle":
+                if cpu - self.last_cpu >= self.IDLE_CPU * self.SAMPLE_MS / 1000:
+                    self.last_busy = now
+                elif cpu > 0 and (now - self.last_busy) * 1000 >= self.IDLE_MS:
+                    self.mark_ready((self.last_busy - self.started) * 1000, "idle")
+            elif self.mode == "window" and self.probe is None:
+                self.probe_window(pid)
+            if self.result.ready_ms is None and self.stop_after_ms is not None \
+                    and self.elapsed_ms() >= self.timeout_ms:
+                self.output.emit(f"[TEST] No readiness after {self.timeout_ms / 1000:.0f} s, stopping.",
+                                 logging.WARNING)
+                self.stop()
+        self.last_cpu = cpu
+
+    def probe_window(self, pid):
+        self.probe = QProcess(self)
+        self.probe.finished.connect(functools.partial(self.on_probe_finished, self.probe))
+        self.probe.start("xdotool", ["search", "--onlyvisible", "--pid", str(pid)])
+
+    def on_probe_finished(self, probe, exit_code, exit_status):
+        if exit_code == 0 and probe.readAllStandardOutput().trimmed():
+            self.mark_ready(self.elapsed_ms(), "window")
+        probe.deleteLater()
+        self.probe = None
+
+    def stop(self):
+        """End the process tree: SIGTERM now, SIGKILL if still running after KILL_AFTER_MS."""
+        if not self.is_running() or self.stopping: return
+        self.stopping = True
+        self.signal_tree(signal.SIGTERM)
+        self.kill_timer.start(self.KILL_AFTER_MS)
+
+    def shutdown(self):
+        """stop() and wait for the tree to end; for closing windows."""
+        if self.detached:
+            self.detach()
+            return
+        self.stop()
+        if not self.process.waitForFinished(self.KILL_AFTER_MS):
+            self.signal_tree(signal.SIGKILL)
+            self.process.waitForFinished(1000)
+
+    def signal_tree(self, signum):
+        pid = self.pid()
+        if not pid: return
+        # Children first, so a launcher cannot respawn them
+        for child in reversed(process_tree(pid)):
+            try:
+                os.kill(child, signum)
+            except OSError:
+                pass
+
+    def on_error(self, error):
+        if error == QProcess.FailedToStart:
+            self.result.status = "failed"
+            self.result.error = self.process.errorString()
+            self.finish()
+
+    def on_finished(self, exit_code, exit_status):
+        for channel in list(self.partial):
+            if self.partial[channel]:
+                self.read_output(channel, b"\n")
+        self.result.exit_code = exit_code
+        if self.stopping:
+            self.result.status = "stopped"
+        else:
+            self.result.status = "crashed" if exit_status == QProcess.CrashExit else "exited"
+        self.finish()
+
+    def finish(self):
+        for fh in self.logs.values():
+            fh.close()
+        self.logs = {}
+        self.sampler.stop()
+        self.stop_timer.stop()
+        self.kill_timer.stop()
+        if self.probe is not None:
+            self.probe.kill()
+        self.finished.emit(self.result)
+
+class LaunchCompareDialog(QDialog):
+    """Runs an Exec line several times as is and under each preset, side by side.
+
+    Runs are interleaved (original, preset 1, ..., original, ...) so drift
+    such as a warming disk cache does not favour one variant. Each run is
+    ended STOP_AFTER_MS after it becomes ready.
+    """
+    STOP_AFTER_MS = 1000
+    COLUMNS = ["Variant", "Runs", "Ready p50 ms", "Min ms", "Max ms", "Peak RSS p50 MiB", "Not ready"]
+
+    def __init__(self, variants, log, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Compare Presets")
+        self.resize(820, 420)
+        self.variants = variants         # [(label, args)]
+        self.log = log
+        self.results = []
+        self.queue = []
+        self.profiler = None
+        self.next_timer = QTimer(self)
+        self.next_timer.setSingleShot(True)
+        self.next_timer.timeout.connect(self.run_next)
+        layout = QVBoxLayout(self)
+
+        options = QHBoxLayout()
+        options.addWidget(QLabel("Runs per variant:"))
+        self.runs_spin = QSpinBox()
+        self.runs_spin.setRange(1, 50)
+        self.runs_spin.setValue(5)
+        options.addWidget(self.runs_spin)
+        options.addWidget(QLabel("Timeout (s):"))
+        self.timeout_spin = QSpinBox()
+        self.timeout_spin.setRange(1, 300)
+        self.timeout_spin.setValue(20)
+        options.addWidget(self.timeout_spin)
+        self.marker_edit = QLineEdit()
+        self.marker_edit.setPlaceholderText("Readiness marker in output (optional)")
+        self.marker_edit.textChanged.connect(lambda _text: self.show_mode())
+        options.addWidget(self.marker_edit, 1)
+        layout.addLayout(options)
+
+        self.status_label = QLabel()
+        self.status_label.setStyleSheet("color: #888;")
+        layout.addWidget(self.status_label)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch()
+        self.start_btn = QPushButton("Start")
+        self.start_btn.clicked.connect(self.start)
+        self.stop_btn = QPushButton("Stop")
+        self.stop_btn.setEnabled(False)
+        self.stop_btn.clicked.connect(self.stop)
+        buttons.addWidget(self.start_btn)
+        buttons.addWidget(self.stop_btn)
+        layout.addLayout(buttons)
+        self.show_mode()
+
+    def show_mode(self):
+        mode = readiness_mode(self.marker_edit.text())
+        hint = {"marker": "first output line containing the marker",
+                "window": "first visible X11 window of the process (xdotool)",
+                "idle": f"process tree idle for {LaunchProfiler.IDLE_MS} ms "
+                        "(set a marker, or install xdotool on X11, for a sharper signal)"}[mode]
+        self.status_label.setText(f"{len(self.variants)} variants. Ready = {hint}.")
+
+    def start(self):
+        self.results = []
+        self.queue = [variant for _ in range(self.runs_spin.value()) for variant in self.variants]
+        self.total = len(self.queue)
+        self.start_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+        self.refresh()
+        self.run_next()
+
+    def run_next(self):
+        if not self.queue:
+            self.profiler = None
+            self.start_btn.setEnabled(True)
+            self.stop_btn.setEnabled(False)
+            self.status_label.setText(f"Done: {len(self.results)} runs.")
+            return
+        label, args = self.queue.pop(0)
+        self.status_label.setText(f"Run {len(self.results) + 1} / {self.total}: {label}")
+        profiler = LaunchProfiler(label, args, self.marker_edit.text(), self.timeout_spin.value() * 1000,
+                                  self.STOP_AFTER_MS, self)
+        profiler.finished.connect(self.on_run_finished)
+        self.profiler = profiler
+        profiler.start()
+
+    def on_run_finished(self, result):
+        self.profiler.deleteLater()
+        self.results.append(result)
+        self.log(f"[COMPARE] {result.label} #{sum(r.label == result.label for r in self.results)}: "
+                 f"{result.describe()}")
+        self.refresh()
+        # Let the previous tree's exit settle before timing the next one
+        self.next_timer.start(200)
+
+    def stop(self):
+        self.queue = []
+        if self.profiler is not None:
+            self.profiler.stop()
+
+    def refresh(self):
+        def ms(value):
+            return f"{value:.0f}" if value is not None else "-"
+        rows = summarize(self.results)
+        self.table.setRowCount(len(rows))
+        for r, (label, runs, p50, low, high, rss, failed) in enumerate(rows):
+            cells = [label, str(runs), ms(p50), ms(low), ms(high),
+                     f"{rss / 1024:.1f}" if rss is not None else "-", str(failed)]
+            for c, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if c:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(r, c, item)
+
+    def reject(self):
+        # Closing the dialog ends the run in progress
+        self.queue = []
+        self.next_timer.stop()
+        if self.profiler is not None:
+            self.profiler.shutdown()
+        super().reject()
+
+# --- DESKTOP DATABASE ---
+class CacheUpdateSignals(QObject):
+    finished = Signal(object, int, str, float)   # MIME types changed, files, error ("" if none), ms
+
+class CacheUpdateWorker(QRunnable):
+    """Updates a directory's mimeinfo.cache off the GUI thread (see dotdesktop.mimeinfo).
+
+    A missing or malformed cache means a rebuild that reads every file in
+    the directory; ``index`` lets it reuse the scan's records.
+    """
+
+    def __init__(self, directory, paths, index=None):
+        super().__init__()
+        self.directory = directory
+        self.paths = paths
+        self.index = index
+        self.result = None
+        self.signals = CacheUpdateSignals()
+        self.setAutoDelete(False)
+
+    def run(self):
+        started = time.perf_counter()
+        try:
+            changed, error = update_cache(self.directory, self.paths, self.index), ""
+        except OSError as e:
+            changed, error = set(), str(e)
+        # Kept for flush(), which cannot wait for the queued signal
+        self.result = (changed, len(self.paths), error, (time.perf_counter() - started) * 1000)
+        self.signals.finished.emit(*self.result)
+
+class DesktopDatabaseUpdater(QObject):
+    """Keeps the directory's mimeinfo.cache up to date, coalescing requests.
+
+    Each request names the files that changed and restarts a short quiet
+    period; when it ends, the cache lines of those entries are updated on
+    a worker thread (see CacheUpdateWorker). update-desktop-database is
+    only run if that fails. Requests made while either is running trigger
+    one more refresh after it finishes.
+    """
+    log = Signal(str, int)
+
+    def __init__(self, directory, quiet_ms=750, parent=None):
+        super().__init__(parent)
+        self.directory = directory
+        self.paths = set()      # files changed since the last refresh
+        self.index = None       # scan index a rebuild may reuse
+        self.pending = False    # the external tool is needed
+        self.started_at = None
+        self.worker = None
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(quiet_ms)
+        self.timer.timeout.connect(self.run)
+        self.process = QProcess(self)
+        self.process.finished.connect(self.on_finished)
+        self.process.errorOccurred.connect(self.on_error)
+
+    def request(self, paths, index=None):
+        self.paths.update(paths)
+        if index is not None:
+            self.index = index
+        self.timer.start()
+
+    def is_running(self):
+        return self.worker is not None or self.process.state() != QProcess.NotRunning
+
+    def run(self):
+        if self.is_running():
+            return
+        if self.paths:
+            paths, self.paths = self.paths, set()
+            worker = CacheUpdateWorker(self.directory, paths, self.index)
+            worker.signals.finished.connect(functools.partial(self.on_cache_updated, worker))
+            self.worker = worker
+            self.pool.start(worker)
+            return
+        if not self.pending:
+            return
+        # [SECURE] Use full path if possible or verify command exists
+        program = QStandardPaths.findExecutable("update-desktop-database")
+        self.pending = False
+        if not program:
+            self.log.emit("update-desktop-database not found in PATH.", logging.WARNING)
+            return
+        self.started_at = time.monotonic()
+        self.process.start(program, [self.directory])
+
+    def on_cache_updated(self, worker, changed, files, error, elapsed_ms):
+        if worker is not self.worker: return
+        self.worker = None
+        if error:
+            self.log.emit(f"[DB] could not update mimeinfo.cache ({error}); "
+                          "falling back to update-desktop-database", logging.WARNING)
+            self.pending = True
+            self.run()
+        else:
+            self.log.emit(f"[DB] mimeinfo.cache: {len(changed)} MIME types updated for "
+                          f"{files} files in {elapsed_ms:.1f} ms", logging.INFO)
+        if self.paths and not self.timer.isActive():
+            self.timer.start()
+
+    def on_finished(self, exit_code, exit_status):
+        elapsed = (time.monotonic() - self.started_at) * 1000
+        if exit_status == QProcess.CrashExit:
+            self.log.emit(f"[DB] update-desktop-database crashed after {elapsed:.0f} ms", logging.ERROR)
+        else:
+            self.log.emit(f"[DB] update-desktop-database exited {exit_code} in {elapsed:.0f} ms",
+                          logging.INFO if exit_code == 0 else logging.WARNING)
+        if self.paths and not self.timer.isActive():
+            self.timer.start()
+
+    def on_error(self, error):
+        if error == QProcess.FailedToStart:
+            self.log.emit(f"[DB] update-desktop-database failed to start: {self.process.errorString()}",
+                          logging.ERROR)
+
+    def wait(self, timeout_ms):
+        worker = self.worker
+        if worker is not None:
+            self.pool.waitForDone(timeout_ms)
+            if worker.result is not None:
+                self.on_cache_updated(worker, *worker.result)
+        if self.process.state() != QProcess.NotRunning:
+            self.process.waitForFinished(timeout_ms)
+
+    def flush(self, timeout_ms=5000):
+        """Finish any running or pending refresh before returning (used on exit)."""
+        self.timer.stop()
+        self.wait(timeout_ms)
+        while (self.paths or self.pending) and not self.is_running():
+            self.run()
+            self.wait(timeout_ms)
+        self.timer.stop()
+
+# --- LOGGING ---
+class LogSink(QObject):
+    """Buffered, bounded log view.
+
+    Lines below ``level`` are dropped on entry. The rest go into a ring
+    buffer of ``max_lines`` and are appended to ``view`` in one block every
+    FLUSH_MS, so a burst of messages costs one layout instead of one per
+    line. The view keeps at most ``max_lines`` blocks and only follows the
+    end while the user is scrolled to the bottom. With ``logger`` every
+    accepted line is mirrored there too (see setup_log_file).
+    """
+    FLUSH_MS = 100
+
+    def __init__(self, view, max_lines=5000, level=logging.INFO, logger=None, parent=None):
+        super().__init__(parent)
+        self.view = view
+        self.view.setMaximumBlockCount(max_lines)
+        self.level = level
+        self.logger = logger
+        self.buffer = deque(maxlen=max_lines)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.FLUSH_MS)
+        self.timer.timeout.connect(self.flush)
+
+    def enabled(self, level):
+        return level >= self.level
+
+    def write(self, message, level=logging.INFO):
+        if level < self.level:
+            return
+        self.buffer.append(message)
+        if self.logger is not None:
+            self.logger.log(level, message)
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        self.timer.stop()
+        if not self.buffer:
+            return
+        sb = self.view.verticalScrollBar()
+        at_bottom = sb.value() == sb.maximum()
+        text = "\n".join(self.buffer)
+        self.buffer.clear()
+        self.view.appendPlainText(text)
+        if at_bottom:
+            sb.setValue(sb.maximum())
+
+    def clear(self):
+        self.buffer.clear()
+        self.view.clear()
+
+
+def setup_log_file(path, level=logging.INFO, max_bytes=1024 * 1024, backups=3):
+    """Logger that writes to ``path``, rotating after ``max_bytes``."""
+    logger = logging.getLogger("dotdesktop")
+    handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups,
+                                                   encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+    return logger
+
+
+def write_profile(profiler, path):
+    """Dump ``profiler`` to ``path`` and a readable summary plus METRICS to ``path``.txt."""
+    import io
+    import pstats
+
+    profiler.dump_stats(path)
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(40)
+    with open(path + ".txt", "w", encoding="utf-8") as fh:
+        fh.write(METRICS.report() + "\n\n" + summary.getvalue())
+
+
+class PerformancePanel(QWidget):
+    """Live table of METRICS: p50/p95/max per timer and counter values.
+
+    Refreshes every REFRESH_MS while it is on screen; Copy puts the plain
+    text report on the clipboard for bug reports.
+    """
+    REFRESH_MS = 1000
+    COLUMNS = ["Metric", "Calls / Count", "p50 ms", "p95 ms", "Max ms", "Total ms"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setStyleSheet("background-color: #1e1e1e; font-family: monospace;")
+        layout.addWidget(self.table)
+        buttons = QHBoxLayout()
+        reset_btn = QPushButton("Reset")
+        reset_btn.clicked.connect(self.reset)
+        copy_btn = QPushButton("Copy Report")
+        copy_btn.clicked.connect(lambda: QApplication.clipboard().setText(METRICS.report()))
+        buttons.addStretch()
+        buttons.addWidget(reset_btn)
+        buttons.addWidget(copy_btn)
+        layout.addLayout(buttons)
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.REFRESH_MS)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        self.refresh()
+        self.timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def reset(self):
+        METRICS.reset()
+        self.refresh()
+
+    def refresh(self):
+        timers, counters = METRICS.snapshot()
+        rows = [(name, str(calls), f"{p50:.2f}", f"{p95:.2f}", f"{peak:.2f}", f"{total:.1f}")
+                for name, calls, p50, p95, peak, total in timers]
+        rows += [(name, str(value), "", "", "", "") for name, value in counters]
+        self.table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            for c, text in enumerate(row):
+                item = self.table.item(r, c)
+                if item is None:
+                    item = QTableWidgetItem()
+                    if c:
+                        item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                    self.table.setItem(r, c, item)
+                item.setText(text)
+
+
 class DesktopEntryEditor(QMainWindow):
-    def __init__(self):
+    def __init__(self, rebuild_index=False, scan_workers=1, log_level=logging.INFO, log_file=None,
+                 log_lines=5000):
         super().__init__()
         self.setWindowTitle("DotDesktop - Secure Desktop Entry Editor")
         self.resize(1200, 850)
         self.apply_modern_theme()
         
         self.current_file_path = None
+        self.current_id = None
         self.is_user_override = False
-        self.config = None
+        self.document = None
+        # Form values as loaded; a save only writes the keys that differ
+        self.loaded_values = {}
+        # Loaded by the first scan; --rebuild-index starts from an empty one
+        self.index = None
+        self.rebuild_index = rebuild_index
+        self.scan_workers = scan_workers
+        self.scan_pool = QThreadPool()
+        self.scan_pool.setMaxThreadCount(1)
+        self.scan_worker = None
+        # Cancelled scans still running; kept referenced until they finish
+        self.cancelled_scans = set()
+        self.pending_select_path = None
+        self.pending_batches = []
+        self.resolver = EntryResolver([])
+        self.toolkits = ToolkitDetector()
+        # Directory change notifications are debounced so bursts (package
+        # upgrades) become one incremental rescan
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.on_directory_changed)
+        self.changed_dirs = set()
+        self.watch_deadline = None
+        self.watch_timer = QTimer(self)
+        self.watch_timer.setSingleShot(True)
+        self.watch_timer.timeout.connect(self.flush_changed_dirs)
+        # Scan batches are applied to the model at most every 100 ms
+        self.batch_timer = QTimer(self)
+        self.batch_timer.setSingleShot(True)
+        self.batch_timer.setInterval(100)
+        self.batch_timer.timeout.connect(self.flush_scan_batches)
+        # Saves and deletes in quick succession share one database refresh
+        self.db_updater = DesktopDatabaseUpdater(USER_DIR, parent=self)
+        self.db_updater.log.connect(self.log)
+        # Searching waits for a pause in typing
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.filter_list)
+        # The form follows the selection once it has been still for a frame,
+        # so holding an arrow key does not refill it on every row
+        self.select_timer = QTimer(self)
+        self.select_timer.setSingleShot(True)
+        self.select_timer.setInterval(16)
+        self.select_timer.timeout.connect(lambda: self.load_selected_app(self.app_list.currentIndex()))
+        # Files around the selection are read ahead so Save does not wait on disk
+        self.document_cache = DocumentCache()
+        self.prefetch_pool = QThreadPool(self)
+        self.prefetch_pool.setMaxThreadCount(1)
+        # Bulk edits are prepared and written on their own thread, one at a time
+        self.bulk_pool = QThreadPool(self)
+        self.bulk_pool.setMaxThreadCount(1)
+        self.bulk_worker = None
+        # Supervised Test Run processes, measured until they exit
+        self.test_runs = []
+        # Every listed entry is validated after a scan; unchanged ones come from the cache
+        self.validation_cache = None
+        self.validate_pool = QThreadPool(self)
+        self.validate_pool.setMaxThreadCount(1)
+        self.validate_worker = None
+        self.validate_pending = None      # rebuild flag of a run requested while one is going
         
         main_widget = QWidget()
         self.setCentralWidget(main_widget)
@@ -121,18 +1525,83 @@ class DesktopEntryEditor(QMainWindow):
         left_layout.setContentsMargins(0, 0, 5, 0)
         
         self.search_bar = QLineEdit()
-        self.search_bar.setPlaceholderText("Search applications...")
-        self.search_bar.textChanged.connect(self.filter_list)
+        self.search_bar.setPlaceholderText("Search applications...  (cat:Development exec:electron)")
+        self.search_bar.setToolTip("Matches Name, GenericName, Keywords, Exec, Categories and filename.\n"
+                                   "Restrict a term with name:, generic:, kw:, file:, cat: or exec:.")
+        self.search_bar.textChanged.connect(lambda _text: self.search_timer.start())
+        self.search_bar.returnPressed.connect(self.filter_list)
         left_layout.addWidget(self.search_bar)
         
-        self.app_list = QListWidget()
-        self.app_list.setItemDelegate(AppListDelegate())
+        self.app_model = AppListModel(USER_DIR, self, detector=self.toolkits)
+        self.app_list = QListView()
+        self.app_list.setModel(self.app_model)
+        self.icon_cache = IconCache(device_pixel_ratio=self.devicePixelRatioF(), parent=self)
+        self.icon_cache.icon_ready.connect(self.on_icon_ready)
+        self.list_delegate = AppListDelegate(self.icon_cache, self.app_list)
+        self.list_delegate.watch_model(self.app_model)
+        self.app_list.setItemDelegate(self.list_delegate)
+        # All rows are 60px high, so the view never measures off-screen rows
+        self.app_list.setUniformItemSizes(True)
+        self.app_list.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.app_list.setFrameShape(QFrame.NoFrame)
-        self.app_list.currentItemChanged.connect(self.load_selected_app)
+        self.app_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.app_list.selectionModel().currentChanged.connect(lambda *_: self.select_timer.start())
+        self.app_list.selectionModel().selectionChanged.connect(lambda *_: self.update_bulk_panel())
         left_layout.addWidget(self.app_list)
         
+        # Shown while more than one entry is selected (Ctrl/Shift+click)
+        self.bulk_group = QGroupBox("Bulk Edit")
+        bulk_layout = QVBoxLayout()
+        self.bulk_label = QLabel()
+        bulk_layout.addWidget(self.bulk_label)
+        hide_row = QHBoxLayout()
+        bulk_hide_btn = QPushButton("Hide (NoDisplay)")
+        bulk_hide_btn.clicked.connect(lambda: self.bulk_edit(set_hidden(True)))
+        bulk_show_btn = QPushButton("Show")
+        bulk_show_btn.clicked.connect(lambda: self.bulk_edit(set_hidden(False)))
+        hide_row.addWidget(bulk_hide_btn)
+        hide_row.addWidget(bulk_show_btn)
+        bulk_layout.addLayout(hide_row)
+        preset_row = QHBoxLayout()
+        self.bulk_preset_combo = QComboBox()
+        for preset in PRESETS:
+            self.bulk_preset_combo.addItem(preset.label, preset.name)
+        bulk_preset_btn = QPushButton("Inject")
+        bulk_preset_btn.setFixedWidth(80)
+        bulk_preset_btn.clicked.connect(
+            lambda: self.bulk_edit(inject_preset(PRESETS[self.bulk_preset_combo.currentIndex()])))
+        preset_row.addWidget(self.bulk_preset_combo, 1)
+        preset_row.addWidget(bulk_preset_btn)
+        bulk_layout.addLayout(preset_row)
+        category_row = QHBoxLayout()
+        self.bulk_categories_edit = QLineEdit()
+        self.bulk_categories_edit.setPlaceholderText("Categories to add, e.g. Development;Utility;")
+        bulk_categories_btn = QPushButton("Add")
+        bulk_categories_btn.setFixedWidth(80)
+        bulk_categories_btn.clicked.connect(self.bulk_add_categories)
+        category_row.addWidget(self.bulk_categories_edit, 1)
+        category_row.addWidget(bulk_categories_btn)
+        bulk_layout.addLayout(category_row)
+        self.bulk_delete_btn = QPushButton("Delete User Overrides")
+        self.bulk_delete_btn.setStyleSheet("QPushButton { background-color: #c0392b; color: white; border: none; padding: 6px; border-radius: 6px; } QPushButton:hover { background-color: #e74c3c; }")
+        self.bulk_delete_btn.clicked.connect(self.bulk_delete_overrides)
+        bulk_layout.addWidget(self.bulk_delete_btn)
+        self.bulk_progress = QProgressBar()
+        self.bulk_progress.setFormat("Preparing %v / %m")
+        self.bulk_progress.setVisible(False)
+        bulk_layout.addWidget(self.bulk_progress)
+        self.bulk_group.setLayout(bulk_layout)
+        self.bulk_group.setVisible(False)
+        left_layout.addWidget(self.bulk_group)
+        
+        self.scan_progress = QProgressBar()
+        self.scan_progress.setFormat("Scanning %v / %m")
+        self.scan_progress.setVisible(False)
+        left_layout.addWidget(self.scan_progress)
+        
         refresh_btn = QPushButton("Refresh List")
-        refresh_btn.clicked.connect(self.scan_applications)
+        refresh_btn.setToolTip("Rescan all application directories (cancels a running scan)")
+        refresh_btn.clicked.connect(lambda: self.scan_applications())
         left_layout.addWidget(refresh_btn)
         
         splitter.addWidget(left_panel)
@@ -156,6 +1625,13 @@ class DesktopEntryEditor(QMainWindow):
         self.info_label.setAlignment(Qt.AlignCenter)
         self.info_label.setStyleSheet("font-size: 16px; font-weight: bold; color: #888; margin-bottom: 5px;")
         self.right_layout.addWidget(self.info_label)
+        # Lower precedence files with the same desktop ID, from the resolver
+        self.shadow_label = QLabel()
+        self.shadow_label.setAlignment(Qt.AlignCenter)
+        self.shadow_label.setWordWrap(True)
+        self.shadow_label.setStyleSheet("color: #999; font-size: 11px;")
+        self.shadow_label.setVisible(False)
+        self.right_layout.addWidget(self.shadow_label)
         
         # Core Info
         core_group = QGroupBox("Core Information")
@@ -194,7 +1670,14 @@ class DesktopEntryEditor(QMainWindow):
         test_run_btn.setIcon(QIcon.fromTheme("media-playback-start"))
         test_run_btn.setFixedWidth(120)
         test_run_btn.clicked.connect(self.test_run_app)
-        exec_row.addWidget(test_run_btn)
+        compare_btn = QPushButton("Compare Presets")
+        compare_btn.setToolTip("Launch repeatedly as is and under each preset; compare startup time and memory")
+        compare_btn.setFixedWidth(120)
+        compare_btn.clicked.connect(self.compare_presets)
+        run_buttons = QVBoxLayout()
+        run_buttons.addWidget(test_run_btn)
+        run_buttons.addWidget(compare_btn)
+        exec_row.addLayout(run_buttons)
         
         exec_layout.addLayout(exec_row)
         
@@ -206,14 +1689,9 @@ class DesktopEntryEditor(QMainWindow):
         
         preset_layout = QHBoxLayout()
         self.preset_combo = QComboBox()
-        self.preset_combo.addItems([
-            "Select a preset to apply...",                          
-            "Force Wayland (Electron Apps) -> --ozone-platform=wayland", 
-            "Force Wayland (GTK Apps) -> env GDK_BACKEND=wayland",       
-            "Force Wayland (Qt Apps) -> env QT_QPA_PLATFORM=wayland",     
-            "Force Wayland (Firefox) -> env MOZ_ENABLE_WAYLAND=1",        
-            "Force X11/Xorg (Generic) -> env GDK_BACKEND=x11 QT_QPA_PLATFORM=xcb" 
-        ])
+        self.preset_combo.addItem("Select a preset to apply...")
+        for preset in PRESETS:
+            self.preset_combo.addItem(preset.label, preset.name)
         apply_preset_btn = QPushButton("Inject")
         apply_preset_btn.setFixedWidth(80)
         apply_preset_btn.clicked.connect(self.apply_preset)
@@ -235,6 +1713,13 @@ class DesktopEntryEditor(QMainWindow):
         meta_layout = QVBoxLayout()
         self.categories_edit = self.create_field("Categories (semicolon separated):", meta_layout)
         self.mime_edit = self.create_field("MimeTypes (File Associations):", meta_layout)
+        # Other entries handling the same types, from the model's MIME index
+        self.mime_handlers_label = QLabel()
+        self.mime_handlers_label.setWordWrap(True)
+        self.mime_handlers_label.setStyleSheet("color: #999; font-size: 11px;")
+        self.mime_handlers_label.setVisible(False)
+        meta_layout.addWidget(self.mime_handlers_label)
+        self.mime_edit.textChanged.connect(self.show_mime_handlers)
         
         check_layout = QHBoxLayout()
         self.nodisplay_check = QCheckBox("Hide from App Menu (NoDisplay)")
@@ -268,12 +1753,21 @@ class DesktopEntryEditor(QMainWindow):
         self.tabs.addTab(editor_tab, "Editor")
         
         # LOGS
-        self.log_view = QTextEdit()
+        self.log_view = QPlainTextEdit()
         self.log_view.setReadOnly(True)
         self.log_view.setStyleSheet("background-color: #1e1e1e; color: #00ff00; font-family: monospace; padding: 10px;")
         self.tabs.addTab(self.log_view, "Scan Logs")
+        self.validation_panel = ValidationPanel()
+        self.validation_panel.validate_btn.clicked.connect(lambda: self.validate_all())
+        self.validation_panel.revalidate_btn.clicked.connect(lambda: self.validate_all(rebuild=True))
+        self.validation_panel.entry_activated.connect(self.show_entry)
+        self.tabs.addTab(self.validation_panel, "Validation")
+        self.tabs.addTab(PerformancePanel(), "Performance")
+        logger = setup_log_file(log_file, log_level) if log_file else None
+        self.log_sink = LogSink(self.log_view, log_lines, log_level, logger, parent=self)
         
-        self.scan_applications()
+        # Start scanning once the event loop runs so the window shows first
+        QTimer.singleShot(0, self.scan_applications)
 
     def apply_modern_theme(self):
         self.setStyleSheet("""
@@ -284,9 +1778,9 @@ class DesktopEntryEditor(QMainWindow):
             QTabBar::tab:selected { background: #2d2d2d; color: #fff; border-bottom: 2px solid #3584e4; }
             QLineEdit, QComboBox, QPlainTextEdit { background-color: #383838; border: 1px solid #4a4a4a; border-radius: 6px; padding: 8px; color: white; }
             QLineEdit:focus, QComboBox:focus, QPlainTextEdit:focus { border: 1px solid #3584e4; background-color: #404040; }
-            QListWidget { background-color: #2d2d2d; border: 1px solid #3d3d3d; border-radius: 6px; outline: none; }
-            QListWidget::item { border-bottom: 1px solid #383838; }
-            QListWidget::item:selected { background-color: #3584e4; color: white; }
+            QListView { background-color: #2d2d2d; border: 1px solid #3d3d3d; border-radius: 6px; outline: none; }
+            QListView::item { border-bottom: 1px solid #383838; }
+            QListView::item:selected { background-color: #3584e4; color: white; }
             QPushButton { background-color: #444; border: 1px solid #555; border-radius: 6px; padding: 6px 12px; color: white; }
             QPushButton:hover { background-color: #555; }
             QPushButton:pressed { background-color: #333; }
@@ -297,10 +1791,8 @@ class DesktopEntryEditor(QMainWindow):
             QCheckBox { spacing: 8px; color: #ddd; }
         """)
 
-    def log(self, message):
-        self.log_view.append(message)
-        sb = self.log_view.verticalScrollBar()
-        sb.setValue(sb.maximum())
+    def log(self, message, level=logging.INFO):
+        self.log_sink.write(message, level)
 
     def create_field(self, label_text, parent_layout):
         container = QWidget()
@@ -329,133 +1821,293 @@ class DesktopEntryEditor(QMainWindow):
             layout.addWidget(widget)
         parent_layout.addWidget(container)
 
-    def scan_applications(self):
-        self.app_list.clear()
-        self.desktop_files = {} 
-        self.log_view.clear()
+    def scan_applications(self, select_path=None):
+        self.cancel_scan()
+        self.app_model.clear()
+        self.pending_batches = []
+        self.batch_timer.stop()
+        self.pending_select_path = select_path
+        self.log_sink.clear()
         self.log("--- STARTING SCAN ---")
         
-        sandbox_detected = False
-        
-        for directory in SEARCH_DIRS:
-            if not os.path.exists(directory): continue
-            
-            # [SECURE] Ensure we don't follow symlinks for directories unless explicitly desired, 
-            # though here we just read. 
-            self.log(f"[SCAN] Reading: {directory}")
-            try:
-                files = os.listdir(directory)
-                count = 0
-                for f in files:
-                    if f.endswith(".desktop"):
-                        full_path = os.path.join(directory, f)
-                        # [SECURE] Validate that full_path is inside the directory (basic check)
-                        if os.path.dirname(full_path) == directory:
-                            self.desktop_files[f] = full_path
-                            count += 1
-                self.log(f"   -> Found {count} .desktop files.")
-                
-                if directory == "/usr/share/applications" and count < 10:
-                    sandbox_detected = True
-
-            except PermissionError:
-                self.log(f"   -> [ERROR] Permission Denied: {directory}")
-        
-        # Scan User Directory
+        # Scan User Directory last so its overrides win
         if not os.path.exists(USER_DIR):
             os.makedirs(USER_DIR, mode=0o700) # [SECURE] Create with strict permissions
-            
+        
+        directories = SEARCH_DIRS + [USER_DIR]
+        self.resolver = EntryResolver(directories)
+        self.watch_directories(directories)
+        worker = ScanWorker(directories, self.index, self.rebuild_index, self.scan_workers,
+                            trace=self.log_sink.enabled(logging.DEBUG), detector=self.toolkits)
+        self.rebuild_index = False
+        worker.signals.log.connect(self.log)
+        worker.signals.batch.connect(functools.partial(self.on_scan_batch, worker))
+        worker.signals.progress.connect(functools.partial(self.on_scan_progress, worker))
+        worker.signals.finished.connect(functools.partial(self.on_scan_finished, worker))
+        self.scan_worker = worker
+        self.scan_progress.setRange(0, 0)
+        self.scan_progress.setVisible(True)
+        self.scan_pool.start(worker)
+
+    def cancel_scan(self):
+        worker = self.scan_worker
+        if worker is None:
+            return
+        # Not waited for: the worker stops at its next check (between
+        # directories, files or binaries) and its late signals are ignored.
+        # A new scan queues behind it on the one-thread pool.
+        worker.cancel()
+        self.cancelled_scans.add(worker)
+        self.index = worker.index
+        self.scan_worker = None
+        self.scan_progress.setVisible(False)
+
+    def on_scan_batch(self, worker, batch):
+        if worker is not self.scan_worker: return
+        for entry_id, entry in batch:
+            self.resolver.add(entry)
+        self.pending_batches.append(batch)
+        if not self.batch_timer.isActive():
+            self.batch_timer.start()
+
+    def flush_scan_batches(self):
+        batches, self.pending_batches = self.pending_batches, []
+        if batches:
+            with METRICS.timer("list.apply_batches"):
+                self.refresh_list(lambda: [self.app_model.update_entries(b) for b in batches])
+        if self.pending_select_path:
+            index = self.index_for_path(self.pending_select_path)
+            if index.isValid():
+                self.pending_select_path = None
+                self.app_list.setCurrentIndex(index)
+
+    def refresh_list(self, change):
+        """Apply ``change`` to the model, keeping the current row if it is still listed.
+
+        The model resets when its row set changes; the current row is put back
+        without signals so an edited form is not reloaded. If a higher
+        precedence file replaced the entry being edited, it is reloaded.
+        """
+        selection = self.app_list.selectionModel()
+        current = self.app_list.currentIndex()
+        if self.select_timer.isActive() and current.isValid():
+            # A row picked (e.g. by show_entry) but not loaded yet is the one to keep
+            entry_id = current.data(FileRole)
+        else:
+            entry_id = self.current_id if self.current_file_path else None
+        selection.blockSignals(True)
         try:
-            files = os.listdir(USER_DIR)
-            for f in files:
-                if f.endswith(".desktop"):
-                    self.desktop_files[f] = os.path.join(USER_DIR, f) 
-        except Exception as e:
-            self.log(f"   -> [ERROR] {str(e)}")
-                
-        # Populate List
-        for filename, path in sorted(self.desktop_files.items()):
-            name = self.get_app_name(path)
-            item = QListWidgetItem() 
-            item.setData(Qt.UserRole, path)
-            item.setData(Qt.UserRole + 1, name)
-            item.setData(Qt.UserRole + 2, filename)
-            is_override = path.startswith(USER_DIR)
-            item.setData(Qt.UserRole + 3, is_override)
-            item.setData(Qt.UserRole + 4, self.get_icon_name(path))
-            item.setText(f"{name} {filename}") 
-            self.app_list.addItem(item)
-            
-        if sandbox_detected:
+            change()
+            index = self.app_model.index_for_name(entry_id) if entry_id else QModelIndex()
+            # Re-setting an unchanged current row would collapse a multi-selection
+            if index.isValid() and index != self.app_list.currentIndex():
+                self.app_list.setCurrentIndex(index)
+        finally:
+            selection.blockSignals(False)
+        self.app_list.viewport().update()
+        if index.isValid() and index.data(PathRole) != self.current_file_path:
+            self.load_selected_app(index)
+
+    def on_scan_progress(self, worker, done, total):
+        if worker is not self.scan_worker: return
+        self.scan_progress.setRange(0, total)
+        self.scan_progress.setValue(done)
+
+    def on_scan_finished(self, worker, cancelled, sandbox_detected):
+        if worker is not self.scan_worker:
+            self.cancelled_scans.discard(worker)
+            return
+        self.batch_timer.stop()
+        self.flush_scan_batches()
+        self.index = worker.index
+        self.scan_worker = None
+        self.scan_progress.setVisible(False)
+        self.pending_select_path = None
+        self.watch_directories(worker.scanned_dirs)
+        self.log(f"--- SCAN {'CANCELLED' if cancelled else 'COMPLETE'}: {self.app_model.entry_count()} entries ---")
+        # Badges and the suggestion for the open entry now reflect the inspected binaries
+        self.list_delegate.invalidate()
+        self.app_list.viewport().update()
+        current = self.app_list.currentIndex()
+        if current.isValid() and current.data(PathRole) == self.current_file_path:
+            self.show_detected_toolkit(current.data(ToolkitRole))
+        if self.changed_dirs:
+            self.watch_timer.start(0)
+        if not cancelled:
+            self.validate_all()
+        if sandbox_detected and not cancelled:
             QMessageBox.warning(self, "Sandbox Detected", "Running inside a Sandbox. Some system paths are inaccessible.")
 
-    def get_app_name(self, path):
-        try:
-            cfg = configparser.ConfigParser(interpolation=None)
-            cfg.read(path)
-            if "Desktop Entry" in cfg:
-                return cfg["Desktop Entry"].get("Name", os.path.basename(path))
-        except Exception:
-            pass
-        return os.path.basename(path)
+    # --- INCREMENTAL UPDATES ---
+    WATCH_DEBOUNCE_MS = 300
+    WATCH_MAX_DELAY_MS = 2000
 
-    def get_icon_name(self, path):
-        try:
-            cfg = configparser.ConfigParser(interpolation=None)
-            cfg.read(path)
-            if "Desktop Entry" in cfg:
-                return cfg["Desktop Entry"].get("Icon", None)
-        except Exception:
-            pass
-        return None
+    def watch_directories(self, directories):
+        # Directories that do not exist yet are not watched; Refresh picks them up
+        missing = [d for d in directories if os.path.isdir(d) and d not in self.watcher.directories()]
+        if missing:
+            self.watcher.addPaths(missing)
+
+    def on_directory_changed(self, directory):
+        now = time.monotonic()
+        if not self.changed_dirs:
+            self.watch_deadline = now + self.WATCH_MAX_DELAY_MS / 1000
+        self.changed_dirs.add(directory)
+        # Wait for a quiet period, but never past the deadline of the first change
+        remaining = max(0, int((self.watch_deadline - now) * 1000))
+        self.watch_timer.start(min(self.WATCH_DEBOUNCE_MS, remaining))
 
-    def filter_list(self, text):
-        for i in range(self.app_list.count()):
-            item = self.app_list.item(i)
-            item.setHidden(text.lower() not in item.text().lower())
-
-    def guess_toolkit(self, entry):
-        exec_cmd = entry.get("Exec", "").lower()
-        categories = entry.get("Categories", "")
-        
-        if any(k in exec_cmd for k in ["electron", "discord", "slack", "obsidian", "vscode", "code"]):
-            return 1, "Electron/Chromium"
-        if any(k in exec_cmd for k in ["firefox", "librewolf", "thunderbird"]):
-            return 4, "Firefox (Gecko)"
-        if "Qt" in categories or "KDE" in categories:
-            return 3, "Qt/KDE"
-        if "GTK" in categories or "GNOME" in categories:
-            return 2, "GTK/GNOME"
-        return 0, "Unknown"
-
-    def load_selected_app(self, current, previous):
-        if not current:
+    def flush_changed_dirs(self):
+        # A running scan owns the index; on_scan_finished flushes afterwards
+        if self.scan_worker is not None or not self.changed_dirs: return
+        changed_dirs, self.changed_dirs = self.changed_dirs, set()
+        # A change in a subdirectory rescans its tree; unchanged subdirectories cost a stat
+        directories = {d if d in self.resolver.directories else self.resolver.root_for(d)
+                       for d in changed_dirs} - {None}
+        affected = set()
+        walked = []
+        for directory in sorted(directories):
+            previous = self.resolver.directory_entries(directory)
+            try:
+                current, changed, tree = rescan_directory(directory, previous, self.index)
+                walked.extend(tree)
+            except OSError:
+                current, changed = {}, set(previous)
+            self.resolver.set_directory(directory, current)
+            affected |= changed
+            if changed:
+                self.log(f"[WATCH] {directory}: {len(changed)} entries changed")
+                if self.log_sink.enabled(logging.DEBUG):
+                    self.log("\n".join(f"   [FILE] {f}" for f in sorted(changed)), logging.DEBUG)
+        # Deleted and recreated directories drop out of the watcher
+        self.watch_directories(self.resolver.directories + walked)
+        self.apply_resolved(affected)
+
+    def reload_paths(self, paths):
+        """Re-read just ``paths`` (or note their removal) and patch the list."""
+        if self.scan_worker is not None:
+            self.scan_applications()
+            return
+        affected = set()
+        for path in paths:
+            if os.path.exists(path):
+                affected.add(self.resolver.add(read_entry(path, self.index)))
+            else:
+                affected.add(self.resolver.remove(path))
+        self.apply_resolved(affected - {None})
+
+    def apply_resolved(self, filenames):
+        if not filenames: return
+        updates = []
+        removed = []
+        for filename in sorted(filenames):
+            entry = self.resolver.winner(filename)
+            if entry is None:
+                removed.append(filename)
+            else:
+                updates.append((filename, entry))
+
+        # Few entries change at a time; their binaries are usually known already
+        self.toolkits.index = self.index
+        self.toolkits.detect_all(entry for _, entry in updates)
+
+        def change():
+            self.app_model.update_entries(updates)
+            self.app_model.remove_entries(removed)
+        self.refresh_list(change)
+        self.validate_all()
+        self.show_mime_handlers()
+        if self.current_file_path and not self.app_list.currentIndex().isValid() \
+                and not self.app_model.filter_text:
+            # The entry being edited is gone from every directory
+            self.current_file_path = None
+            self.right_panel.setEnabled(False)
+
+    def on_icon_ready(self, icon_source):
+        # Many icons arrive at once while scrolling; update() coalesces repaints
+        self.app_list.viewport().update()
+
+    def changeEvent(self, event):
+        # Sent when the platform theme, including the icon theme, changes
+        if event.type() == QEvent.ThemeChange:
+            self.icon_cache.invalidate()
+            self.app_list.viewport().update()
+        super().changeEvent(event)
+
+    def closeEvent(self, event):
+        self.cancel_scan()
+        # The index is saved below, so the cancelled scan must be done with it
+        self.scan_pool.waitForDone()
+        self.icon_cache.shutdown()
+        self.select_timer.stop()
+        self.prefetch_pool.clear()
+        self.prefetch_pool.waitForDone()
+        # A bulk write in progress is finished, never cut short
+        self.bulk_pool.waitForDone()
+        self.validate_pool.waitForDone()
+        # Test Runs are left running; only watching them stops
+        for profiler in list(self.test_runs):
+            profiler.detach()
+        self.db_updater.flush()
+        self.log_sink.flush()
+        if self.index is not None:
+            try:
+                self.index.save()
+            except OSError:
+                pass
+        super().closeEvent(event)
+
+    @METRICS.timed("search.filter")
+    def filter_list(self):
+        self.search_timer.stop()
+        text = self.search_bar.text()
+        self.refresh_list(lambda: self.app_model.set_filter(text))
+
+    def prefetch_documents(self, row):
+        rows = [r for r in (row, row + 1, row - 1) if 0 <= r < self.app_model.rowCount()]
+        paths = [self.app_model.index(r).data(PathRole) for r in rows]
+        # Only the latest neighbourhood matters; drop reads queued for older ones
+        self.prefetch_pool.clear()
+        self.prefetch_pool.start(functools.partial(self.document_cache.prefetch, paths))
+
+    def show_detected_toolkit(self, toolkit):
+        if toolkit:
+            self.detected_label.setText(f"Auto-detected toolkit: {TOOLKITS[toolkit][0]}")
+        else:
+            self.detected_label.setText("Toolkit not detected automatically.")
+
+    @METRICS.timed("editor.load_selected")
+    def load_selected_app(self, current):
+        if not current.isValid():
             self.right_panel.setEnabled(False)
             return
             
-        path = current.data(Qt.UserRole)
+        path = current.data(PathRole)
         self.current_file_path = path
+        self.current_id = current.data(FileRole)
         self.right_panel.setEnabled(True)
-        self.is_user_override = path.startswith(USER_DIR)
+        self.is_user_override = self.resolver.root_for(path) == USER_DIR
         
         if self.is_user_override:
-            self.info_label.setText(f"Editing: {os.path.basename(path)} (User Override)")
+            self.info_label.setText(f"Editing: {self.current_id} (User Override)")
             self.info_label.setStyleSheet("color: #57e389; font-weight: bold; font-size: 14px;")
             self.restore_btn.setVisible(True)
         else:
-            self.info_label.setText(f"Editing: {os.path.basename(path)} (System Default)")
+            self.info_label.setText(f"Editing: {self.current_id} (System Default)")
             self.info_label.setStyleSheet("color: #e0e0e0; font-weight: bold; font-size: 14px;")
             self.restore_btn.setVisible(False)
+        shadowed = self.resolver.shadowed(self.current_id)
+        self.shadow_label.setText("Overrides: " + ", ".join(e.path for e in shadowed))
+        self.shadow_label.setToolTip(path)
+        self.shadow_label.setVisible(bool(shadowed))
 
-        self.config = configparser.ConfigParser(interpolation=None)
-        self.config.optionxform = str 
+        # The full document is only needed on save; the form is filled
+        # from the record parsed during the scan.
+        self.document = None
+        self.loaded_values = {}
         
         try:
-            self.config.read(path)
-            if "Desktop Entry" not in self.config:
-                self.config["Desktop Entry"] = {}
-                
-            entry = self.config["Desktop Entry"]
+            entry = self.current_record(path, current.data(EntryRole))
             
             self.name_edit.setText(entry.get("Name", ""))
             self.comment_edit.setText(entry.get("Comment", ""))
@@ -471,12 +2123,67 @@ class DesktopEntryEditor(QMainWindow):
             idx = self.terminal_check.findText(term)
             if idx >= 0: self.terminal_check.setCurrentIndex(idx)
             
-            preset_idx, toolkit = self.guess_toolkit(entry)
-            self.preset_combo.setCurrentIndex(preset_idx)
-            self.detected_label.setText(f"Auto-detected toolkit: {toolkit}" if preset_idx > 0 else "Toolkit not detected automatically.")
+            toolkit = current.data(ToolkitRole)
+            self.preset_combo.setCurrentIndex(
+                self.preset_combo.findData(TOOLKITS[toolkit][1]) if toolkit else 0)
+            self.show_detected_toolkit(toolkit)
+            self.loaded_values = self.form_values()
             
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to parse desktop file:\n{str(e)}")
+        self.prefetch_documents(current.row())
+
+    def current_record(self, path, entry):
+        """``entry`` if the file at ``path`` is unchanged since it was indexed, else the file parsed again.
+
+        An edit made outside the editor without touching the directory does
+        not reach the list, and a form filled from the old record would save
+        the old values back over it.
+        """
+        try:
+            key = stat_key(os.stat(path))
+        except OSError:
+            key = None
+        if entry is not None and key is not None and self.index is not None \
+                and self.index.cached_entry(path, key) is entry:
+            return entry
+        return parse_desktop_entry(path)
+
+    def form_values(self):
+        """``{key: value}`` of the form fields, as they would be saved."""
+        return {
+            "Name": self.name_edit.text(),
+            "Comment": self.comment_edit.text(),
+            "Exec": self.exec_edit.toPlainText().replace("\n", " ").strip(),
+            "Icon": self.icon_edit.text(),
+            "Categories": self.categories_edit.text(),
+            "MimeType": self.mime_edit.text(),
+            "Terminal": self.terminal_check.currentText(),
+            "NoDisplay": "true" if self.nodisplay_check.isChecked() else "false",
+            "StartupNotify": "true" if self.startup_check.isChecked() else "false",
+        }
+
+    MIME_HANDLERS_SHOWN = 5
+
+    def show_mime_handlers(self):
+        """List the other entries that handle the types in the MimeType field."""
+        by_handler = {}
+        lines = []
+        for mime_type in mime_types(self.mime_edit.text()):
+            others = [i for i in self.app_model.mime_handlers(mime_type) if i != self.current_id]
+            for entry_id in others:
+                by_handler[entry_id] = by_handler.get(entry_id, 0) + 1
+            if others:
+                more = f" and {len(others) - 20} more" if len(others) > 20 else ""
+                lines.append(f"{mime_type}: {', '.join(others[:20])}{more}")
+        # Entries sharing the most types first
+        ranked = sorted(by_handler, key=lambda i: (-by_handler[i], i))
+        shown = [f"{i} ({by_handler[i]})" for i in ranked[:self.MIME_HANDLERS_SHOWN]]
+        if len(ranked) > len(shown):
+            shown.append(f"{len(ranked) - len(shown)} more")
+        self.mime_handlers_label.setText("Also handled by: " + ", ".join(shown))
+        self.mime_handlers_label.setToolTip("\n".join(lines))
+        self.mime_handlers_label.setVisible(bool(ranked))
 
     def browse_icon(self):
         fname, _ = QFileDialog.getOpenFileName(self, "Select Icon", "/usr/share/icons", "Images (*.png *.svg *.xpm *.ico);;All Files (*)")
@@ -487,125 +2194,233 @@ class DesktopEntryEditor(QMainWindow):
         idx = self.preset_combo.currentIndex()
         if idx == 0: return
         
-        current_exec = self.exec_edit.toPlainText().strip()
-        new_exec = current_exec
-        
-        if idx == 1 and "--ozone-platform=wayland" not in new_exec:
-            if "%" in new_exec:
-                parts = new_exec.split("%", 1)
-                new_exec = f"{parts[0].strip()} --ozone-platform=wayland %{parts[1]}"
-            else:
-                new_exec = f"{new_exec} --ozone-platform=wayland"
-        elif idx == 2 and "GDK_BACKEND" not in new_exec:
-            new_exec = f"env GDK_BACKEND=wayland {new_exec}"
-        elif idx == 3 and "QT_QPA_PLATFORM" not in new_exec:
-            new_exec = f"env QT_QPA_PLATFORM=wayland {new_exec}"
-        elif idx == 4 and "MOZ_ENABLE_WAYLAND" not in new_exec:
-            new_exec = f"env MOZ_ENABLE_WAYLAND=1 {new_exec}"
-        elif idx == 5 and "xcb" not in new_exec:
-            new_exec = f"env GDK_BACKEND=x11 QT_QPA_PLATFORM=xcb {new_exec}"
-        
-        self.exec_edit.setPlainText(new_exec)
+        preset = PRESETS[idx - 1]
+        self.exec_edit.setPlainText(preset.apply(self.exec_edit.toPlainText()))
         QMessageBox.information(self, "Updated", "Exec command updated. Review it before saving!")
 
+    def launch_args(self, cmd):
+        """Argument list for running ``cmd``, or None after telling the user why not."""
+        try:
+            args = exec_args(cmd)
+        except ValueError as ve:
+            QMessageBox.critical(self, "Parse Error", f"Command parsing failed (unbalanced quotes?):\n{str(ve)}")
+            return None
+        if not args: return None
+        # [SECURE] Verify executable exists in path
+        if not shutil.which(args[0]):
+            QMessageBox.warning(self, "Security/Error", f"Executable not found in PATH: {args[0]}")
+            return None
+        return args
+
     def test_run_app(self):
         cmd = self.exec_edit.toPlainText().strip()
         if not cmd: return
         
-        # [SECURE] Clean up XDG placeholders which cannot be processed without a shell/launcher
-        clean_cmd = cmd.replace("%u", "").replace("%U", "").replace("%f", "").replace("%F", "") \
-                       .replace("%i", "").replace("%c", "").replace("%k", "").strip()
-        
-        self.log(f"[TEST] Preparing to launch: {clean_cmd}")
-        
-        try:
-            # [SECURE] Use shlex to parse command line correctly without using shell=True
-            args = shlex.split(clean_cmd)
-            if not args: return
-            
-            # [SECURE] Verify executable exists in path
-            executable = shutil.which(args[0])
-            if not executable:
-                 QMessageBox.warning(self, "Security/Error", f"Executable not found in PATH: {args[0]}")
-                 return
-                 
-            # [SECURE] Run without shell to prevent injection
-            subprocess.Popen(args, shell=False)
-            
-            QMessageBox.information(self, "Test Run", f"Launched safely:\n{args}")
-        except ValueError as ve:
-             QMessageBox.critical(self, "Parse Error", f"Command parsing failed (unbalanced quotes?):\n{str(ve)}")
-        except Exception as e:
-            QMessageBox.critical(self, "Launch Error", str(e))
+        self.log(f"[TEST] Preparing to launch: {strip_field_codes(cmd)}")
+        args = self.launch_args(cmd)
+        if args is None: return
+        # [SECURE] Run without shell to prevent injection
+        # Detached: the program keeps running after the editor closes
+        profiler = LaunchProfiler(self.current_id or "test", args, detached=True, parent=self)
+        profiler.output.connect(self.log)
+        profiler.ready.connect(lambda ms: self.log(f"[TEST] Ready after {ms:.0f} ms ({profiler.mode})"))
+        profiler.finished.connect(functools.partial(self.on_test_run_finished, profiler))
+        self.test_runs.append(profiler)
+        profiler.start()
+        QMessageBox.information(self, "Test Run", f"Launched safely:\n{args}\n\n"
+                                "Its output, startup time and memory use go to the Scan Logs tab.")
 
-    def update_desktop_db(self):
-        # [SECURE] Use full path if possible or verify command exists
-        if shutil.which("update-desktop-database"):
-            subprocess.run(["update-desktop-database", USER_DIR], check=False)
-        else:
-            self.log("update-desktop-database not found in PATH.")
+    def on_test_run_finished(self, profiler, result):
+        self.log(f"[TEST] {result.label}: {result.describe()}",
+                 logging.INFO if result.status == "exited" and not result.exit_code else logging.WARNING)
+        self.test_runs.remove(profiler)
+        profiler.deleteLater()
+
+    def compare_presets(self):
+        cmd = self.exec_edit.toPlainText().replace("\n", " ").strip()
+        if not cmd: return
+        variants = []
+        for label, variant in [("original", cmd)] + [(p.name, p.apply(cmd)) for p in PRESETS]:
+            if variant in (v for _, v in variants):
+                continue
+            args = self.launch_args(variant)
+            if args is None: return
+            variants.append((label, variant))
+        dialog = LaunchCompareDialog([(label, exec_args(v)) for label, v in variants], self.log, self)
+        dialog.setAttribute(Qt.WA_DeleteOnClose)
+        dialog.show()
+
+    def update_desktop_db(self, paths):
+        self.db_updater.request(paths, self.index)
 
+    @METRICS.timed("editor.save")
     def save_entry(self):
-        if not self.config: return
+        if not self.current_file_path: return
+        
+        try:
+            self.document = read_document(self.current_file_path, self.document_cache)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to parse desktop file:\n{str(e)}")
+            return
         
         # [SECURE] Basic Input Sanitization
-        entry = self.config["Desktop Entry"]
-        entry["Name"] = self.name_edit.text()
-        entry["Comment"] = self.comment_edit.text()
-        entry["Exec"] = self.exec_edit.toPlainText().replace("\n", " ").strip() 
-        entry["Icon"] = self.icon_edit.text()
-        entry["Categories"] = self.categories_edit.text()
-        entry["MimeType"] = self.mime_edit.text()
-        entry["Terminal"] = self.terminal_check.currentText()
-        entry["NoDisplay"] = "true" if self.nodisplay_check.isChecked() else "false"
-        entry["StartupNotify"] = "true" if self.startup_check.isChecked() else "false"
+        entry = self.document["Desktop Entry"]
+        values = self.form_values()
+        try:
+            for key, value in values.items():
+                # Only fields the user changed are written, so untouched lines
+                # (and absent keys such as Terminal) stay as they are
+                if value == self.loaded_values.get(key):
+                    continue
+                if value or key in entry:
+                    entry[key] = value
+        except ValueError as e:
+            QMessageBox.critical(self, "Invalid Value", str(e))
+            return
         
         if "DBusActivatable" in entry: entry["DBusActivatable"] = "false"
         
-        filename = os.path.basename(self.current_file_path)
-        
-        # [SECURE] Path Traversal & Filename Validation
-        # Ensure filename contains only safe characters and no directory separators
-        if not filename or "/" in filename or "\\" in filename or filename in [".", ".."]:
-            QMessageBox.critical(self, "Security Error", "Invalid filename detected.")
+        try:
+            target_path = override_path(self.current_id, USER_DIR, self.current_file_path)
+        except ValueError as e:
+            QMessageBox.critical(self, "Security Error", str(e))
             return
-
-        target_path = os.path.join(USER_DIR, filename)
-        
-        # [SECURE] Prevent Symlink Hijacking
-        # Check if the target is already a symlink (attacker could place one there)
-        if os.path.exists(target_path) and os.path.islink(target_path):
-             QMessageBox.critical(self, "Security Error", 
-                                  "Target file is a symbolic link.\n"
-                                  "This is a security risk. Please delete it manually first.")
-             return
         
         try:
-            # [SECURE] Atomic Write Pattern
-            # 1. Write to a temporary file
-            temp_path = target_path + ".tmp"
-            with open(temp_path, 'w') as configfile:
-                self.config.write(configfile, space_around_delimiters=False)
-            
-            # 2. Set strict permissions (Read/Write for User, Read for others, No Execute)
-            os.chmod(temp_path, 0o644)
+            write_atomic(target_path, self.document.text())
+            self.loaded_values = values
             
-            # 3. Rename atomically (overwrites target if it exists, but safely)
-            os.replace(temp_path, target_path)
-            
-            self.update_desktop_db()
-            self.scan_applications()
+            self.update_desktop_db([target_path])
+            self.reload_paths([target_path])
             QMessageBox.information(self, "Saved", f"Configuration saved safely to:\n{target_path}")
             
-            items = self.app_list.findItems(f"{self.name_edit.text()} {filename}", Qt.MatchContains)
-            if items: self.app_list.setCurrentItem(items[0])
-            
         except Exception as e:
-            # Clean up temp file if it exists
-            if os.path.exists(target_path + ".tmp"):
-                os.remove(target_path + ".tmp")
             QMessageBox.critical(self, "Save Error", str(e))
 
+    # --- VALIDATION ---
+    def validate_all(self, rebuild=False):
+        """Validate every listed entry on the validation thread."""
+        if self.validate_worker is not None:
+            # One more run once this one is done covers whatever changed meanwhile
+            self.validate_pending = bool(self.validate_pending) or rebuild
+            return
+        if self.scan_worker is not None: return
+        entries = [entry for entry in self.app_model.store.entries if entry is not None]
+        worker = ValidateWorker(entries, self.validation_cache, rebuild, self.scan_workers)
+        worker.signals.finished.connect(functools.partial(self.on_validate_finished, worker))
+        self.validate_worker = worker
+        self.validation_panel.set_running(True)
+        self.validate_pool.start(worker)
+
+    def on_validate_finished(self, worker, problems, checked, elapsed_ms):
+        self.validation_cache = worker.cache
+        self.validate_worker = None
+        self.validation_panel.set_running(False)
+        self.app_model.set_problems(problems)
+        store = self.app_model.store
+        rows = []
+        for slot, entry in enumerate(store.entries):
+            if entry is None: continue
+            for severity, message in problems.get(entry.path, ()):
+                rows.append((severity, store.ids[slot], message, entry.path))
+        errors = sum(1 for row in rows if row[0] == "error")
+        summary = (f"{len(problems)} entries: {errors} errors, {len(rows) - errors} warnings "
+                   f"({checked} checked, {len(problems) - checked} unchanged, {elapsed_ms:.0f} ms)")
+        self.validation_panel.show_results(rows, summary)
+        self.log(f"[VALIDATE] {summary}")
+        if self.validate_pending is not None:
+            rebuild, self.validate_pending = self.validate_pending, None
+            self.validate_all(rebuild)
+
+    def index_for_path(self, path):
+        """List row of the file at ``path``; rows are keyed by desktop ID, not file name."""
+        root = self.resolver.root_for(path)
+        if root is None:
+            return QModelIndex()
+        return self.app_model.index_for_path(desktop_id(root, path), path)
+
+    def show_entry(self, path):
+        index = self.index_for_path(path)
+        if not index.isValid() and self.app_model.filter_text:
+            self.search_bar.clear()
+            self.filter_list()
+            index = self.index_for_path(path)
+        if index.isValid():
+            self.tabs.setCurrentIndex(0)
+            self.app_list.setCurrentIndex(index)
+            self.app_list.scrollTo(index)
+
+    # --- BULK EDITS ---
+    def selected_entries(self):
+        """``[(desktop ID, entry)]`` for the selected rows, in list order."""
+        rows = sorted(self.app_list.selectionModel().selectedRows(), key=QModelIndex.row)
+        return [(index.data(FileRole), index.data(EntryRole)) for index in rows]
+
+    def update_bulk_panel(self):
+        count = len(self.app_list.selectionModel().selectedRows())
+        self.bulk_group.setVisible(count > 1 or self.bulk_worker is not None)
+        if self.bulk_worker is None:
+            self.bulk_label.setText(f"{count} entries selected")
+
+    def bulk_edit(self, bulk_edit):
+        self.start_bulk(self.selected_entries(), bulk_edit, [])
+
+    def bulk_add_categories(self):
+        categories = self.bulk_categories_edit.text()
+        if not categories.strip(";").strip(): return
+        self.start_bulk(self.selected_entries(), add_categories(categories), [])
+
+    def bulk_delete_overrides(self):
+        # [SECURE] Only files inside the user directory are ever removed
+        removals = [entry.path for _, entry in self.selected_entries()
+                    if self.resolver.root_for(entry.path) == USER_DIR]
+        if not removals:
+            QMessageBox.information(self, "Bulk Edit", "None of the selected entries has a user override.")
+            return
+        ret = QMessageBox.question(self, "Confirm Restore",
+                                   f"Delete {len(removals)} custom overrides?",
+                                   QMessageBox.Yes | QMessageBox.No)
+        if ret == QMessageBox.Yes:
+            self.start_bulk([], None, removals)
+
+    def start_bulk(self, entries, bulk_edit, removals):
+        if self.bulk_worker is not None or not (entries or removals): return
+        label = bulk_edit.label if bulk_edit else "delete overrides"
+        self.log(f"[BULK] {label}: {len(entries) or len(removals)} entries")
+        worker = BulkWorker(entries, bulk_edit, removals, USER_DIR, self.document_cache)
+        worker.signals.progress.connect(self.on_bulk_progress)
+        worker.signals.finished.connect(self.on_bulk_finished)
+        self.bulk_worker = worker
+        self.bulk_group.setEnabled(False)
+        self.bulk_label.setText(f"Applying {label}...")
+        self.bulk_progress.setRange(0, len(entries))
+        self.bulk_progress.setValue(0)
+        self.bulk_progress.setVisible(bool(entries))
+        self.bulk_pool.start(worker)
+
+    def on_bulk_progress(self, done, total):
+        self.bulk_progress.setValue(done)
+
+    def on_bulk_finished(self, paths, unchanged, error):
+        self.bulk_worker = None
+        self.bulk_group.setEnabled(True)
+        self.bulk_progress.setVisible(False)
+        self.update_bulk_panel()
+        if error:
+            self.log(f"[BULK] {error}", logging.WARNING)
+            QMessageBox.critical(self, "Bulk Edit Failed", error)
+            return
+        self.log(f"[BULK] {len(paths)} files changed, {unchanged} already up to date")
+        if paths:
+            # One database refresh and one list update for the whole batch
+            self.update_desktop_db(paths)
+            current_path = self.current_file_path
+            self.reload_paths(paths)
+            # refresh_list reloads the form if the entry moved; reload it if only its file changed
+            current = self.app_list.currentIndex()
+            if current.isValid() and current_path in paths and current.data(PathRole) == current_path:
+                self.load_selected_app(current)
+
     def delete_override(self):
         if not self.is_user_override: return
         ret = QMessageBox.question(self, "Confirm Restore", 
@@ -614,18 +2429,45 @@ class DesktopEntryEditor(QMainWindow):
         if ret == QMessageBox.Yes:
             try:
                 # [SECURE] Path check again just to be safe
-                if os.path.dirname(self.current_file_path) != USER_DIR:
+                if self.resolver.root_for(self.current_file_path) != USER_DIR:
                      raise ValueError("Cannot delete files outside user directory.")
                      
                 os.remove(self.current_file_path)
-                self.update_desktop_db()
-                self.scan_applications()
+                self.update_desktop_db([self.current_file_path])
+                self.reload_paths([self.current_file_path])
                 QMessageBox.information(self, "Restored", "User override deleted.")
             except Exception as e:
                 QMessageBox.critical(self, "Error", str(e))
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = DesktopEntryEditor()
+    arg_parser = argparse.ArgumentParser(description="DotDesktop - Secure Desktop Entry Editor")
+    arg_parser.add_argument("--rebuild-index", action="store_true",
+                            help="ignore the cached scan index and reparse every entry")
+    arg_parser.add_argument("--scan-workers", type=int, default=1, metavar="N",
+                            help="parse entries in N worker processes (0 = one per CPU, default 1)")
+    arg_parser.add_argument("--log-level", default="info", choices=["debug", "info", "warning", "error"],
+                            help="lowest level shown in Scan Logs; debug adds one line per file")
+    arg_parser.add_argument("--log-file", metavar="PATH",
+                            help="also write the log to PATH, rotated at 1 MiB (3 backups kept)")
+    arg_parser.add_argument("--log-lines", type=int, default=5000, metavar="N",
+                            help="lines kept in the Scan Logs tab (default 5000)")
+    arg_parser.add_argument("--profile", metavar="PATH",
+                            help="write a cProfile dump of the GUI thread to PATH on exit "
+                                 "(read with python -m pstats PATH) and timings to PATH.txt")
+    args, qt_args = arg_parser.parse_known_args()
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    app = QApplication(sys.argv[:1] + qt_args)
+    window = DesktopEntryEditor(rebuild_index=args.rebuild_index,
+                                scan_workers=args.scan_workers or os.cpu_count() or 1,
+                                log_level=getattr(logging, args.log_level.upper()),
+                                log_file=args.log_file, log_lines=args.log_lines)
     window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    status = app.exec()
+    if profiler is not None:
+        profiler.disable()
+        write_profile(profiler, args.profile)
+    sys.exit(status)
\ No newline at end of file
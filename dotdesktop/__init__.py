@@ -0,0 +1 @@
+"""Qt-free core of DotDesktop: desktop entry parsing and scanning."""
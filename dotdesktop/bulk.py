@@ -0,0 +1,86 @@
+import os
+
+from .metrics import METRICS
+from .writer import override_path, read_document, write_batch
+
+
+class BulkEdit:
+    """A change to the [Desktop Entry] group of each selected entry.
+
+    ``edit(group)`` modifies a DocumentGroup in place and may raise
+    ValueError for an entry it cannot handle.
+    """
+
+    __slots__ = ("label", "edit")
+
+    def __init__(self, label, edit):
+        self.label = label
+        self.edit = edit
+
+
+def set_hidden(hidden):
+    value = "true" if hidden else "false"
+
+    def edit(desktop):
+        desktop["NoDisplay"] = value
+    return BulkEdit(f"NoDisplay={value}", edit)
+
+
+def inject_preset(preset):
+    def edit(desktop):
+        exec_cmd = desktop.get("Exec", "")
+        if not exec_cmd:
+            raise ValueError("no Exec= key")
+        desktop["Exec"] = preset.apply(exec_cmd)
+    return BulkEdit(preset.label, edit)
+
+
+def add_categories(categories):
+    added = [c.strip() for c in categories.split(";") if c.strip()]
+
+    def edit(desktop):
+        current = [c for c in desktop.get("Categories", "").split(";") if c]
+        missing = [c for c in added if c not in current]
+        if missing:
+            desktop["Categories"] = ";".join(current + missing) + ";"
+    return BulkEdit("Categories+=" + ";".join(added), edit)
+
+
+def plan_edit(entries, bulk_edit, user_dir, cache=None, progress=None):
+    """Overrides needed to apply ``bulk_edit`` to ``[(desktop ID, entry)]``.
+
+    Returns ``(files, unchanged, errors)``: ``{target_path: text}`` for the
+    entries the edit changes, how many it left as they were, and
+    ``[(desktop ID, message)]``. Nothing is written.
+    """
+    files = {}
+    unchanged = 0
+    errors = []
+    for done, (entry_id, entry) in enumerate(entries, 1):
+        try:
+            target_path = override_path(entry_id, user_dir, entry.path)
+            document = read_document(entry.path, cache)
+            before = document.text()
+            desktop = document["Desktop Entry"]
+            bulk_edit.edit(desktop)
+            if document.text() == before:
+                unchanged += 1
+            else:
+                # Same as a single save: the override's Exec must be used
+                if "DBusActivatable" in desktop:
+                    desktop["DBusActivatable"] = "false"
+                files[target_path] = document.text()
+        except (OSError, ValueError) as e:
+            errors.append((entry_id, str(e)))
+        if progress is not None:
+            progress(done, len(entries))
+    return files, unchanged, errors
+
+
+def commit(files, removals=(), user_dir=None):
+    """Write ``files`` and delete ``removals`` all-or-nothing (see write_batch)."""
+    if files and user_dir is not None:
+        os.makedirs(user_dir, mode=0o700, exist_ok=True)  # [SECURE] strict permissions
+    with METRICS.timer("bulk.commit"):
+        write_batch(files, removals)
+    METRICS.count("bulk.files", len(files) + len(removals))
@@ -0,0 +1,197 @@
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import tarfile
+
+from .metrics import METRICS
+from .scanner import list_tree
+from .writer import override_path
+
+BUNDLE_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+PACK_NAME = "objects.pack"
+
+# [SECURE] Bundles come from elsewhere: bound what is read from them
+MAX_MANIFEST_BYTES = 64 * 1024 * 1024
+MAX_OBJECT_BYTES = 1024 * 1024
+
+_DIGEST_RE = re.compile(r"[0-9a-f]{64}")
+# Desktop file IDs as found in the wild: D-Bus style names plus "+" and "@"
+_DESKTOP_ID_RE = re.compile(r"[A-Za-z0-9_+@-][A-Za-z0-9_.+@-]*\.desktop")
+
+
+def digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_digest(path):
+    """SHA-256 of the file at ``path``, or None if it cannot be read."""
+    try:
+        with open(path, "rb") as fh:
+            return digest(fh.read())
+    except OSError:
+        return None
+
+
+def shadowed_file(entry_id, system_dirs):
+    """Path of the system file ``entry_id`` resolves to, or None.
+
+    ``system_dirs`` is lowest precedence first, as in paths.SEARCH_DIRS.
+    Looks the ID up directly instead of scanning: as a file name, then
+    as ``prefix/name`` for IDs from a subdirectory (``kde4-foo.desktop``).
+    """
+    candidates = [entry_id]
+    # [SECURE] "..-foo.desktop" must not become "../foo.desktop"
+    candidates.extend(entry_id[:i] + os.sep + entry_id[i + 1:]
+                      for i, c in enumerate(entry_id) if c == "-" and entry_id[:i] not in ("", ".", ".."))
+    for directory in reversed(system_dirs):
+        for candidate in candidates:
+            path = os.path.join(directory, candidate)
+            if os.path.isfile(path):
+                return path
+    return None
+
+
+def _add_member(tar, name, data):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mode = 0o644
+    # mtime, owner and gzip header are fixed, so equal overrides give equal bundles
+    info.mtime = 0
+    info.uid = info.gid = 0
+    info.uname = info.gname = ""
+    tar.addfile(info, io.BytesIO(data))
+
+
+def export_bundle(fileobj, user_dir, system_dirs):
+    """Write every override in ``user_dir`` to ``fileobj`` as a gzipped tar.
+
+    The first member is the manifest: per desktop ID, the SHA-256 of the
+    override and of the system file it shadows (None if it shadows
+    nothing), then the ``[sha256, size]`` of each distinct content in the
+    order they are stored. The contents follow back to back in a second
+    member, so reading them costs one tar header, not one per file.
+    Returns the manifest. Raises OSError if an override cannot be read.
+    """
+    with METRICS.timer("bundle.export"):
+        entries = []
+        objects = {}
+        for directory, names, _, prefix in list_tree(user_dir):
+            for name in names:
+                with open(os.path.join(directory, name), "rb") as fh:
+                    data = fh.read()
+                sha = digest(data)
+                objects[sha] = data
+                system_path = shadowed_file(prefix + name, system_dirs)
+                entries.append({
+                    "id": prefix + name,
+                    "sha256": sha,
+                    "system_path": system_path,
+                    "system_sha256": file_digest(system_path) if system_path else None,
+                })
+        entries.sort(key=lambda item: item["id"])
+        manifest = {
+            "version": BUNDLE_VERSION,
+            "entries": entries,
+            "objects": [[sha, len(data)] for sha, data in objects.items()],
+        }
+        # filename="" keeps the output file's name out of the gzip header
+        with gzip.GzipFile(filename="", fileobj=fileobj, mode="wb", compresslevel=6, mtime=0) as gz, \
+                tarfile.open(fileobj=gz, mode="w|", format=tarfile.USTAR_FORMAT) as tar:
+            _add_member(tar, MANIFEST_NAME, json.dumps(manifest, indent=1).encode("utf-8"))
+            _add_member(tar, PACK_NAME, b"".join(objects.values()))
+    return manifest
+
+
+def _member(tar, members, name, limit):
+    member = next(members, None)
+    if member is None or member.name != name or not member.isfile() or member.size > limit:
+        raise ValueError(f"not a bundle: expected {name} next")
+    return tar.extractfile(member)
+
+
+def _parse_manifest(data):
+    manifest = json.loads(data)
+    if not isinstance(manifest, dict) or manifest.get("version") != BUNDLE_VERSION:
+        raise ValueError("unsupported bundle version")
+    entries = manifest.get("entries")
+    objects = manifest.get("objects")
+    if not isinstance(entries, list) or not isinstance(objects, list):
+        raise ValueError("malformed manifest")
+    seen = set()
+    for item in entries:
+        if not isinstance(item, dict) or not isinstance(item.get("id"), str) \
+                or not _DIGEST_RE.fullmatch(str(item.get("sha256"))):
+            raise ValueError(f"malformed manifest entry {item!r}")
+        # [SECURE] Only desktop files may be written: not mimeinfo.cache, not dotfiles
+        if not _DESKTOP_ID_RE.fullmatch(item["id"]):
+            raise ValueError(f"{item['id']!r} is not a desktop file ID")
+        if item["id"] in seen:
+            raise ValueError(f"{item['id']} is listed twice")
+        seen.add(item["id"])
+    for item in objects:
+        if not isinstance(item, list) or len(item) != 2 or not _DIGEST_RE.fullmatch(str(item[0])) \
+                or type(item[1]) is not int or not 0 <= item[1] <= MAX_OBJECT_BYTES:
+            raise ValueError(f"malformed manifest object {item!r}")
+    return manifest
+
+
+def plan_import(fileobj, user_dir, system_dirs):
+    """Read a bundle from ``fileobj`` and work out what importing it changes.
+
+    The bundle is read as a stream: after the manifest, only the contents
+    of overrides that differ from the file in ``user_dir`` are kept, and
+    each is checked against its hash. Returns ``(files, unchanged,
+    warnings)``: ``{target_path: text}`` to write, how many overrides are
+    already in place, and ``[(desktop ID, message)]`` for overrides whose
+    system entry changed since the export. Nothing is written. Raises
+    ValueError for a malformed, corrupt or unsafe bundle (e.g. an ID with
+    a "/"); tarfile.TarError and OSError are passed on.
+    """
+    with METRICS.timer("bundle.plan"):
+        files = {}
+        unchanged = 0
+        warnings = []
+        with tarfile.open(fileobj=fileobj, mode="r|gz") as tar:
+            members = iter(tar)
+            manifest = _parse_manifest(_member(tar, members, MANIFEST_NAME, MAX_MANIFEST_BYTES).read())
+
+            wanted = {}    # sha256 -> target paths that need that content
+            for item in manifest["entries"]:
+                entry_id = item["id"]
+                # [SECURE] Same name and symlink checks as a save
+                target_path = override_path(entry_id, user_dir, shadowed_file(entry_id, [user_dir]))
+                system_path = shadowed_file(entry_id, system_dirs)
+                now = file_digest(system_path) if system_path else None
+                before = item.get("system_sha256")
+                if now != before:
+                    if now is None:
+                        message = "the system entry it overrode is gone"
+                    elif before is None:
+                        message = f"it now overrides a system entry ({system_path})"
+                    else:
+                        message = f"the system entry changed since export ({system_path})"
+                    warnings.append((entry_id, message))
+                if file_digest(target_path) == item["sha256"]:
+                    unchanged += 1
+                else:
+                    wanted.setdefault(item["sha256"], []).append(target_path)
+
+            if wanted:
+                pack = _member(tar, members, PACK_NAME, sum(size for _, size in manifest["objects"]))
+                for sha, size in manifest["objects"]:
+                    data = pack.read(size)
+                    if sha not in wanted:
+                        continue
+                    if len(data) != size or digest(data) != sha:
+                        raise ValueError(f"corrupt bundle: object {sha} does not match its hash")
+                    # surrogateescape writes the bytes back exactly (see writer.stage_file)
+                    text = data.decode("utf-8", "surrogateescape")
+                    for target_path in wanted.pop(sha):
+                        files[target_path] = text
+                if wanted:
+                    raise ValueError(f"corrupt bundle: {len(wanted)} objects are missing")
+    return files, unchanged, warnings
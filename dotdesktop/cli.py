@@ -0,0 +1,295 @@
+"""Headless command line for DotDesktop (no Qt required).
+
+    python -m dotdesktop list  [--match KEY=VALUE ...]
+    python -m dotdesktop apply --preset electron-wayland --match toolkit=electron [--dry-run]
+    python -m dotdesktop validate [--match KEY=VALUE ...] [--errors-only]
+    python -m dotdesktop export overrides.tar.gz
+    python -m dotdesktop import overrides.tar.gz [--dry-run]
+"""
+import argparse
+import contextlib
+import difflib
+import fnmatch
+import os
+import sys
+import time
+
+from .bulk import commit
+from .index import ScanIndex
+from .mimeinfo import update_cache
+from .paths import SEARCH_DIRS, USER_DIR
+from .presets import PRESETS, PRESETS_BY_NAME, TOOLKITS
+from .scanner import scan_all
+from .toolkit import ToolkitDetector
+from .validate import ValidationCache, validate_entries
+from .writer import override_path, read_document, update_desktop_database, write_batch
+
+MATCH_KEYS = ("toolkit", "file", "name", "exec", "category", "override")
+
+
+def parse_match(text):
+    key, sep, value = text.partition("=")
+    key = key.strip().lower()
+    if not sep or key not in MATCH_KEYS:
+        raise argparse.ArgumentTypeError(
+            f"expected KEY=VALUE with KEY one of {', '.join(MATCH_KEYS)}: {text!r}")
+    return key, value.strip()
+
+
+def entry_matches(filename, entry, matches, user_dir, detector):
+    """True if ``entry`` satisfies every ``(key, value)`` in ``matches``."""
+    for key, value in matches:
+        if key == "toolkit":
+            ok = (detector.cached(entry) or "none") == value.lower()
+        elif key == "file":
+            ok = fnmatch.fnmatch(filename, value)
+        elif key == "name":
+            ok = fnmatch.fnmatch(entry.display_name.lower(), value.lower())
+        elif key == "exec":
+            ok = value.lower() in entry.exec.lower()
+        elif key == "category":
+            ok = value in entry.categories.split(";")
+        else:
+            ok = entry.path.startswith(user_dir + os.sep) == (value.lower() in ("1", "true", "yes"))
+        if not ok:
+            return False
+    return True
+
+
+def scan(args):
+    """Scan, match and return ``(sorted [(desktop ID, entry)], ToolkitDetector)``."""
+    index = ScanIndex() if args.rebuild_index else ScanIndex.load()
+    index.begin_scan()
+    merged = scan_all(SEARCH_DIRS + [USER_DIR], index, workers=args.scan_workers or os.cpu_count() or 1)
+    detector = ToolkitDetector(index)
+    detector.detect_all(merged.values())
+    index.prune()
+    try:
+        index.save()
+    except OSError as e:
+        print(f"warning: could not write scan index: {e}", file=sys.stderr)
+    entries = sorted((f, e) for f, e in merged.items()
+                     if entry_matches(f, e, args.match, USER_DIR, detector))
+    return entries, detector
+
+
+def cmd_list(args):
+    entries, detector = scan(args)
+    for filename, entry in entries:
+        toolkit = detector.cached(entry)
+        label = TOOLKITS[toolkit][0] if toolkit else "-"
+        origin = "override" if entry.path.startswith(USER_DIR + os.sep) else "system"
+        print(f"{filename}\t{entry.display_name}\t{label}\t{origin}")
+    return 0
+
+
+def refresh_database(paths):
+    """Update USER_DIR's mimeinfo.cache for ``paths``; returns what was done.
+
+    The cache is updated in process; update-desktop-database is only run
+    if that fails.
+    """
+    t0 = time.perf_counter()
+    try:
+        changed = update_cache(USER_DIR, paths)
+    except OSError as e:
+        status = update_desktop_database(USER_DIR)
+        if status is None:
+            return f"Updating mimeinfo.cache failed ({e}); update-desktop-database not found in PATH."
+        return (f"Updating mimeinfo.cache failed ({e}); update-desktop-database exited {status} "
+                f"in {(time.perf_counter() - t0) * 1000:.1f} ms.")
+    return (f"Updated mimeinfo.cache ({len(changed)} MIME types changed) "
+            f"in {(time.perf_counter() - t0) * 1000:.1f} ms.")
+
+
+def cmd_apply(args):
+    preset = PRESETS_BY_NAME[args.preset]
+    start = time.perf_counter()
+    entries, _ = scan(args)
+    scan_ms = (time.perf_counter() - start) * 1000
+    print(f"Scanned in {scan_ms:.1f} ms; {len(entries)} entries match.")
+
+    files = {}
+    errors = 0
+    unchanged = 0
+    entry_ms = []
+    for filename, entry in entries:
+        t0 = time.perf_counter()
+        target_path = None
+        try:
+            target_path = override_path(filename, USER_DIR, entry.path)
+            document = read_document(entry.path)
+            desktop = document["Desktop Entry"]
+            old_exec = desktop.get("Exec", "")
+            if not old_exec:
+                raise ValueError("no Exec= key")
+            new_exec = preset.apply(old_exec)
+            if new_exec == old_exec:
+                unchanged += 1
+                status = "already applied"
+            else:
+                desktop["Exec"] = new_exec
+                if "DBusActivatable" in desktop:
+                    desktop["DBusActivatable"] = "false"
+                files[target_path] = document.text()
+                status = f"-> {target_path}"
+        except (OSError, ValueError) as e:
+            errors += 1
+            status = f"error: {e}"
+        elapsed = (time.perf_counter() - t0) * 1000
+        entry_ms.append(elapsed)
+        print(f"{elapsed:8.2f} ms  {filename}  {status}")
+
+        if args.dry_run and target_path in files:
+            with open(entry.path, encoding="utf-8", errors="replace") as fh:
+                original = fh.read()
+            sys.stdout.writelines(difflib.unified_diff(
+                original.splitlines(keepends=True), files[target_path].splitlines(keepends=True),
+                fromfile=entry.path, tofile=target_path))
+
+    if files and not args.dry_run:
+        os.makedirs(USER_DIR, mode=0o700, exist_ok=True)
+        t0 = time.perf_counter()
+        try:
+            write_batch(files)
+        except OSError as e:
+            print(f"error: writing overrides failed, nothing was written: {e}", file=sys.stderr)
+            return 1
+        print(f"Wrote {len(files)} overrides in {(time.perf_counter() - t0) * 1000:.1f} ms.")
+        if not args.no_update_db:
+            print(refresh_database(files))
+
+    verb = "would write" if args.dry_run else "written"
+    avg = sum(entry_ms) / len(entry_ms) if entry_ms else 0.0
+    print(f"{len(files)} {verb}, {unchanged} already applied, {errors} errors; "
+          f"{avg:.2f} ms/entry.")
+    return 1 if errors else 0
+
+
+def cmd_validate(args):
+    entries, _ = scan(args)
+    start = time.perf_counter()
+    cache = ValidationCache() if args.rebuild_cache else ValidationCache.load()
+    # A filtered run must not forget the records of the entries it left out
+    results, checked = validate_entries([e for _, e in entries], cache,
+                                        workers=args.scan_workers or os.cpu_count() or 1,
+                                        prune=not args.match)
+    elapsed = (time.perf_counter() - start) * 1000
+    try:
+        cache.save()
+    except OSError as e:
+        print(f"warning: could not write validation cache: {e}", file=sys.stderr)
+    counts = {"error": 0, "warning": 0}
+    for filename, entry in entries:
+        for severity, message in results.get(entry.path, ()):
+            counts[severity] += 1
+            if severity == "error" or not args.errors_only:
+                print(f"{severity}\t{filename}\t{message}\t{entry.path}")
+    print(f"{len(entries)} entries validated in {elapsed:.1f} ms ({checked} checked, the rest cached): "
+          f"{counts['error']} errors, {counts['warning']} warnings.", file=sys.stderr)
+    return 1 if counts["error"] else 0
+
+
+def open_bundle(path, mode):
+    """``path`` opened in binary ``mode``; "-" is stdin or stdout, left open."""
+    if path == "-":
+        stream = sys.stdout.buffer if "w" in mode else sys.stdin.buffer
+        return contextlib.nullcontext(stream)
+    return open(path, mode)
+
+
+def cmd_export(args):
+    # tarfile and gzip are only loaded for the commands that use them
+    from .bundle import export_bundle
+
+    start = time.perf_counter()
+    try:
+        with open_bundle(args.bundle, "wb") as fh:
+            manifest = export_bundle(fh, USER_DIR, SEARCH_DIRS)
+    except OSError as e:
+        print(f"error: export failed: {e}", file=sys.stderr)
+        return 1
+    entries = manifest["entries"]
+    shadowing = sum(1 for item in entries if item["system_sha256"])
+    print(f"Exported {len(entries)} overrides ({shadowing} over system entries) "
+          f"in {(time.perf_counter() - start) * 1000:.1f} ms.", file=sys.stderr)
+    return 0
+
+
+def cmd_import(args):
+    import tarfile
+
+    from .bundle import plan_import
+
+    start = time.perf_counter()
+    try:
+        with open_bundle(args.bundle, "rb") as fh:
+            files, unchanged, warnings = plan_import(fh, USER_DIR, SEARCH_DIRS)
+    except (OSError, ValueError, tarfile.TarError) as e:
+        print(f"error: cannot import {args.bundle}, nothing was written: {e}", file=sys.stderr)
+        return 1
+    for entry_id, message in warnings:
+        print(f"warning: {entry_id}: {message}", file=sys.stderr)
+    if args.dry_run:
+        for target_path in sorted(files):
+            print(f"would write {target_path}")
+    elif files:
+        try:
+            commit(files, (), USER_DIR)
+        except OSError as e:
+            print(f"error: writing overrides failed, nothing was written: {e}", file=sys.stderr)
+            return 1
+        if not args.no_update_db:
+            # One refresh for the whole bundle
+            print(refresh_database(files), file=sys.stderr)
+    verb = "would write" if args.dry_run else "written"
+    print(f"{len(files)} {verb}, {unchanged} unchanged, {len(warnings)} warnings "
+          f"in {(time.perf_counter() - start) * 1000:.1f} ms.", file=sys.stderr)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="dotdesktop", description="Headless DotDesktop tools.")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--match", action="append", type=parse_match, default=[], metavar="KEY=VALUE",
+                        help=f"filter entries; repeat to AND. KEY: {', '.join(MATCH_KEYS)}")
+    common.add_argument("--rebuild-index", action="store_true",
+                        help="ignore the cached scan index and reparse every entry")
+    common.add_argument("--scan-workers", type=int, default=1, metavar="N",
+                        help="parse entries in N worker processes (0 = one per CPU, default 1)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = sub.add_parser("list", parents=[common], help="list resolved entries")
+    list_parser.set_defaults(func=cmd_list)
+
+    apply_parser = sub.add_parser("apply", parents=[common], help="apply a preset to matching entries")
+    apply_parser.add_argument("--preset", required=True, choices=[p.name for p in PRESETS])
+    apply_parser.add_argument("--dry-run", action="store_true",
+                              help="show a diff of each override instead of writing it")
+    apply_parser.add_argument("--no-update-db", action="store_true",
+                              help="do not refresh mimeinfo.cache after writing")
+    apply_parser.set_defaults(func=cmd_apply)
+
+    validate_parser = sub.add_parser("validate", parents=[common],
+                                     help="check entries for broken Exec, icons, field codes, categories")
+    validate_parser.add_argument("--errors-only", action="store_true", help="do not print warnings")
+    validate_parser.add_argument("--rebuild-cache", action="store_true",
+                                 help="ignore cached results and check every entry again")
+    validate_parser.set_defaults(func=cmd_validate)
+
+    export_parser = sub.add_parser("export", help="pack every user override into one bundle")
+    export_parser.add_argument("bundle", help="bundle file to write (- for stdout)")
+    export_parser.set_defaults(func=cmd_export)
+
+    import_parser = sub.add_parser("import", help="install the overrides of a bundle in one batch")
+    import_parser.add_argument("bundle", help="bundle file to read (- for stdin)")
+    import_parser.add_argument("--dry-run", action="store_true", help="list what would be written")
+    import_parser.add_argument("--no-update-db", action="store_true",
+                               help="do not refresh mimeinfo.cache after writing")
+    import_parser.set_defaults(func=cmd_import)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
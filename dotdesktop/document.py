@@ -0,0 +1,196 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from .index import is_racy, stat_key
+from .metrics import METRICS
+
+# One physical line with its terminator; the last line may have none
+_LINE_RE = re.compile(r"[^\n]*\n|[^\n]+")
+
+
+def _parse_line(line):
+    """Classify ``line``: ``("group", name)``, ``("key", key, value)`` or None."""
+    stripped = line.strip().lstrip("\ufeff")
+    if not stripped or stripped.startswith("#"):
+        return None
+    if stripped.startswith("[") and stripped.endswith("]"):
+        return ("group", stripped[1:-1])
+    key, sep, value = stripped.partition("=")
+    if not sep:
+        return None
+    return ("key", key.strip(), value.strip())
+
+
+class DesktopDocument:
+    """A .desktop file kept as its original lines, edited in place.
+
+    Reading and rendering an untouched document gives back the exact bytes
+    it was loaded from: comments, blank lines, key order, spacing around
+    "=", line endings and other groups are copied through. Setting a key
+    rewrites only the line(s) holding it, keeping everything up to the
+    value; a new key is added after the last key of its group.
+    """
+
+    def __init__(self, text=""):
+        self.lines = _LINE_RE.findall(text)
+        self.newline = "\r\n" if self.lines and self.lines[0].endswith("\r\n") else "\n"
+        self._reindex()
+
+    @classmethod
+    def load(cls, path):
+        # surrogateescape keeps undecodable bytes so they are written back unchanged
+        with open(path, encoding="utf-8", errors="surrogateescape", newline="") as fh:
+            return cls(fh.read())
+
+    def _reindex(self):
+        # group -> [header line, {key: [line, ...]}, last key line]
+        self._groups = {}
+        group = None
+        for i, line in enumerate(self.lines):
+            parsed = _parse_line(line)
+            if parsed is None:
+                continue
+            if parsed[0] == "group":
+                group = self._groups.setdefault(parsed[1], [i, {}, i])
+                group[2] = i
+            elif group is not None:
+                group[1].setdefault(parsed[1], []).append(i)
+                group[2] = i
+
+    def __contains__(self, name):
+        return name in self._groups
+
+    def __getitem__(self, name):
+        if name not in self._groups:
+            raise KeyError(name)
+        return DocumentGroup(self, name)
+
+    def groups(self):
+        return list(self._groups)
+
+    def add_group(self, name):
+        """Add an empty ``[name]`` group before the first group; returns it."""
+        if name not in self._groups:
+            first = min((g[0] for g in self._groups.values()), default=len(self.lines))
+            self._insert(first, f"[{name}]")
+        return DocumentGroup(self, name)
+
+    def _insert(self, i, content):
+        if i == len(self.lines) and self.lines and not self.lines[-1].endswith("\n"):
+            self.lines[-1] += self.newline
+        self.lines.insert(i, content + self.newline)
+        self._reindex()
+
+    def get(self, group, key, default=None):
+        lines = self._groups[group][1].get(key)
+        if not lines:
+            return default
+        # Last occurrence wins, as in parse_desktop_entry
+        return _parse_line(self.lines[lines[-1]])[2]
+
+    def set(self, group, key, value):
+        """Set ``key`` in ``group``; returns True if the document changed."""
+        if "\n" in value or "\r" in value:
+            raise ValueError(f"{key}: values cannot span lines")
+        lines = self._groups[group][1].get(key)
+        if not lines:
+            self._insert(self._groups[group][2] + 1, f"{key}={value}")
+            return True
+        changed = False
+        for i in lines:
+            line = self.lines[i]
+            content = line.rstrip("\r\n")
+            if _parse_line(content)[2] == value:
+                continue
+            head, _, rest = content.partition("=")
+            space = rest[:len(rest) - len(rest.lstrip())]
+            self.lines[i] = f"{head}={space}{value}{line[len(content):]}"
+            changed = True
+        return changed
+
+    def copy(self):
+        document = DesktopDocument.__new__(DesktopDocument)
+        document.lines = list(self.lines)
+        document.newline = self.newline
+        document._reindex()
+        return document
+
+    def text(self):
+        return "".join(self.lines)
+
+
+class DocumentCache:
+    """Bounded LRU of loaded DesktopDocuments, keyed by path.
+
+    Each document is validated against the file's stat key, the same
+    (mtime, size, inode) check the scan index uses, so an edited file is
+    reloaded and never served stale. get() hands out a private copy that
+    the caller may edit. Safe to fill from a prefetch thread.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._documents = OrderedDict()    # path -> (stat key, DesktopDocument)
+        self._lock = threading.Lock()
+
+    def _load(self, path):
+        key = stat_key(os.stat(path))
+        with self._lock:
+            cached = self._documents.get(path)
+            if cached is not None and cached[0] == key:
+                self._documents.move_to_end(path)
+                METRICS.count("documents.hits")
+                return cached[1]
+        METRICS.count("documents.loads")
+        document = DesktopDocument.load(path)
+        if not is_racy(key):
+            with self._lock:
+                self._documents[path] = (key, document)
+                self._documents.move_to_end(path)
+                while len(self._documents) > self.max_entries:
+                    self._documents.popitem(last=False)
+        return document
+
+    def get(self, path):
+        """An editable copy of the document at ``path``; raises OSError if unreadable."""
+        return self._load(path).copy()
+
+    def prefetch(self, paths):
+        """Load ``paths`` ahead of use; unreadable files are skipped."""
+        for path in paths:
+            try:
+                self._load(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+
+
+class DocumentGroup:
+    """Mapping-style view of one group of a DesktopDocument."""
+
+    def __init__(self, document, name):
+        self.document = document
+        self.name = name
+
+    def __contains__(self, key):
+        return key in self.document._groups[self.name][1]
+
+    def __getitem__(self, key):
+        value = self.document.get(self.name, key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.document.set(self.name, key, value)
+
+    def get(self, key, default=None):
+        return self.document.get(self.name, key, default)
+
+    def keys(self):
+        return list(self.document._groups[self.name][1])
@@ -0,0 +1,114 @@
+import os
+import sys
+
+# Keys we keep from the [Desktop Entry] group, mapped to record attributes.
+# Localized variants (Name[de]=...) and everything else are skipped.
+ENTRY_KEYS = {
+    "Type": "type",
+    "Name": "name",
+    "GenericName": "generic_name",
+    "Comment": "comment",
+    "Icon": "icon",
+    "Exec": "exec",
+    "TryExec": "try_exec",
+    "Categories": "categories",
+    "Keywords": "keywords",
+    "MimeType": "mime_type",
+    "NoDisplay": "no_display",
+    "Hidden": "hidden",
+    "Terminal": "terminal",
+    "StartupNotify": "startup_notify",
+}
+
+_BOOL_ATTRS = frozenset(("no_display", "hidden", "terminal", "startup_notify"))
+
+# Values that repeat across many entries; interning makes them share one
+# string object instead of one copy per entry.
+_INTERNED_ATTRS = frozenset(("type", "generic_name", "icon", "try_exec", "categories", "keywords",
+                             "mime_type"))
+
+ENTRY_GROUP = "[Desktop Entry]"
+
+
+class DesktopEntry:
+    """Compact record of the fields the editor needs from one .desktop file.
+
+    Records are shared between the scan index, the entry store and the
+    view model, so they are treated as read-only once built.
+    """
+
+    __slots__ = ("path",) + tuple(ENTRY_KEYS.values())
+
+    def __init__(self, path):
+        self.path = path
+        for attr in ENTRY_KEYS.values():
+            setattr(self, attr, False if attr in _BOOL_ATTRS else "")
+
+    @property
+    def filename(self):
+        return os.path.basename(self.path)
+
+    @property
+    def display_name(self):
+        return self.name or self.filename
+
+    def get(self, key, default=""):
+        """Dict-style access by desktop key, e.g. ``entry.get("Exec")``."""
+        attr = ENTRY_KEYS.get(key)
+        if attr is None:
+            return default
+        value = getattr(self, attr)
+        if attr in _BOOL_ATTRS:
+            return "true" if value else "false"
+        return value or default
+
+    def to_row(self):
+        """Field values in ENTRY_KEYS order, for compact serialization."""
+        return [getattr(self, attr) for attr in ENTRY_KEYS.values()]
+
+    @classmethod
+    def from_row(cls, path, row):
+        entry = cls.__new__(cls)
+        entry.path = path
+        for attr, value in zip(ENTRY_KEYS.values(), row):
+            if value and attr in _INTERNED_ATTRS:
+                value = sys.intern(value)
+            setattr(entry, attr, value)
+        return entry
+
+    def __repr__(self):
+        return f"DesktopEntry({self.path!r}, name={self.name!r})"
+
+
+def parse_desktop_entry(path):
+    """Parse the [Desktop Entry] group of ``path`` in a single pass.
+
+    Lines before the group are skipped and reading stops at the next group
+    header, so [Desktop Action ...] sections are never decoded. Malformed
+    lines are ignored. Raises OSError if the file cannot be read.
+    """
+    entry = DesktopEntry(path)
+    in_group = False
+    with open(path, encoding="utf-8", errors="replace") as fh:
+        for line in fh:
+            if line.startswith("["):
+                if in_group:
+                    break
+                in_group = line.rstrip() == ENTRY_GROUP
+                continue
+            if not in_group:
+                continue
+            key, sep, value = line.partition("=")
+            if not sep:
+                continue
+            attr = ENTRY_KEYS.get(key.strip())
+            if attr is None:
+                continue
+            value = value.strip()
+            if attr in _BOOL_ATTRS:
+                setattr(entry, attr, value.lower() == "true")
+            elif attr in _INTERNED_ATTRS:
+                setattr(entry, attr, sys.intern(value))
+            else:
+                setattr(entry, attr, value)
+    return entry
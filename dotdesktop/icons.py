@@ -0,0 +1,128 @@
+import os
+import threading
+
+from .document import DesktopDocument
+from .metrics import METRICS
+from .paths import EXTRA_DATA_DIRS, data_dirs, data_home
+
+FALLBACK_THEME = "hicolor"
+ICON_EXTENSIONS = (".png", ".svg", ".svgz", ".xpm")
+
+
+def icon_dirs():
+    """Directories searched for icons: every icons/ data dir, ~/.icons and /usr/share/pixmaps."""
+    bases = [data_home()] + data_dirs() + EXTRA_DATA_DIRS
+    dirs = [os.path.expanduser("~/.icons")] + [os.path.join(b, "icons") for b in bases]
+    dirs.append("/usr/share/pixmaps")
+    return [d for i, d in enumerate(dirs) if d not in dirs[:i] and os.path.isdir(d)]
+
+
+def _int(value, default):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class IconTheme:
+    """Finds the file for an Icon= value, following the Icon Theme Specification.
+
+    ``theme``, the themes it inherits and then hicolor are searched below
+    each of ``directories``, best match for ``size`` first; unthemed icons
+    are looked up in the directories themselves (/usr/share/pixmaps). Only
+    the filesystem is used, so lookups may run on any thread. A theme's
+    files are listed once, on its first lookup.
+    """
+
+    def __init__(self, theme, directories=None, size=48):
+        self.theme = theme or FALLBACK_THEME
+        self.directories = icon_dirs() if directories is None else list(directories)
+        self.size = size
+        self._icons = {}     # theme -> {icon name: path}
+        self._inherits = {}  # theme -> [parent theme, ...]
+        self._lock = threading.Lock()
+
+    def _read_index(self, theme):
+        """``([(distance from size, subdirectory)], inherited themes)`` from index.theme."""
+        for base in self.directories:
+            try:
+                document = DesktopDocument.load(os.path.join(base, theme, "index.theme"))
+            except OSError:
+                continue
+            if "Icon Theme" not in document:
+                continue
+            subdirs = []
+            for name in (document.get("Icon Theme", "Directories") or "").split(","):
+                name = name.strip()
+                if not name or name not in document:
+                    continue
+                nominal = _int(document.get(name, "Size"), 0)
+                kind = document.get(name, "Type", "Threshold")
+                if kind == "Scalable":
+                    low = _int(document.get(name, "MinSize"), nominal)
+                    high = _int(document.get(name, "MaxSize"), nominal)
+                elif kind == "Fixed":
+                    low = high = nominal
+                else:
+                    threshold = _int(document.get(name, "Threshold"), 2)
+                    low, high = nominal - threshold, nominal + threshold
+                distance = max(low - self.size, self.size - high, 0)
+                # Equally close: scaling a bigger icon down beats scaling up
+                subdirs.append(((distance, high < self.size), name))
+            subdirs.sort()
+            inherits = [t.strip() for t in (document.get("Icon Theme", "Inherits") or "").split(",")]
+            return [name for _, name in subdirs], [t for t in inherits if t]
+        return [], []
+
+    def _theme_icons(self, theme):
+        with self._lock:
+            icons = self._icons.get(theme)
+            if icons is not None:
+                return icons
+            with METRICS.timer("icons.list_theme"):
+                subdirs, self._inherits[theme] = self._read_index(theme)
+                icons = {}
+                for subdir in subdirs:
+                    for base in self.directories:
+                        try:
+                            files = os.listdir(os.path.join(base, theme, subdir))
+                        except OSError:
+                            continue
+                        found = {}
+                        for f in files:
+                            stem, ext = os.path.splitext(f)
+                            if ext in ICON_EXTENSIONS:
+                                found.setdefault(stem, {})[ext] = f
+                        for stem, by_ext in found.items():
+                            if stem not in icons:
+                                ext = next(e for e in ICON_EXTENSIONS if e in by_ext)
+                                icons[stem] = os.path.join(base, theme, subdir, by_ext[ext])
+            self._icons[theme] = icons
+            return icons
+
+    def themes(self):
+        """``theme``, every theme it inherits (breadth first), then hicolor."""
+        chain = [self.theme]
+        for theme in chain:
+            self._theme_icons(theme)
+            chain.extend(t for t in self._inherits[theme] if t not in chain)
+        if FALLBACK_THEME not in chain:
+            chain.append(FALLBACK_THEME)
+        return chain
+
+    def find(self, icon):
+        """Path of the file for ``icon`` (a name or an absolute path), or None."""
+        if os.path.isabs(icon):
+            return icon if os.path.isfile(icon) else None
+        for theme in self.themes():
+            path = self._theme_icons(theme).get(icon)
+            if path is not None:
+                return path
+        names = [icon] if os.path.splitext(icon)[1] in ICON_EXTENSIONS else []
+        names += [icon + ext for ext in ICON_EXTENSIONS]
+        for base in self.directories:
+            for name in names:
+                path = os.path.join(base, name)
+                if os.path.isfile(path):
+                    return path
+        return None
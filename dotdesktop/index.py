@@ -0,0 +1,160 @@
+import json
+import os
+import time
+
+from .entry import ENTRY_KEYS, DesktopEntry
+
+INDEX_VERSION = 2
+
+# Anything modified this recently may still change within the same mtime
+# tick, so it is never trusted from the index (same idea as git's racy
+# index check).
+RACY_WINDOW_NS = 2 * 10**9
+
+
+def default_index_path():
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache_home, "dotdesktop", "scan-index.json")
+
+
+def stat_key(st):
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def is_racy(key):
+    return time.time_ns() - key[0] < RACY_WINDOW_NS
+
+
+class ScanIndex:
+    """Persistent cache of parsed entries and directory listings.
+
+    Entries are keyed by path and validated against (mtime, size, inode).
+    Each directory stores its own mtime and the .desktop names (and, with a
+    trailing "/", the subdirectories) it held, so an unchanged directory
+    costs a single stat on a warm start. Files edited in
+    place without touching their directory are picked up the next time the
+    directory changes or when the index is rebuilt. Toolkit detection
+    results are kept per executable, validated the same way.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_index_path()
+        self.dirs = {}
+        self.entries = {}
+        self.toolkits = {}      # executable -> (stat key, toolkit id or "")
+        self.load_error = None
+        self._seen = set()
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path=None):
+        """Load the index at ``path``; an empty index is returned on any error."""
+        index = cls(path)
+        try:
+            with open(index.path, encoding="utf-8") as fh:
+                data = json.load(fh)
+            if data.get("version") != INDEX_VERSION:
+                raise ValueError(f"unsupported index version {data.get('version')!r}")
+            width = len(ENTRY_KEYS)
+            dirs = {d: (tuple(v[0]), v[1]) for d, v in data["dirs"].items()}
+            entries = {}
+            for p, (key, row) in data["entries"].items():
+                if len(key) != 3 or len(row) != width:
+                    raise ValueError(f"malformed record for {p}")
+                # Records (not rows) are kept, so the index shares them with the UI
+                entries[p] = (tuple(key), DesktopEntry.from_row(p, row))
+            # Optional: indexes written before toolkit detection have none
+            toolkits = {b: (tuple(key), toolkit)
+                        for b, (key, toolkit) in data.get("toolkits", {}).items()}
+        except FileNotFoundError:
+            return index
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            index.load_error = str(e) or type(e).__name__
+            index._dirty = True
+            return index
+        index.dirs = dirs
+        index.entries = entries
+        index.toolkits = toolkits
+        return index
+
+    def save(self):
+        """Write the index atomically if anything changed since it was loaded."""
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+        data = {
+            "version": INDEX_VERSION,
+            "dirs": self.dirs,
+            "entries": {p: (key, entry.to_row()) for p, (key, entry) in self.entries.items()},
+            "toolkits": self.toolkits,
+        }
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, separators=(",", ":"))
+            os.replace(temp_path, self.path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        self._dirty = False
+
+    def begin_scan(self):
+        self._seen = set()
+
+    def prune(self):
+        """Forget directories, files and executables that the current scan did not visit."""
+        for table in (self.dirs, self.entries, self.toolkits):
+            for key in [k for k in table if k not in self._seen]:
+                del table[key]
+                self._dirty = True
+
+    def listing(self, directory, key):
+        """Cached listing of ``directory`` if its stat key is unchanged."""
+        cached = self.dirs.get(directory)
+        if cached is None or cached[0] != key or is_racy(key):
+            return None
+        self._seen.add(directory)
+        return cached[1]
+
+    def store_listing(self, directory, key, names):
+        self._seen.add(directory)
+        if is_racy(key):
+            self.dirs.pop(directory, None)
+        else:
+            self.dirs[directory] = (key, list(names))
+        self._dirty = True
+
+    def cached_entry(self, path, key=None):
+        """Return the indexed record for ``path``.
+
+        With ``key`` (see stat_key) the record must match it; without it the
+        caller vouches that the file is unchanged.
+        """
+        cached = self.entries.get(path)
+        if cached is None:
+            return None
+        if key is not None and (cached[0] != key or is_racy(key)):
+            return None
+        self._seen.add(path)
+        return cached[1]
+
+    def store_entry(self, path, key, entry):
+        self._seen.add(path)
+        if is_racy(key):
+            self.entries.pop(path, None)
+        else:
+            self.entries[path] = (key, entry)
+        self._dirty = True
+
+    def cached_toolkit(self, executable, key):
+        """Stored toolkit id for ``executable`` ("" = none found) if ``key`` matches, else None."""
+        cached = self.toolkits.get(executable)
+        if cached is None or cached[0] != key or is_racy(key):
+            return None
+        self._seen.add(executable)
+        return cached[1]
+
+    def store_toolkit(self, executable, key, toolkit):
+        self._seen.add(executable)
+        self.toolkits[executable] = (key, toolkit)
+        self._dirty = True
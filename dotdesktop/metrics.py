@@ -0,0 +1,100 @@
+import functools
+import threading
+import time
+from collections import deque
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.name, (time.perf_counter() - self.start) * 1000)
+
+
+class Metrics:
+    """Timers and counters for the hot paths, cheap enough to leave on.
+
+    A timer keeps its call count, total and the last ``window`` durations
+    (in ms) for percentiles; a counter is a plain integer. Safe to update
+    from scan and loader threads. Work done in scan worker processes is
+    counted by the thread that receives the results.
+    """
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._timers = {}      # name -> [calls, total ms, max ms, deque of recent ms]
+        self._counters = {}
+
+    def count(self, name, n=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def record(self, name, ms):
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None:
+                timer = self._timers[name] = [0, 0.0, 0.0, deque(maxlen=self.window)]
+            timer[0] += 1
+            timer[1] += ms
+            if ms > timer[2]:
+                timer[2] = ms
+            timer[3].append(ms)
+
+    def timer(self, name):
+        """Context manager that records the time spent in its block under ``name``."""
+        return _Timer(self, name)
+
+    def timed(self, name):
+        """Decorator form of timer(); keeps the wrapped signature for Qt slots."""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def reset(self):
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+
+    def snapshot(self):
+        """Return ``(timers, counters)``.
+
+        ``timers`` is a sorted list of ``(name, calls, p50, p95, max, total)``
+        in ms, percentiles over the recent window; ``counters`` a sorted
+        list of ``(name, value)``.
+        """
+        with self._lock:
+            timers = [(name, calls, total, peak, sorted(recent))
+                      for name, (calls, total, peak, recent) in self._timers.items()]
+            counters = sorted(self._counters.items())
+        rows = []
+        for name, calls, total, peak, recent in sorted(timers):
+            p50 = recent[len(recent) // 2]
+            p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))]
+            rows.append((name, calls, p50, p95, peak, total))
+        return rows, counters
+
+    def report(self):
+        """The snapshot as plain text, one line per timer or counter."""
+        timers, counters = self.snapshot()
+        lines = [f"{'timer':<24} {'calls':>8} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'total ms':>10}"]
+        lines += [f"{name:<24} {calls:>8} {p50:>9.2f} {p95:>9.2f} {peak:>9.2f} {total:>10.1f}"
+                  for name, calls, p50, p95, peak, total in timers]
+        lines += [f"{name:<24} {value:>8}" for name, value in counters]
+        return "\n".join(lines)
+
+
+# Process-wide instance used by the scanner, caches and the editor
+METRICS = Metrics()
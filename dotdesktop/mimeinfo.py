@@ -0,0 +1,202 @@
+import os
+import re
+
+from .entry import parse_desktop_entry
+from .metrics import METRICS
+from .scanner import desktop_id, scan_directory
+from .writer import write_atomic
+
+CACHE_NAME = "mimeinfo.cache"
+CACHE_GROUP = "[MIME Cache]"
+
+_MIME_RE = re.compile(r"[\w.+-]+/[\w.+-]+")
+
+
+def mime_types(value):
+    """Valid MIME types of a ``MimeType=`` value, in order and without repeats.
+
+    Malformed types are skipped, as update-desktop-database does.
+    """
+    types = []
+    for mime_type in value.split(";"):
+        mime_type = mime_type.strip()
+        if mime_type and _MIME_RE.fullmatch(mime_type) and mime_type not in types:
+            types.append(mime_type)
+    return types
+
+
+def handled_types(entry):
+    """MIME types ``entry`` handles; none once it is Hidden (deleted)."""
+    return () if entry.hidden or not entry.mime_type else mime_types(entry.mime_type)
+
+
+def cache_path(directory):
+    return os.path.join(directory, CACHE_NAME)
+
+
+class MimeIndex:
+    """Reverse index from MIME type to the desktop IDs that handle it.
+
+    A type's IDs keep the order they were added in, which for a parsed
+    mimeinfo.cache is the file's order (GIO falls back to it when
+    mimeapps.list names no default).
+    """
+
+    def __init__(self):
+        # MIME type -> IDs. Most types have one handler, kept as a 1-tuple;
+        # more are kept in an insertion-ordered dict for O(1) removal
+        self._handlers = {}
+
+    def __len__(self):
+        return len(self._handlers)
+
+    def __iter__(self):
+        return iter(self._handlers)
+
+    def clear(self):
+        self._handlers.clear()
+
+    def add(self, entry_id, types):
+        handlers = self._handlers
+        for mime_type in types:
+            ids = handlers.get(mime_type)
+            if ids is None:
+                handlers[mime_type] = (entry_id,)
+            elif type(ids) is tuple:
+                if ids[0] != entry_id:
+                    handlers[mime_type] = {ids[0]: None, entry_id: None}
+            else:
+                ids[entry_id] = None
+
+    def discard(self, entry_id, types):
+        """Forget ``entry_id`` for ``types``."""
+        handlers = self._handlers
+        for mime_type in types:
+            ids = handlers.get(mime_type)
+            if ids is None:
+                continue
+            if type(ids) is tuple:
+                if ids[0] == entry_id:
+                    del handlers[mime_type]
+                continue
+            ids.pop(entry_id, None)
+            if len(ids) == 1:
+                handlers[mime_type] = tuple(ids)
+            elif not ids:
+                del handlers[mime_type]
+
+    def handlers(self, mime_type):
+        """Desktop IDs handling ``mime_type``, in the order they were added."""
+        return list(self._handlers.get(mime_type, ()))
+
+    def types_of(self, entry_ids):
+        """``{desktop ID: {MIME type, ...}}`` for ``entry_ids``, in one pass over every type."""
+        wanted = set(entry_ids)
+        listed = {entry_id: set() for entry_id in wanted}
+        for mime_type, ids in self._handlers.items():
+            # Whichever side is smaller is iterated
+            hits = [i for i in wanted if i in ids] if len(ids) > len(wanted) else wanted.intersection(ids)
+            for entry_id in hits:
+                listed[entry_id].add(mime_type)
+        return listed
+
+    def set(self, entry_id, types, current):
+        """List ``entry_id`` for exactly ``types`` instead of ``current``.
+
+        Returns the types whose handlers changed. Types it keeps are left
+        alone, so its position in them does not move.
+        """
+        removed = current - set(types)
+        added = [t for t in types if t not in current]
+        self.discard(entry_id, removed)
+        self.add(entry_id, added)
+        return removed | set(added)
+
+    def text(self):
+        """mimeinfo.cache contents, types sorted as update-desktop-database writes them."""
+        lines = [CACHE_GROUP]
+        for mime_type in sorted(self._handlers):
+            lines.append(f"{mime_type}={';'.join(self._handlers[mime_type])};")
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def parse(cls, text):
+        """Index from mimeinfo.cache ``text``; raises ValueError if it is not one."""
+        index = cls()
+        handlers = index._handlers
+        in_group = False
+        for line in text.splitlines():
+            if not line or line[0] == "#":
+                continue
+            if line[0] == "[":
+                if line.rstrip() != CACHE_GROUP:
+                    raise ValueError(f"unexpected group {line!r}")
+                in_group = True
+                continue
+            mime_type, sep, value = line.partition("=")
+            if not in_group or not sep:
+                raise ValueError(f"malformed line {line!r}")
+            mime_type = mime_type.strip()
+            ids = value.strip().split(";")
+            if "" in ids:
+                ids = [entry_id for entry_id in ids if entry_id]
+            if mime_type in handlers:
+                for entry_id in ids:
+                    index.add(entry_id, (mime_type,))
+            elif len(ids) == 1:
+                handlers[mime_type] = (ids[0],)
+            elif ids:
+                handlers[mime_type] = dict.fromkeys(ids)
+        return index
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as fh:
+            return cls.parse(fh.read())
+
+
+def rebuild_cache(directory, index=None):
+    """Write ``directory``'s mimeinfo.cache from scratch, in process.
+
+    The equivalent of ``update-desktop-database directory``, reusing the
+    scan index for unchanged files; Hidden entries are left out, as in
+    MimeIndex. Returns the MIME types listed.
+    Raises OSError if the directory cannot be read or the cache written.
+    """
+    with METRICS.timer("mime.rebuild"):
+        cache = MimeIndex()
+        for entry_id, entry in sorted(scan_directory(directory, index).items()):
+            cache.add(entry_id, handled_types(entry))
+        write_atomic(cache_path(directory), cache.text())
+    return set(cache)
+
+
+def update_cache(directory, paths, index=None):
+    """Bring ``directory``'s mimeinfo.cache up to date after ``paths`` changed.
+
+    Only the changed files are read and only the lines of the MIME types
+    they were or are now listed for are touched; removed files drop out.
+    A missing or malformed cache is rebuilt (see rebuild_cache). Returns
+    the MIME types whose handlers changed. Raises OSError if the cache
+    cannot be written.
+    """
+    path = cache_path(directory)
+    try:
+        cache = MimeIndex.load(path)
+    except (OSError, UnicodeDecodeError, ValueError):
+        return rebuild_cache(directory, index)
+    with METRICS.timer("mime.update"):
+        # [SECURE] Only files inside the directory are listed in its cache
+        ids = {desktop_id(directory, p): p for p in paths
+               if p.startswith(directory + os.sep) and p.endswith(".desktop")}
+        listed = cache.types_of(ids)
+        changed = set()
+        for entry_id, entry_path in ids.items():
+            try:
+                types = handled_types(parse_desktop_entry(entry_path))
+            except OSError:
+                types = []
+            changed |= cache.set(entry_id, types, listed[entry_id])
+        if changed:
+            write_atomic(path, cache.text())
+    return changed
@@ -0,0 +1,40 @@
+import os
+
+# Snap and Flatpak export their launchers here. Their profile scripts add
+# these to XDG_DATA_DIRS; ones that are missing are still listed, below
+# everything from the environment.
+EXTRA_DATA_DIRS = [
+    os.path.expanduser("~/.local/share/flatpak/exports/share"),
+    "/var/lib/flatpak/exports/share",
+    "/var/lib/snapd/desktop",
+]
+
+
+def data_home():
+    return os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+
+
+def data_dirs():
+    """$XDG_DATA_DIRS in precedence order (highest first); relative entries are ignored."""
+    value = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+    return [d for d in value.split(":") if os.path.isabs(d)]
+
+
+def application_dirs():
+    """Every applications directory, lowest precedence first (scan order).
+
+    The user directory under XDG_DATA_HOME comes last, so it wins.
+    """
+    dirs = []
+    for base in [data_home()] + data_dirs() + EXTRA_DATA_DIRS:
+        path = os.path.join(os.path.normpath(base), "applications")
+        if path not in dirs:
+            dirs.append(path)
+    return dirs[::-1]
+
+
+# Changes always save here to override the system
+USER_DIR = os.path.join(os.path.normpath(data_home()), "applications")
+
+# System, Snap and Flatpak directories, lowest precedence first
+SEARCH_DIRS = [d for d in application_dirs() if d != USER_DIR]
@@ -0,0 +1,70 @@
+class Preset:
+    """A Wayland/X11 override that rewrites an Exec= command line."""
+
+    __slots__ = ("name", "label", "marker", "_rewrite")
+
+    def __init__(self, name, label, marker, rewrite):
+        self.name = name
+        self.label = label
+        # Present in Exec once the preset (or an equivalent manual edit) is applied
+        self.marker = marker
+        self._rewrite = rewrite
+
+    def apply(self, exec_cmd):
+        """Return ``exec_cmd`` with the override injected; unchanged if already present."""
+        exec_cmd = exec_cmd.strip()
+        if self.marker in exec_cmd:
+            return exec_cmd
+        return self._rewrite(exec_cmd)
+
+
+def _ozone_wayland(exec_cmd):
+    # The flag must come before the first field code (%U, %F, ...)
+    if "%" in exec_cmd:
+        parts = exec_cmd.split("%", 1)
+        return f"{parts[0].strip()} --ozone-platform=wayland %{parts[1]}"
+    return f"{exec_cmd} --ozone-platform=wayland"
+
+
+def _env(assignments):
+    return lambda exec_cmd: f"env {assignments} {exec_cmd}"
+
+
+PRESETS = [
+    Preset("electron-wayland", "Force Wayland (Electron Apps) -> --ozone-platform=wayland",
+           "--ozone-platform=wayland", _ozone_wayland),
+    Preset("gtk-wayland", "Force Wayland (GTK Apps) -> env GDK_BACKEND=wayland",
+           "GDK_BACKEND", _env("GDK_BACKEND=wayland")),
+    Preset("qt-wayland", "Force Wayland (Qt Apps) -> env QT_QPA_PLATFORM=wayland",
+           "QT_QPA_PLATFORM", _env("QT_QPA_PLATFORM=wayland")),
+    Preset("firefox-wayland", "Force Wayland (Firefox) -> env MOZ_ENABLE_WAYLAND=1",
+           "MOZ_ENABLE_WAYLAND", _env("MOZ_ENABLE_WAYLAND=1")),
+    Preset("x11", "Force X11/Xorg (Generic) -> env GDK_BACKEND=x11 QT_QPA_PLATFORM=xcb",
+           "xcb", _env("GDK_BACKEND=x11 QT_QPA_PLATFORM=xcb")),
+]
+
+PRESETS_BY_NAME = {preset.name: preset for preset in PRESETS}
+
+# toolkit id -> (display label, suggested preset)
+TOOLKITS = {
+    "electron": ("Electron/Chromium", "electron-wayland"),
+    "gecko": ("Firefox (Gecko)", "firefox-wayland"),
+    "qt": ("Qt/KDE", "qt-wayland"),
+    "gtk": ("GTK/GNOME", "gtk-wayland"),
+}
+
+
+def guess_toolkit(entry):
+    """Best-effort toolkit id for an entry (anything with ``.get(key, default)``), or None."""
+    exec_cmd = entry.get("Exec", "").lower()
+    categories = entry.get("Categories", "")
+
+    if any(k in exec_cmd for k in ["electron", "discord", "slack", "obsidian", "vscode", "code"]):
+        return "electron"
+    if any(k in exec_cmd for k in ["firefox", "librewolf", "thunderbird"]):
+        return "gecko"
+    if "Qt" in categories or "KDE" in categories:
+        return "qt"
+    if "GTK" in categories or "GNOME" in categories:
+        return "gtk"
+    return None
@@ -0,0 +1,104 @@
+import os
+
+from .scanner import desktop_id
+
+
+class EntryResolver:
+    """Resolves desktop file IDs across application directories.
+
+    ``directories`` is in precedence order, lowest first, matching the scan
+    order. Every ID has a stack of the directories that provide it, highest
+    precedence first: the head is the entry launchers use, the rest are
+    shadowed by it. Stacks are kept up to date as entries arrive, so a full
+    resolution is one pass over the files, and removing an override brings
+    the entry below it back without rescanning.
+    """
+
+    def __init__(self, directories):
+        self.directories = list(directories)
+        self._rank = {d: i for i, d in enumerate(self.directories)}
+        self._entries = {d: {} for d in self.directories}   # directory -> {id: entry}
+        self._stacks = {}                                     # id -> [rank, ...], highest first
+        self._roots = {}                                      # parent dir of a file -> directory
+
+    def clear(self):
+        for entries in self._entries.values():
+            entries.clear()
+        self._stacks.clear()
+
+    def root_for(self, path):
+        """The scanned directory ``path`` lies in, or None."""
+        parent = os.path.dirname(path)
+        if parent in self._roots:
+            return self._roots[parent]
+        best = None
+        for directory in self.directories:
+            if (parent == directory or parent.startswith(directory + os.sep)) \
+                    and (best is None or len(directory) > len(best)):
+                best = directory
+        self._roots[parent] = best
+        return best
+
+    def _push(self, entry_id, rank):
+        stack = self._stacks.setdefault(entry_id, [])
+        if rank in stack:
+            return
+        i = 0
+        while i < len(stack) and stack[i] > rank:
+            i += 1
+        stack.insert(i, rank)
+
+    def _pop(self, entry_id, rank):
+        stack = self._stacks.get(entry_id)
+        if stack and rank in stack:
+            stack.remove(rank)
+            if not stack:
+                del self._stacks[entry_id]
+
+    def add(self, entry):
+        """Record ``entry`` under its directory; returns its desktop ID (None if unscanned)."""
+        directory = self.root_for(entry.path)
+        if directory is None:
+            return None
+        entry_id = desktop_id(directory, entry.path)
+        self._entries[directory][entry_id] = entry
+        self._push(entry_id, self._rank[directory])
+        return entry_id
+
+    def remove(self, path):
+        directory = self.root_for(path)
+        if directory is None:
+            return None
+        entry_id = desktop_id(directory, path)
+        entry = self._entries[directory].get(entry_id)
+        if entry is not None and entry.path == path:
+            del self._entries[directory][entry_id]
+            self._pop(entry_id, self._rank[directory])
+        return entry_id
+
+    def directory_entries(self, directory):
+        return dict(self._entries.get(directory, {}))
+
+    def set_directory(self, directory, entries):
+        rank = self._rank[directory]
+        old = self._entries[directory]
+        for entry_id in old.keys() - entries.keys():
+            self._pop(entry_id, rank)
+        for entry_id in entries.keys() - old.keys():
+            self._push(entry_id, rank)
+        self._entries[directory] = dict(entries)
+
+    def stack(self, entry_id):
+        """Entries providing ``entry_id``, highest precedence first."""
+        return [self._entries[self.directories[rank]][entry_id]
+                for rank in self._stacks.get(entry_id, ())]
+
+    def winner(self, entry_id):
+        stack = self._stacks.get(entry_id)
+        if not stack:
+            return None
+        return self._entries[self.directories[stack[0]]][entry_id]
+
+    def shadowed(self, entry_id):
+        """Entries hidden by the winner of ``entry_id``, highest precedence first."""
+        return self.stack(entry_id)[1:]
@@ -0,0 +1,262 @@
+import os
+
+from .entry import DesktopEntry, parse_desktop_entry
+from .index import stat_key
+from .metrics import METRICS
+
+
+def read_entry(path, index=None, key=None):
+    """Parse ``path``, reusing the index record when its stat key matches.
+
+    Unreadable files yield an empty record so they still show up in the list.
+    """
+    try:
+        if key is None:
+            key = stat_key(os.stat(path))
+        if index is not None:
+            cached = index.cached_entry(path, key)
+            if cached is not None:
+                METRICS.count("scan.index_hits")
+                return cached
+        with METRICS.timer("entry.parse"):
+            entry = parse_desktop_entry(path)
+    except OSError:
+        METRICS.count("scan.unreadable")
+        return DesktopEntry(path)
+    if index is not None:
+        index.store_entry(path, key, entry)
+    return entry
+
+
+def list_directory(directory, index=None):
+    """Return ``(names, subdirs, trusted)`` for ``directory``.
+
+    ``names`` are the .desktop files and ``subdirs`` the subdirectories
+    that may hold more. ``trusted`` is True when the listing came from the
+    index because the directory mtime is unchanged; its files then need no
+    stat either. Raises OSError if the directory is unreadable.
+    """
+    dir_key = stat_key(os.stat(directory))
+    if index is not None:
+        cached = index.listing(directory, dir_key)
+        if cached is not None:
+            names = [n for n in cached if not n.endswith("/")]
+            subdirs = [n[:-1] for n in cached if n.endswith("/")]
+            return names, subdirs, True
+
+    names = []
+    subdirs = []
+    with os.scandir(directory) as it:
+        for item in it:
+            f = item.name
+            # [SECURE] Validate that full_path is inside the directory (basic check)
+            if os.path.dirname(os.path.join(directory, f)) != directory:
+                continue
+            if f.endswith(".desktop"):
+                names.append(f)
+            # [SECURE] Symlinked subdirectories are not followed (no loops, no escapes)
+            elif item.is_dir(follow_symlinks=False):
+                subdirs.append(f)
+    names.sort()
+    subdirs.sort()
+    if index is not None:
+        # Subdirectories are stored with a trailing "/" next to the file names
+        index.store_listing(directory, dir_key, names + [d + "/" for d in subdirs])
+    return names, subdirs, False
+
+
+def list_tree(root, index=None, cancelled=None):
+    """List ``root`` and its subdirectories as ``(directory, names, trusted, prefix)``.
+
+    ``prefix`` turns a name into its desktop file ID: files in
+    ``root/kde4`` get ``kde4-``, so ``kde4/foo.desktop`` is
+    ``kde4-foo.desktop``. Unreadable subdirectories are skipped; raises
+    OSError if ``root`` itself is unreadable. Once ``cancelled()`` is
+    true, returns what was listed so far.
+    """
+    listings = []
+    pending = [(root, "")]
+    while pending:
+        if cancelled is not None and cancelled():
+            break
+        directory, prefix = pending.pop()
+        try:
+            names, subdirs, trusted = list_directory(directory, index)
+        except OSError:
+            if directory == root:
+                raise
+            continue
+        listings.append((directory, names, trusted, prefix))
+        pending.extend((os.path.join(directory, d), f"{prefix}{d}-") for d in reversed(subdirs))
+    return listings
+
+
+def desktop_id(root, path):
+    """Desktop file ID of ``path`` below ``root`` (subdirectories joined by "-")."""
+    return path[len(root) + 1:].replace(os.sep, "-")
+
+
+def load_entry(path, index=None, trusted=False):
+    """Record for ``path``; ``trusted`` skips the stat for unchanged directories."""
+    if trusted:
+        entry = index.cached_entry(path)
+        if entry is not None:
+            METRICS.count("scan.index_hits")
+            return entry
+    return read_entry(path, index)
+
+
+def scan_directory(directory, index=None):
+    """Return ``{desktop_id: DesktopEntry}`` for the .desktop files below ``directory``.
+
+    Directories whose mtime matches the index are neither listed nor are
+    their files stat'ed. Raises OSError if the directory is unreadable.
+    """
+    return {prefix + f: load_entry(os.path.join(d, f), index, trusted)
+            for d, names, trusted, prefix in list_tree(directory, index) for f in names}
+
+
+def rescan_directory(directory, previous, index=None):
+    """Diff the tree at ``directory`` against ``previous`` (``{desktop_id: DesktopEntry}``).
+
+    Returns ``(current, changed, directories)``: the tree's entries now,
+    the IDs that were added, modified or removed, and every directory
+    walked. Files whose stat key still matches the index keep their
+    previous record without a reparse. Raises OSError if the directory is
+    unreadable.
+    """
+    listings = list_tree(directory, index)
+    current = {}
+    changed = set()
+    for d, names, _, prefix in listings:
+        for f in names:
+            path = os.path.join(d, f)
+            try:
+                key = stat_key(os.stat(path))
+            except OSError:
+                continue
+            entry_id = prefix + f
+            old = previous.get(entry_id)
+            cached = index.entries.get(path) if index is not None else None
+            if old is not None and old.path == path and cached is not None and cached[0] == key:
+                current[entry_id] = old
+                continue
+            current[entry_id] = read_entry(path, index, key)
+            changed.add(entry_id)
+    changed.update(f for f in previous if f not in current)
+    return current, changed, [listing[0] for listing in listings]
+
+
+def _read_chunk(jobs):
+    """Pool task: stat and parse ``(path, cached_key)`` jobs.
+
+    Returns ``(path, key, row)``; ``row`` is None when the file still
+    matches ``cached_key`` (or could not be read, in which case ``key`` is
+    None too). Keys and rows rather than stat results and records keep the
+    pickled payload small.
+    """
+    results = []
+    for path, cached_key in jobs:
+        try:
+            key = stat_key(os.stat(path))
+            if key == cached_key:
+                results.append((path, key, None))
+                continue
+            results.append((path, key, parse_desktop_entry(path).to_row()))
+        except OSError:
+            results.append((path, None, None))
+    return results
+
+
+def _make_executor(workers, use_processes, initializer=None, initargs=()):
+    # Imported here: the pools cost ~10 ms to import and serial scans never need them
+    import concurrent.futures
+    import multiprocessing
+    if not use_processes:
+        return concurrent.futures.ThreadPoolExecutor(max_workers=workers, initializer=initializer,
+                                                     initargs=initargs)
+    # fork() is unsafe from a threaded (Qt) process; forkserver keeps workers clean
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    return concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                                  initializer=initializer, initargs=initargs)
+
+
+def iter_entries(listings, index=None, workers=1, chunk_size=256, use_processes=True,
+                 cancelled=None):
+    """Yield batches of ``(desktop_id, DesktopEntry)`` for ``listings``.
+
+    ``listings`` is a list of ``(directory, names, trusted, prefix)`` as
+    returned by list_tree, in precedence order (lowest first, USER_DIR last).
+    Batches always come back in that order, so merging them with "last one
+    wins" gives the same result for any worker count. With ``workers > 1``
+    the files that are not already indexed are stat'ed and parsed in a
+    process pool (or threads with ``use_processes=False``); the index itself
+    is only read and updated on the calling thread.
+    """
+    items = [(prefix + f, os.path.join(directory, f), trusted)
+             for directory, names, trusted, prefix in listings for f in names]
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+    if workers <= 1:
+        for chunk in chunks:
+            if cancelled is not None and cancelled():
+                return
+            yield [(f, load_entry(path, index, trusted)) for f, path, trusted in chunk]
+        return
+
+    def jobs_for(chunk):
+        jobs = []
+        for f, path, trusted in chunk:
+            cached = index.entries.get(path) if index is not None else None
+            if trusted and cached is not None:
+                continue
+            jobs.append((path, cached[0] if cached else None))
+        return jobs
+
+    executor = _make_executor(workers, use_processes)
+    try:
+        futures = [executor.submit(_read_chunk, jobs_for(chunk)) for chunk in chunks]
+        for chunk, future in zip(chunks, futures):
+            if cancelled is not None and cancelled():
+                return
+            parsed = {}
+            for path, key, row in future.result():
+                if key is None:
+                    METRICS.count("scan.unreadable")
+                    parsed[path] = DesktopEntry(path)
+                elif row is None:
+                    # Unchanged per the worker; read_entry re-checks the key here
+                    parsed[path] = read_entry(path, index, key)
+                else:
+                    METRICS.count("scan.parsed_in_workers")
+                    parsed[path] = DesktopEntry.from_row(path, row)
+                    if index is not None:
+                        index.store_entry(path, key, parsed[path])
+            batch = []
+            for f, path, trusted in chunk:
+                entry = parsed.get(path)
+                if entry is None:
+                    METRICS.count("scan.index_hits")
+                    entry = index.cached_entry(path)
+                batch.append((f, entry))
+            yield batch
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def scan_all(directories, index=None, workers=1, use_processes=True):
+    """Scan ``directories`` (lowest precedence first) into ``{desktop_id: entry}``.
+
+    Missing or unreadable directories are skipped.
+    """
+    listings = []
+    for directory in directories:
+        try:
+            listings.extend(list_tree(directory, index))
+        except OSError:
+            continue
+    merged = {}
+    for batch in iter_entries(listings, index, workers, use_processes=use_processes):
+        merged.update(batch)
+    return merged
@@ -0,0 +1,179 @@
+import re
+
+# Searchable fields with (substring, token prefix) weights. A term scores the
+# best weight among the fields it matches, so a prefix hit on Name beats a
+# substring hit in Exec; an entry's score is the sum over the query terms.
+FIELD_WEIGHTS = {
+    "name": (40, 100),
+    "generic": (20, 50),
+    "keywords": (20, 50),
+    "file": (10, 30),
+    "categories": (5, 15),
+    "exec": (2, 5),
+}
+
+# Query prefixes that restrict a term to one field, e.g. "cat:Development"
+FIELD_PREFIXES = {
+    "name": "name",
+    "generic": "generic",
+    "kw": "keywords",
+    "keyword": "keywords",
+    "keywords": "keywords",
+    "file": "file",
+    "cat": "categories",
+    "category": "categories",
+    "categories": "categories",
+    "exec": "exec",
+}
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+def parse_query(text):
+    """Split ``text`` into ``(field, term)`` pairs; ``field`` is None for free terms.
+
+    ``cat:Development exec:electron`` gives
+    ``[("categories", "development"), ("exec", "electron")]``. Unknown
+    prefixes are searched as plain text.
+    """
+    terms = []
+    for word in text.split():
+        prefix, sep, value = word.partition(":")
+        field = FIELD_PREFIXES.get(prefix.lower()) if sep else None
+        if field is None:
+            terms.extend((None, token) for token in tokenize(word))
+        else:
+            terms.extend((field, token) for token in tokenize(value))
+    return terms
+
+
+def entry_fields(filename, entry):
+    return (
+        ("name", entry.display_name),
+        ("generic", entry.generic_name),
+        ("keywords", entry.keywords),
+        ("file", filename),
+        ("categories", entry.categories),
+        ("exec", entry.exec),
+    )
+
+
+class SearchIndex:
+    """Inverted token index over the searchable fields of desktop entries.
+
+    Entries are identified by an integer slot chosen by the caller. A query
+    term is matched against the token vocabulary (a substring test) and the
+    postings of the matching tokens are merged into one slot set per field
+    and match kind; scoring and intersecting terms are then set and dict
+    operations that run in C. Term results are cached until the index
+    changes, and a term that extends a cached one (typing forward) only
+    rescans the tokens that matched before.
+    """
+
+    MAX_CACHED_TERMS = 8
+
+    def __init__(self):
+        # field -> token -> slots. Most tokens (numbers, unique names) occur
+        # once, so a single slot is kept as a 1-tuple, a quarter of a set's size
+        self._postings = {field: {} for field in FIELD_WEIGHTS}
+        # term -> ({field: matching tokens}, {field: (prefix slots, substring slots)})
+        self._term_cache = {}
+
+    def clear(self):
+        for tokens in self._postings.values():
+            tokens.clear()
+        self._term_cache.clear()
+
+    def add(self, slot, filename, entry):
+        postings = self._postings
+        for field, text in entry_fields(filename, entry):
+            tokens = postings[field]
+            for token in set(tokenize(text)):
+                slots = tokens.get(token)
+                if slots is None:
+                    tokens[token] = (slot,)
+                elif type(slots) is tuple:
+                    tokens[token] = {slots[0], slot}
+                else:
+                    slots.add(slot)
+        self._term_cache.clear()
+
+    def discard(self, slot, filename, entry):
+        """Forget ``slot``; ``filename`` and ``entry`` must be what was added."""
+        postings = self._postings
+        for field, text in entry_fields(filename, entry):
+            tokens = postings[field]
+            for token in set(tokenize(text)):
+                slots = tokens.get(token)
+                if slots is None:
+                    continue
+                if type(slots) is tuple:
+                    if slots[0] == slot:
+                        del tokens[token]
+                    continue
+                slots.discard(slot)
+                if len(slots) == 1:
+                    tokens[token] = tuple(slots)
+                elif not slots:
+                    del tokens[token]
+        self._term_cache.clear()
+
+    def _term_matches(self, term):
+        cached = self._term_cache.get(term)
+        if cached is not None:
+            return cached[1]
+        # Tokens containing "ap" are a subset of those containing "a"
+        base = max((t for t in self._term_cache if t in term), key=len, default=None)
+        matched_tokens = {}
+        matches = {}
+        for field, tokens in self._postings.items():
+            pool = self._term_cache[base][0][field] if base is not None else tokens
+            found = [t for t in pool if term in t]
+            matched_tokens[field] = found
+            if not found:
+                continue
+            prefix = [tokens[t] for t in found if t.startswith(term)]
+            substring = [tokens[t] for t in found if not t.startswith(term)]
+            matches[field] = (set().union(*prefix), set().union(*substring))
+        if len(self._term_cache) >= self.MAX_CACHED_TERMS:
+            self._term_cache.clear()
+        self._term_cache[term] = (matched_tokens, matches)
+        return matches
+
+    def _term_scores(self, field_filter, term):
+        """``{slot: best weight}`` for the entries ``term`` matches."""
+        weighted = []
+        for field, (prefix, substring) in self._term_matches(term).items():
+            if field_filter is not None and field != field_filter:
+                continue
+            substring_weight, prefix_weight = FIELD_WEIGHTS[field]
+            weighted.append((substring_weight, substring))
+            weighted.append((prefix_weight, prefix))
+        best = {}
+        # Lowest weight first, so higher weights overwrite
+        for weight, slots in sorted(weighted, key=lambda item: item[0]):
+            best.update(dict.fromkeys(slots, weight))
+        return best
+
+    def search(self, text):
+        """Return ``{slot: score}`` for entries matching every term of ``text``.
+
+        Returns None for a query with no terms (everything matches).
+        """
+        terms = parse_query(text)
+        if not terms:
+            return None
+        scores = None
+        for field, term in terms:
+            best = self._term_scores(field, term)
+            if scores is None:
+                scores = best
+            else:
+                scores = {slot: scores[slot] + best[slot] for slot in scores.keys() & best.keys()}
+            if not scores:
+                break
+        return scores
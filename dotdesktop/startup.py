@@ -0,0 +1,104 @@
+import os
+import statistics
+
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_KIB = (os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096) // 1024
+
+
+def process_tree(pid):
+    """``pid`` and its live descendants, from /proc/PID/task/*/children.
+
+    Returns just ``[pid]`` where the kernel does not provide children lists.
+    """
+    pids = [pid]
+    for parent in pids:
+        try:
+            tasks = os.listdir(f"/proc/{parent}/task")
+        except OSError:
+            continue
+        for tid in tasks:
+            try:
+                with open(f"/proc/{parent}/task/{tid}/children") as fh:
+                    pids.extend(int(child) for child in fh.read().split())
+            except (OSError, ValueError):
+                pass
+    return pids
+
+
+def sample(pids):
+    """``(resident KiB, CPU seconds)`` summed over ``pids``; vanished ones count 0."""
+    rss = 0
+    ticks = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/statm") as fh:
+                rss += int(fh.read().split()[1]) * _PAGE_KIB
+            with open(f"/proc/{pid}/stat") as fh:
+                # Fields after the command name, which may contain spaces and ")"
+                fields = fh.read().rpartition(")")[2].split()
+            ticks += int(fields[11]) + int(fields[12])    # utime + stime
+        except (OSError, ValueError, IndexError):
+            pass
+    return rss, ticks / _CLK_TCK
+
+
+class LaunchResult:
+    """What one supervised launch measured.
+
+    ``ready_ms`` is None if readiness was not seen before the process
+    exited or the timeout; ``ready_by`` names the signal that was used
+    ("marker", "window" or "idle"). ``peak_rss_kib`` is the largest
+    resident size of the whole process tree seen while sampling.
+    ``status`` is "exited", "crashed", "stopped" (ended by the profiler)
+    or "failed" (could not start; see ``error``). ``exit_code`` is None
+    when it is not known, e.g. for a detached process.
+    """
+
+    __slots__ = ("label", "args", "ready_ms", "ready_by", "peak_rss_kib", "exit_code", "status",
+                 "error")
+
+    def __init__(self, label, args):
+        self.label = label
+        self.args = args
+        self.ready_ms = None
+        self.ready_by = None
+        self.peak_rss_kib = 0
+        self.exit_code = None
+        self.status = None
+        self.error = ""
+
+    def describe(self):
+        ready = f"ready in {self.ready_ms:.0f} ms ({self.ready_by})" if self.ready_ms is not None \
+            else "readiness not detected"
+        if self.status == "failed":
+            outcome = self.error
+        elif self.exit_code is None:
+            outcome = self.status
+        else:
+            outcome = f"{self.status}, code {self.exit_code}"
+        return f"{ready}, peak RSS {self.peak_rss_kib / 1024:.1f} MiB, {outcome}"
+
+
+def summarize(results):
+    """Per label, in first-seen order: ``(label, runs, ready p50, min, max, RSS p50 KiB, failures)``.
+
+    Timings are None when no run of that label became ready; runs that
+    never became ready or failed to start count as failures.
+    """
+    by_label = {}
+    for result in results:
+        by_label.setdefault(result.label, []).append(result)
+    rows = []
+    for label, runs in by_label.items():
+        ready = sorted(r.ready_ms for r in runs if r.ready_ms is not None)
+        rss = [r.peak_rss_kib for r in runs if r.status != "failed"]
+        rows.append((
+            label,
+            len(runs),
+            statistics.median(ready) if ready else None,
+            ready[0] if ready else None,
+            ready[-1] if ready else None,
+            statistics.median(rss) if rss else None,
+            len(runs) - len(ready),
+        ))
+    return rows
@@ -0,0 +1,48 @@
+class EntryStore:
+    """Resolved desktop entries addressed by a stable integer slot.
+
+    Struct-of-arrays: ``ids`` maps slot -> desktop ID and ``entries`` slot ->
+    DesktopEntry. Slots are handed out in insertion order and never reused;
+    replacing an entry keeps its slot and removing one leaves the slot
+    empty (None), so the view model and the search index can refer to
+    entries by slot alone. Records are shared with the scan index, not
+    copied.
+    """
+
+    def __init__(self):
+        self.ids = []       # slot -> desktop ID
+        self.entries = []   # slot -> DesktopEntry, None once removed
+        self.slots = {}     # desktop ID -> slot
+
+    def __len__(self):
+        return len(self.slots)
+
+    def clear(self):
+        self.ids.clear()
+        self.entries.clear()
+        self.slots.clear()
+
+    def slot(self, entry_id):
+        return self.slots.get(entry_id)
+
+    def put(self, entry_id, entry):
+        """Store ``entry`` under ``entry_id``; returns ``(slot, previous entry or None)``."""
+        slot = self.slots.get(entry_id)
+        if slot is None:
+            slot = len(self.ids)
+            self.slots[entry_id] = slot
+            self.ids.append(entry_id)
+            self.entries.append(entry)
+            return slot, None
+        previous = self.entries[slot]
+        self.entries[slot] = entry
+        return slot, previous
+
+    def remove(self, entry_id):
+        """Drop ``entry_id``; returns ``(slot, removed entry)`` or ``(None, None)``."""
+        slot = self.slots.pop(entry_id, None)
+        if slot is None:
+            return None, None
+        previous = self.entries[slot]
+        self.entries[slot] = None
+        return slot, previous
@@ -0,0 +1,254 @@
+import os
+import struct
+
+from .index import is_racy, stat_key
+from .launch import exec_args
+from .presets import guess_toolkit
+
+# DT_NEEDED prefixes that identify a toolkit, checked in order
+NEEDED_MARKERS = [
+    ("libxul.so", "gecko"),
+    ("libffmpeg.so", "electron"),
+    ("libnode.so", "electron"),
+    ("libQt", "qt"),
+    ("libKF5", "qt"),
+    ("libKF6", "qt"),
+    ("libgtk-", "gtk"),
+    ("libadwaita-", "gtk"),
+]
+
+# Files shipped next to the binary
+SIBLING_MARKERS = [
+    ("resources/app.asar", "electron"),
+    ("v8_context_snapshot.bin", "electron"),
+    ("chrome_100_percent.pak", "electron"),
+    ("omni.ja", "gecko"),
+    ("libxul.so", "gecko"),
+]
+
+# Substrings of launcher scripts, checked in order
+SCRIPT_MARKERS = [
+    ("ELECTRON_RUN_AS_NODE", "electron"),
+    ("app.asar", "electron"),
+    ("electron", "electron"),
+    ("MOZ_", "gecko"),
+    ("firefox", "gecko"),
+    ("PySide", "qt"),
+    ("PyQt", "qt"),
+    ("QT_", "qt"),
+    ("'Gtk'", "gtk"),
+    ('"Gtk"', "gtk"),
+    ("GDK_", "gtk"),
+]
+
+SCRIPT_READ_BYTES = 64 * 1024
+MAX_STRTAB_BYTES = 1024 * 1024
+
+# Wrappers whose first real argument is the program (env FOO=1 prog ...)
+_WRAPPERS = frozenset(("env", "nice", "ionice", "taskset", "nohup"))
+
+_PT_LOAD, _PT_DYNAMIC = 1, 2
+_DT_NULL, _DT_NEEDED, _DT_STRTAB, _DT_STRSZ = 0, 1, 5, 10
+
+
+def program_word(exec_cmd):
+    """The program an Exec line runs, past ``env VAR=...`` style wrappers; None if none."""
+    if '"' in exec_cmd or "'" in exec_cmd or "\\" in exec_cmd:
+        try:
+            words = exec_args(exec_cmd)
+        except ValueError:
+            return None
+    else:
+        words = exec_cmd.split()
+    for word in words:
+        if "=" in word and not word.startswith("/"):
+            continue
+        if os.path.basename(word) in _WRAPPERS or word.startswith("-"):
+            continue
+        return word
+    return None
+
+
+def resolve_program(word, path=None):
+    """Absolute, symlink-free path of ``word`` (searched in $PATH), or None."""
+    if os.sep in word:
+        candidates = [word] if os.path.isabs(word) else []
+    else:
+        dirs = (path if path is not None else os.environ.get("PATH", os.defpath)).split(os.pathsep)
+        candidates = [os.path.join(d, word) for d in dirs if d]
+    for candidate in candidates:
+        if os.path.isfile(candidate) and os.access(candidate, os.X_OK):
+            return os.path.realpath(candidate)
+    return None
+
+
+def elf_needed(fh):
+    """DT_NEEDED library names of the ELF file open as ``fh``; None if not ELF.
+
+    Only the header, program headers, dynamic segment and string table are
+    read, so this is cheap even for very large binaries.
+    """
+    ident = fh.read(16)
+    if len(ident) < 16 or ident[:4] != b"\x7fELF" or ident[4] not in (1, 2) or ident[5] not in (1, 2):
+        return None
+    wide = ident[4] == 2
+    order = "<" if ident[5] == 1 else ">"
+    header = fh.read(48 if wide else 36)
+    if wide:
+        phoff, = struct.unpack_from(order + "Q", header, 16)
+        phentsize, phnum = struct.unpack_from(order + "HH", header, 38)
+        phdr, dyn = order + "IIQQQQQQ", order + "qQ"
+    else:
+        phoff, = struct.unpack_from(order + "I", header, 12)
+        phentsize, phnum = struct.unpack_from(order + "HH", header, 26)
+        phdr, dyn = order + "IIIIIIII", order + "iI"
+    fh.seek(phoff)
+    table = fh.read(phentsize * phnum)
+    loads = []
+    dynamic = None
+    for i in range(min(phnum, len(table) // max(phentsize, 1))):
+        fields = struct.unpack_from(phdr, table, i * phentsize)
+        if wide:
+            p_type, _, p_offset, p_vaddr, _, p_filesz = fields[:6]
+        else:
+            p_type, p_offset, p_vaddr, _, p_filesz = fields[:5]
+        if p_type == _PT_LOAD:
+            loads.append((p_vaddr, p_offset, p_filesz))
+        elif p_type == _PT_DYNAMIC:
+            dynamic = (p_offset, min(p_filesz, 64 * 1024))
+    if dynamic is None:
+        return []
+    fh.seek(dynamic[0])
+    data = fh.read(dynamic[1])
+    size = struct.calcsize(dyn)
+    needed = []
+    strtab = strsz = None
+    for i in range(len(data) // size):
+        tag, value = struct.unpack_from(dyn, data, i * size)
+        if tag == _DT_NULL:
+            break
+        if tag == _DT_NEEDED:
+            needed.append(value)
+        elif tag == _DT_STRTAB:
+            strtab = value
+        elif tag == _DT_STRSZ:
+            strsz = value
+    if strtab is None or not needed:
+        return []
+    # DT_STRTAB is a virtual address; find the file offset through PT_LOAD
+    for vaddr, offset, filesz in loads:
+        if vaddr <= strtab < vaddr + filesz:
+            fh.seek(strtab - vaddr + offset)
+            break
+    else:
+        return []
+    strings = fh.read(min(strsz or MAX_STRTAB_BYTES, MAX_STRTAB_BYTES))
+    names = []
+    for start in needed:
+        end = strings.find(b"\0", start)
+        if 0 <= start < len(strings) and end > start:
+            names.append(strings[start:end].decode("utf-8", "replace"))
+    return names
+
+
+def inspect_program(path):
+    """Toolkit id for the executable at ``path`` from its contents, or None.
+
+    ELF binaries are judged by the libraries they link and the files next
+    to them; scripts by markers in their first 64 KiB. Nothing is run.
+    """
+    directory = os.path.dirname(path)
+    with open(path, "rb") as fh:
+        needed = elf_needed(fh)
+        if needed is None:
+            fh.seek(0)
+            head = fh.read(SCRIPT_READ_BYTES)
+    if needed is None:
+        if not head.startswith(b"#!"):
+            return None
+        text = head.decode("utf-8", "replace")
+        for marker, toolkit in SCRIPT_MARKERS:
+            if marker in text:
+                return toolkit
+        return None
+    for name in needed:
+        for prefix, toolkit in NEEDED_MARKERS:
+            if name.startswith(prefix):
+                return toolkit
+    for relative, toolkit in SIBLING_MARKERS:
+        if os.path.exists(os.path.join(directory, relative)):
+            return toolkit
+    return None
+
+
+class ToolkitDetector:
+    """Toolkit per entry from its Exec binary, with guess_toolkit as the fallback.
+
+    detect() resolves the program (once per session per program word) and
+    inspects it once per binary version: results are stored in the scan
+    index keyed by binary path and validated by its stat key, so later runs
+    only stat each binary. cached() never touches the filesystem; it is
+    what the list model calls while painting, and falls back to the Exec
+    and Categories heuristics for entries detect() has not seen yet.
+    """
+
+    def __init__(self, index=None):
+        self.index = index
+        self._programs = {}    # program word -> resolved binary or None
+        self._by_exec = {}     # Exec line -> toolkit id or None
+
+    def binary_for(self, exec_cmd):
+        word = program_word(exec_cmd)
+        if word is None:
+            return None
+        if word not in self._programs:
+            self._programs[word] = resolve_program(word)
+        return self._programs[word]
+
+    def inspect(self, binary):
+        """Toolkit id of ``binary`` (None if unknown), from the index when unchanged."""
+        try:
+            key = stat_key(os.stat(binary))
+        except OSError:
+            return None
+        if self.index is not None:
+            cached = self.index.cached_toolkit(binary, key)
+            if cached is not None:
+                return cached or None
+        try:
+            toolkit = inspect_program(binary)
+        except (OSError, struct.error):
+            toolkit = None
+        if self.index is not None and not is_racy(key):
+            self.index.store_toolkit(binary, key, toolkit or "")
+        return toolkit
+
+    def detect(self, entry):
+        """Toolkit id for ``entry``; may stat and read its binary."""
+        exec_cmd = entry.exec
+        if exec_cmd in self._by_exec:
+            return self._by_exec[exec_cmd] or guess_toolkit(entry)
+        binary = self.binary_for(exec_cmd) if exec_cmd else None
+        toolkit = self.inspect(binary) if binary else None
+        self._by_exec[exec_cmd] = toolkit
+        return toolkit or guess_toolkit(entry)
+
+    def detect_all(self, entries, cancelled=None):
+        binaries = {}
+        for entry in entries:
+            if cancelled is not None and cancelled():
+                return
+            if entry.exec not in self._by_exec:
+                binary = self.binary_for(entry.exec) if entry.exec else None
+                if binary is not None and binary not in binaries:
+                    binaries[binary] = self.inspect(binary)
+                self._by_exec[entry.exec] = binaries.get(binary)
+
+    def cached(self, entry):
+        """Toolkit id for ``entry`` without any I/O."""
+        return self._by_exec.get(entry.exec) or guess_toolkit(entry)
+
+    def forget(self):
+        """Drop per-session results, e.g. before a full rescan ($PATH may have changed)."""
+        self._programs.clear()
+        self._by_exec.clear()
@@ -0,0 +1,335 @@
+import json
+import os
+
+from .entry import DesktopEntry
+from .icons import ICON_EXTENSIONS, icon_dirs
+from .index import is_racy, stat_key
+from .launch import exec_args
+from .metrics import METRICS
+from .toolkit import program_word, resolve_program
+
+CACHE_VERSION = 1
+
+# Registered categories from the Desktop Menu Specification; others need an "X-" prefix
+MAIN_CATEGORIES = frozenset((
+    "AudioVideo Audio Video Development Education Game Graphics Network Office Science Settings "
+    "System Utility").split())
+ADDITIONAL_CATEGORIES = frozenset((
+    "Building Debugger IDE GUIDesigner Profiling RevisionControl Translation Calendar "
+    "ContactManagement Database Dictionary Chart Email Finance FlowChart PDA ProjectManagement "
+    "Presentation Spreadsheet WordProcessor 2DGraphics VectorGraphics RasterGraphics 3DGraphics "
+    "Scanning OCR Photography Publishing Viewer TextTools DesktopSettings HardwareSettings Printing "
+    "PackageManager Dialup InstantMessaging Chat IRCClient Feed FileTransfer HamRadio News P2P "
+    "RemoteAccess Telephony TelephonyTools VideoConference WebBrowser WebDevelopment Midi Mixer "
+    "Sequencer Tuner TV AudioVideoEditing Player Recorder DiscBurning ActionGame AdventureGame "
+    "ArcadeGame BoardGame BlocksGame CardGame KidsGame LogicGame RolePlaying Shooter Simulation "
+    "SportsGame StrategyGame Art Construction Music Languages ArtificialIntelligence Astronomy "
+    "Biology Chemistry ComputerScience DataVisualization Economy Electricity Geography Geology "
+    "Geoscience History Humanities ImageProcessing Literature Maps Math NumericalAnalysis "
+    "MedicalSoftware Physics Robotics Spirituality Sports ParallelComputing Amusement Archiving "
+    "Compression Electronics Emulator Engineering FileTools FileManager TerminalEmulator Filesystem "
+    "Monitor Security Accessibility Calculator Clock TextEditor Documentation Adult Core KDE GNOME "
+    "XFCE DDE GTK Qt Motif Java ConsoleOnly Screensaver TrayIcon Applet Shell").split())
+
+FIELD_CODES = frozenset("fFuUick")
+DEPRECATED_FIELD_CODES = frozenset("dDnNvm")
+
+
+def default_cache_path():
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache_home, "dotdesktop", "validation.json")
+
+
+def icon_names(directories):
+    """Names (file name without extension) of every icon below ``directories``."""
+    names = set()
+    for directory in directories:
+        for _, _, files in os.walk(directory):
+            for f in files:
+                stem, ext = os.path.splitext(f)
+                if ext in ICON_EXTENSIONS:
+                    names.add(stem)
+    return frozenset(names)
+
+
+def icons_fingerprint(directories):
+    """Changes when icons are installed or removed (icon dirs, themes and their caches)."""
+    keys = []
+    for directory in directories:
+        paths = [directory]
+        try:
+            with os.scandir(directory) as it:
+                for item in it:
+                    if item.is_dir():
+                        paths += [item.path, os.path.join(item.path, "icon-theme.cache")]
+        except OSError:
+            pass
+        for path in sorted(paths):
+            try:
+                keys.append([path, os.stat(path).st_mtime_ns])
+            except OSError:
+                pass
+    return keys
+
+
+def field_code_issues(exec_cmd):
+    issues = []
+    file_codes = 0
+    i = exec_cmd.find("%")
+    while i != -1:
+        code = exec_cmd[i + 1:i + 2]
+        if code == "%":
+            i = exec_cmd.find("%", i + 2)
+            continue
+        if code in FIELD_CODES:
+            file_codes += code in "fFuU"
+        elif code in DEPRECATED_FIELD_CODES:
+            issues.append(("warning", f"deprecated field code %{code} in Exec"))
+        else:
+            issues.append(("error", f"invalid field code %{code or ' (at end)'} in Exec"))
+        i = exec_cmd.find("%", i + 2)
+    if file_codes > 1:
+        issues.append(("error", "more than one of %f %F %u %U in Exec"))
+    return issues
+
+
+class Checker:
+    """Checks one entry at a time; program lookups are memoized per instance."""
+
+    def __init__(self, icons=frozenset()):
+        self.icons = icons
+        self._programs = {}    # program word -> resolved binary or None
+
+    def resolve(self, word):
+        if word not in self._programs:
+            self._programs[word] = resolve_program(word)
+        return self._programs[word]
+
+    def check(self, entry):
+        """Return ``(binary, issues)``: the resolved Exec program (or None) and
+        a list of ``(severity, message)``, severity "error" or "warning".
+        """
+        if entry.hidden:
+            # Hidden=true marks the entry as deleted; nothing is shown for it
+            return None, []
+        if not (entry.type or entry.name or entry.exec):
+            return None, [("error", "no [Desktop Entry] group, or the file is unreadable")]
+        issues = []
+        if not entry.type:
+            issues.append(("error", "no Type= key"))
+        if not entry.name:
+            issues.append(("error", "no Name= key"))
+        binary = None
+        if entry.type == "Application" or (not entry.type and entry.exec):
+            if not entry.exec:
+                issues.append(("error", "no Exec= key"))
+            else:
+                issues += field_code_issues(entry.exec)
+                try:
+                    exec_args(entry.exec)
+                except ValueError:
+                    issues.append(("error", "unbalanced quotes in Exec"))
+                word = program_word(entry.exec)
+                binary = self.resolve(word) if word else None
+                if binary is None:
+                    issues.append(("error", f"program not found: {word or entry.exec}"))
+            if entry.try_exec and self.resolve(entry.try_exec) is None:
+                issues.append(("warning", f"TryExec program not found, launchers hide this entry: "
+                                          f"{entry.try_exec}"))
+        icon = entry.icon
+        if icon:
+            if os.path.isabs(icon):
+                if not os.path.isfile(icon):
+                    issues.append(("warning", f"icon file not found: {icon}"))
+            elif os.path.splitext(icon)[0] not in self.icons and icon not in self.icons:
+                issues.append(("warning", f"icon not found in any icon theme: {icon}"))
+        if entry.categories:
+            unknown = [c for c in entry.categories.split(";") if c and not c.startswith("X-")
+                       and c not in MAIN_CATEGORIES and c not in ADDITIONAL_CATEGORIES]
+            if unknown:
+                issues.append(("warning", f"unregistered categories (use an X- prefix): "
+                                          f"{';'.join(unknown)}"))
+            if not entry.categories.endswith(";"):
+                issues.append(("warning", "Categories should end with ';'"))
+        return binary, issues
+
+
+# Per worker process, set up once by _init_worker
+_checker = None
+# (fingerprint, icon names) of the last walk, reused while icons are unchanged
+_icons_memo = (None, frozenset())
+
+
+def _init_worker(icons):
+    global _checker
+    _checker = Checker(icons)
+
+
+def _check_chunk(rows):
+    """Pool task: ``[(path, row)]`` -> ``[(path, binary, binary key, issues)]``."""
+    results = []
+    for path, row in rows:
+        binary, issues = _checker.check(DesktopEntry.from_row(path, row))
+        results.append((path, binary, _binary_key(binary), issues))
+    return results
+
+
+def _binary_key(binary):
+    try:
+        return stat_key(os.stat(binary)) if binary else None
+    except OSError:
+        return None
+
+
+class ValidationCache:
+    """Validation results per file, reused while the file and its Exec binary are unchanged.
+
+    Each record holds the file's stat key, the resolved Exec binary and
+    its stat key. Entries whose program was not found are always checked
+    again, so installing it clears the error. The whole cache is dropped
+    when icons are installed or removed (see icons_fingerprint).
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_cache_path()
+        self.icons = None
+        self.records = {}       # path -> (file key, binary or None, binary key or None, issues)
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path=None):
+        """Load the cache at ``path``; an empty cache is returned on any error."""
+        cache = cls(path)
+        try:
+            with open(cache.path, encoding="utf-8") as fh:
+                data = json.load(fh)
+            if data.get("version") != CACHE_VERSION:
+                raise ValueError("unsupported cache version")
+            records = {p: (tuple(key), binary, tuple(binary_key) if binary_key else None,
+                           [tuple(issue) for issue in issues])
+                       for p, (key, binary, binary_key, issues) in data["records"].items()}
+            cache.icons = data["icons"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return cache
+        cache.records = records
+        return cache
+
+    def save(self):
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as fh:
+                json.dump({"version": CACHE_VERSION, "icons": self.icons, "records": self.records},
+                          fh, separators=(",", ":"))
+            os.replace(temp_path, self.path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        self._dirty = False
+
+    def clear(self):
+        self.records = {}
+        self.icons = None
+        self._dirty = True
+
+    def check_icons(self, fingerprint):
+        if fingerprint != self.icons:
+            self.records = {}
+            self.icons = fingerprint
+            self._dirty = True
+
+    def lookup(self, path, key, binary_keys):
+        """Cached issues for ``path`` if it and its binary are unchanged, else None."""
+        record = self.records.get(path)
+        if record is None or record[0] != key:
+            return None
+        binary = record[1]
+        if binary is None:
+            # No program to compare against; only trust records that needed none
+            if any(message.startswith("program not found") for _, message in record[3]):
+                return None
+            return record[3]
+        if binary not in binary_keys:
+            binary_keys[binary] = _binary_key(binary)
+        if binary_keys[binary] != record[2] or is_racy(record[2]):
+            return None
+        return record[3]
+
+    def store(self, path, key, binary, binary_key, issues):
+        if is_racy(key):
+            self.records.pop(path, None)
+        else:
+            self.records[path] = (key, binary, binary_key, issues)
+        self._dirty = True
+
+    def prune(self, paths):
+        """Forget files not in ``paths``."""
+        for path in [p for p in self.records if p not in paths]:
+            del self.records[path]
+            self._dirty = True
+
+
+def validate_entries(entries, cache=None, workers=1, use_processes=True, chunk_size=256, prune=True):
+    """Check ``entries`` (DesktopEntry records).
+
+    Returns ``(results, checked)``: ``{path: issues}`` for every entry and
+    how many were checked rather than taken from the cache.
+
+    Entries found unchanged in ``cache`` are not checked again. The rest
+    are checked here or, with ``workers > 1`` and enough of them, in a
+    process pool (threads with ``use_processes=False``). With a cache and
+    ``prune``, the records of files not in ``entries`` are dropped; pass
+    ``prune=False`` when ``entries`` is only part of the listed entries.
+    """
+    global _icons_memo
+    directories = icon_dirs()
+    fingerprint = icons_fingerprint(directories)
+    if cache is not None:
+        cache.check_icons(fingerprint)
+    results = {}
+    keys = {}
+    pending = []
+    binary_keys = {}
+    for entry in entries:
+        try:
+            key = stat_key(os.stat(entry.path))
+        except OSError:
+            key = None
+        cached = cache.lookup(entry.path, key, binary_keys) if cache is not None and key else None
+        if cached is not None:
+            results[entry.path] = cached
+        else:
+            keys[entry.path] = key
+            pending.append(entry)
+    METRICS.count("validate.cache_hits", len(results))
+    METRICS.count("validate.checked", len(pending))
+
+    checked = []
+    if pending:
+        if _icons_memo[0] != fingerprint:
+            _icons_memo = (fingerprint, icon_names(directories))
+        icons = _icons_memo[1]
+        if workers <= 1 or len(pending) < 2 * chunk_size:
+            checker = Checker(icons)
+            for entry in pending:
+                binary, issues = checker.check(entry)
+                checked.append((entry.path, binary, _binary_key(binary), issues))
+        else:
+            from .scanner import _make_executor
+            rows = [(entry.path, entry.to_row()) for entry in pending]
+            executor = _make_executor(workers, use_processes, _init_worker, (icons,))
+            try:
+                for chunk in executor.map(_check_chunk, (rows[i:i + chunk_size]
+                                                         for i in range(0, len(rows), chunk_size))):
+                    checked.extend(chunk)
+            finally:
+                executor.shutdown(wait=True)
+    for path, binary, binary_key, issues in checked:
+        results[path] = issues
+        if cache is not None and keys[path] is not None:
+            cache.store(path, keys[path], binary, binary_key, issues)
+    if cache is not None and prune:
+        cache.prune(results)
+    return results, len(pending)
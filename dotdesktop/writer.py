@@ -0,0 +1,143 @@
+import os
+import shutil
+import subprocess
+
+from .document import DesktopDocument
+from .scanner import desktop_id
+
+
+def read_document(path, cache=None):
+    """Editable DesktopDocument for ``path``, with a [Desktop Entry] group.
+
+    With a DocumentCache, an unchanged file is not read again.
+    """
+    document = cache.get(path) if cache is not None else DesktopDocument.load(path)
+    if "Desktop Entry" not in document:
+        document.add_group("Desktop Entry")
+    return document
+
+
+def override_path(filename, user_dir, current=None):
+    """Target path for an override of ``filename`` in ``user_dir``.
+
+    ``current`` is the file the ID resolves to now. When that is already
+    an override, possibly in a subdirectory such as kde4/, it is the
+    target, so the ID keeps a single file. Raises ValueError for unsafe
+    names or when the target is a symlink.
+    """
+    # [SECURE] Path Traversal & Filename Validation
+    # Ensure filename contains only safe characters and no directory separators
+    if not filename or "/" in filename or "\\" in filename or filename in [".", ".."]:
+        raise ValueError("Invalid filename detected.")
+    # Only desktop entries are overridden; never mimeinfo.cache or other files
+    if not filename.endswith(".desktop") or filename.startswith("."):
+        raise ValueError("Not a desktop file name.")
+
+    target_path = os.path.join(user_dir, filename)
+    if current is not None and current.startswith(user_dir + os.sep):
+        # [SECURE] Only a file that provides this ID, in a directory inside user_dir
+        real_dir = os.path.realpath(user_dir)
+        parent = os.path.realpath(os.path.dirname(current))
+        if desktop_id(user_dir, current) != filename or \
+                (parent != real_dir and not parent.startswith(real_dir + os.sep)):
+            raise ValueError("Override is outside the user directory.")
+        target_path = current
+
+    # [SECURE] Prevent Symlink Hijacking
+    # Check if the target is already a symlink (attacker could place one there)
+    if os.path.islink(target_path):
+        raise ValueError("Target file is a symbolic link.\n"
+                         "This is a security risk. Please delete it manually first.")
+    return target_path
+
+
+def stage_file(target_path, text):
+    """Write ``text`` next to ``target_path`` as a temp file; returns its path."""
+    temp_path = target_path + ".tmp"
+    try:
+        # newline="" and surrogateescape write a document's text back byte for byte
+        with open(temp_path, "w", encoding="utf-8", errors="surrogateescape", newline="") as fh:
+            fh.write(text)
+        # Set strict permissions (Read/Write for User, Read for others, No Execute)
+        os.chmod(temp_path, 0o644)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return temp_path
+
+
+def write_atomic(target_path, text):
+    """[SECURE] Atomic Write Pattern: temp file, then rename over the target."""
+    os.replace(stage_file(target_path, text), target_path)
+
+
+def write_batch(files, removals=()):
+    """Write ``{target_path: text}`` and delete ``removals`` as one transaction.
+
+    Every temp file is staged before anything is renamed, and each existing
+    target is kept as a ``.bak`` hard link until the end. If staging, a
+    rename or a removal fails, all targets are put back as they were and
+    the error is raised.
+    """
+    staged = []
+    try:
+        for target_path, text in files.items():
+            staged.append((stage_file(target_path, text), target_path))
+    except BaseException:
+        for temp_path, _ in staged:
+            os.remove(temp_path)
+        raise
+    done = []    # (target_path, backup_path or None), in the order applied
+    try:
+        for temp_path, target_path in staged:
+            done.append((target_path, _backup(target_path, keep=True)))
+            os.replace(temp_path, target_path)
+        for target_path in removals:
+            done.append((target_path, _backup(target_path, keep=False)))
+    except BaseException:
+        for target_path, backup_path in reversed(done):
+            if backup_path is not None:
+                os.replace(backup_path, target_path)
+                # rename() does nothing if both names link to the same file,
+                # i.e. the target was never replaced
+                if os.path.lexists(backup_path):
+                    os.remove(backup_path)
+            elif os.path.lexists(target_path):
+                os.remove(target_path)
+        for temp_path, _ in staged:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        raise
+    for _, backup_path in done:
+        if backup_path is not None:
+            os.remove(backup_path)
+
+
+def _backup(target_path, keep):
+    """Preserve ``target_path`` as ``target_path.bak``; returns that path, or None if absent.
+
+    With ``keep`` the target stays in place (hard link), otherwise it is moved.
+    """
+    if not os.path.lexists(target_path):
+        return None
+    backup_path = target_path + ".bak"
+    if os.path.lexists(backup_path):
+        # Left over from an interrupted batch
+        os.remove(backup_path)
+    if keep:
+        os.link(target_path, backup_path)
+    else:
+        os.replace(target_path, backup_path)
+    return backup_path
+
+
+def update_desktop_database(directory):
+    """Run update-desktop-database on ``directory``.
+
+    Returns the exit status, or None if the tool is not installed.
+    """
+    # [SECURE] Use full path if possible or verify command exists
+    if not shutil.which("update-desktop-database"):
+        return None
+    return subprocess.run(["update-desktop-database", directory], check=False).returncode
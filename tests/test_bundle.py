@@ -0,0 +1,184 @@
+import gzip
+import io
+import json
+import os
+import tarfile
+import tempfile
+import unittest
+from unittest import mock
+
+from dotdesktop import bundle
+from dotdesktop.bundle import digest, export_bundle, plan_import, shadowed_file
+
+ENTRY = b"[Desktop Entry]\nType=Application\nName=A\nExec=a\n"
+
+
+def craft(entries, pack=None, objects=None, manifest_extra=None, order=("manifest.json", "objects.pack")):
+    """A bundle with the given manifest entries; objects default to the pack's one blob."""
+    pack = ENTRY if pack is None else pack
+    manifest = {"version": bundle.BUNDLE_VERSION, "entries": entries,
+                "objects": [[digest(pack), len(pack)]] if objects is None else objects}
+    manifest.update(manifest_extra or {})
+    members = {"manifest.json": json.dumps(manifest).encode(), "objects.pack": pack}
+    out = io.BytesIO()
+    with gzip.GzipFile(fileobj=out, mode="wb") as gz, tarfile.open(fileobj=gz, mode="w|") as tar:
+        for name in order:
+            info = tarfile.TarInfo(name)
+            info.size = len(members[name])
+            tar.addfile(info, io.BytesIO(members[name]))
+    return out.getvalue()
+
+
+def item(entry_id, data=ENTRY):
+    return {"id": entry_id, "sha256": digest(data), "system_path": None, "system_sha256": None}
+
+
+class Fixture(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        self.user = os.path.join(self.tmp, "user")
+        self.system = os.path.join(self.tmp, "system")
+        os.makedirs(self.user)
+        os.makedirs(self.system)
+
+    def write(self, directory, name, data=ENTRY):
+        path = os.path.join(directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as fh:
+            fh.write(data)
+        return path
+
+    def plan(self, data):
+        return plan_import(io.BytesIO(data), self.user, [self.system])
+
+
+class UnsafeBundleTest(Fixture):
+
+    def assert_rejected(self, data):
+        with self.assertRaises(ValueError):
+            self.plan(data)
+        self.assertEqual(os.listdir(self.user), [])
+
+    def test_bad_ids(self):
+        for entry_id in ("../evil.desktop", "sub/evil.desktop", "..-x.desktop", ".hidden.desktop",
+                         "mimeinfo.cache", "evil", ".desktop", "", 7):
+            with self.subTest(entry_id=entry_id):
+                self.assert_rejected(craft([item(entry_id)]))
+
+    def test_one_bad_id_refuses_the_whole_bundle(self):
+        self.assert_rejected(craft([item("good.desktop"), item("mimeinfo.cache")]))
+
+    def test_duplicate_ids(self):
+        self.assert_rejected(craft([item("a.desktop"), item("a.desktop")]))
+
+    def test_hash_mismatch(self):
+        tampered = ENTRY.replace(b"Exec=a", b"Exec=b")
+        self.assert_rejected(craft([item("a.desktop")], pack=tampered,
+                                   objects=[[digest(ENTRY), len(tampered)]]))
+
+    def test_missing_objects(self):
+        other = b"[Desktop Entry]\nName=B\n"
+        self.assert_rejected(craft([item("a.desktop"), item("b.desktop", other)]))
+
+    def test_malformed_manifest(self):
+        for extra in ({"version": 99}, {"entries": {}}, {"objects": [["nothex", 1]]},
+                      {"objects": [[digest(ENTRY), -1]]}):
+            with self.subTest(extra=extra):
+                self.assert_rejected(craft([item("a.desktop")], manifest_extra=extra))
+
+    def test_members_out_of_order(self):
+        self.assert_rejected(craft([item("a.desktop")], order=("objects.pack", "manifest.json")))
+
+    def test_oversized_members(self):
+        data = craft([item("a.desktop")])
+        with mock.patch.object(bundle, "MAX_MANIFEST_BYTES", 16):
+            self.assert_rejected(data)
+        big = b"x" * 64
+        with mock.patch.object(bundle, "MAX_OBJECT_BYTES", 32):
+            self.assert_rejected(craft([item("a.desktop", big)], pack=big))
+        # A pack longer than its objects add up to
+        self.assert_rejected(craft([item("a.desktop")], pack=ENTRY + b"junk",
+                                   objects=[[digest(ENTRY), len(ENTRY)]]))
+
+    def test_symlinked_target(self):
+        os.symlink("/etc/passwd", os.path.join(self.user, "a.desktop"))
+        with self.assertRaises(ValueError):
+            self.plan(craft([item("a.desktop")]))
+
+
+class ShadowedFileTest(Fixture):
+
+    def test_lookup(self):
+        flat = self.write(self.system, "a.desktop")
+        nested = self.write(self.system, "kde4/b.desktop")
+        self.assertEqual(shadowed_file("a.desktop", [self.system]), flat)
+        self.assertEqual(shadowed_file("kde4-b.desktop", [self.system]), nested)
+        self.assertIsNone(shadowed_file("c.desktop", [self.system]))
+
+    def test_highest_precedence_wins(self):
+        low = os.path.join(self.tmp, "low")
+        self.write(low, "a.desktop")
+        self.assertEqual(shadowed_file("a.desktop", [low, self.system]), low + "/a.desktop")
+        high = self.write(self.system, "a.desktop")
+        self.assertEqual(shadowed_file("a.desktop", [low, self.system]), high)
+
+    def test_no_traversal(self):
+        self.write(self.tmp, "x.desktop")
+        self.assertIsNone(shadowed_file("..-x.desktop", [self.system]))
+        self.assertIsNone(shadowed_file("-x.desktop", [self.system]))
+
+
+class RoundTripTest(Fixture):
+
+    def export(self):
+        out = io.BytesIO()
+        manifest = export_bundle(out, self.user, [self.system])
+        return manifest, out.getvalue()
+
+    def test_reproducible(self):
+        self.write(self.user, "a.desktop")
+        self.write(self.user, "kde4/b.desktop", b"[Desktop Entry]\nName=B\n")
+        _, first = self.export()
+        _, second = self.export()
+        self.assertEqual(first, second)
+        with tarfile.open(fileobj=io.BytesIO(first)) as tar:
+            for member in tar.getmembers():
+                self.assertEqual((member.mtime, member.uid, member.gid, member.uname, member.gname),
+                                 (0, 0, 0, "", ""))
+
+    def test_export_import(self):
+        self.write(self.system, "a.desktop", b"[Desktop Entry]\nName=System\n")
+        files = {"a.desktop": ENTRY, "kde4-b.desktop": b"[Desktop Entry]\r\nName=B\xff\r\n",
+                 "c.desktop": ENTRY}
+        for name, data in files.items():
+            self.write(self.user, name.replace("kde4-", "kde4/"), data)
+        manifest, data = self.export()
+        self.assertEqual([e["id"] for e in manifest["entries"]], sorted(files))
+        self.assertEqual(len(manifest["objects"]), 2)
+
+        self.user = os.path.join(self.tmp, "elsewhere")
+        os.makedirs(self.user)
+        planned, unchanged, warnings = self.plan(data)
+        self.assertEqual((unchanged, warnings), (0, []))
+        bundle_writes = {os.path.basename(p): text.encode("utf-8", "surrogateescape")
+                         for p, text in planned.items()}
+        self.assertEqual(bundle_writes, files)
+
+        for path, text in planned.items():
+            self.write(self.user, os.path.basename(path), text.encode("utf-8", "surrogateescape"))
+        self.assertEqual(self.plan(data)[:2], ({}, 3))
+
+    def test_system_change_warns(self):
+        self.write(self.system, "a.desktop", b"[Desktop Entry]\nName=System\n")
+        self.write(self.user, "a.desktop")
+        _, data = self.export()
+        self.write(self.system, "a.desktop", b"[Desktop Entry]\nName=Upgraded\n")
+        _, _, warnings = self.plan(data)
+        self.assertEqual([entry_id for entry_id, _ in warnings], ["a.desktop"])
+
+
+if __name__ == "__main__":
+    unittest.main()
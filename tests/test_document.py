@@ -0,0 +1,93 @@
+import difflib
+import os
+import tempfile
+import unittest
+
+from benchmarks.corpus import generate
+from dotdesktop.document import DesktopDocument
+from dotdesktop.writer import read_document, write_atomic
+
+# (original, {key: value} set in [Desktop Entry], expected result)
+GOLDEN = [
+    (
+        "# Comment kept\n[Desktop Entry]\nName=Foo\nName[de]=Föö\nExec=foo %U\n\n"
+        "[Desktop Action new]\nName=New\nExec=foo --new\n",
+        {"Exec": "env GDK_BACKEND=wayland foo %U"},
+        "# Comment kept\n[Desktop Entry]\nName=Foo\nName[de]=Föö\n"
+        "Exec=env GDK_BACKEND=wayland foo %U\n\n"
+        "[Desktop Action new]\nName=New\nExec=foo --new\n",
+    ),
+    (
+        "[Desktop Entry]\r\nName = Spaced\r\nExec= foo\r\n",
+        {"Name": "Spaced", "Exec": "bar", "Icon": "bar"},
+        "[Desktop Entry]\r\nName = Spaced\r\nExec= bar\r\nIcon=bar\r\n",
+    ),
+    (
+        "[Desktop Entry]\nExec=foo\n# trailing comment\n\n[Desktop Action x]\nExec=x",
+        {"Terminal": "false"},
+        "[Desktop Entry]\nExec=foo\nTerminal=false\n# trailing comment\n\n"
+        "[Desktop Action x]\nExec=x",
+    ),
+    (
+        "[Desktop Entry]\nExec=foo",
+        {"Exec": "foo", "NoDisplay": "true"},
+        "[Desktop Entry]\nExec=foo\nNoDisplay=true\n",
+    ),
+    (
+        "[Desktop Entry]\nName=Caf\xe9 \udce9\nExec=foo\n",
+        {"Exec": "bar"},
+        "[Desktop Entry]\nName=Caf\xe9 \udce9\nExec=bar\n",
+    ),
+    (
+        "[Other]\nKey=value\n",
+        {"Exec": "foo"},
+        "[Desktop Entry]\nExec=foo\n[Other]\nKey=value\n",
+    ),
+]
+
+
+def read_text(path):
+    with open(path, encoding="utf-8", errors="surrogateescape", newline="") as fh:
+        return fh.read()
+
+
+def changed_lines(old, new):
+    diff = difflib.ndiff(old.splitlines(), new.splitlines())
+    return sum(1 for line in diff if line.startswith("+ "))
+
+
+class RoundTripTest(unittest.TestCase):
+    """A saved override must differ from the original only in the edited lines."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_golden(self):
+        for n, (original, edits, expected) in enumerate(GOLDEN):
+            with self.subTest(golden=n):
+                path = os.path.join(self.tmp.name, f"golden{n}.desktop")
+                write_atomic(path, original)
+                with open(path, "rb") as fh:
+                    self.assertEqual(fh.read(), original.encode("utf-8", "surrogateescape"))
+                document = read_document(path)
+                if "Desktop Entry" in DesktopDocument(original):
+                    self.assertEqual(document.text(), original)
+                for key, value in edits.items():
+                    document["Desktop Entry"][key] = value
+                self.assertEqual(document.text(), expected)
+                write_atomic(path, document.text())
+                self.assertEqual(read_text(path), expected)
+
+    def test_corpus(self):
+        for path in generate(os.path.join(self.tmp.name, "applications"), 50):
+            with self.subTest(path=os.path.basename(path)):
+                original = read_text(path)
+                document = DesktopDocument.load(path)
+                self.assertEqual(document.text(), original)
+                document["Desktop Entry"]["Exec"] = "edited %U"
+                self.assertEqual(changed_lines(original, document.text()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
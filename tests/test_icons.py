@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+from dotdesktop.icons import IconTheme
+
+INDEX = """[Icon Theme]
+Name={name}
+Inherits={inherits}
+Directories=16x16/apps,48x48/apps,scalable/apps
+
+[16x16/apps]
+Size=16
+Type=Fixed
+
+[48x48/apps]
+Size=48
+Type=Fixed
+
+[scalable/apps]
+Size=128
+MinSize=64
+MaxSize=512
+Type=Scalable
+"""
+
+
+class IconThemeTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.base = os.path.join(tmp.name, "icons")
+        self.theme("Custom", "hicolor")
+        self.theme("hicolor", "")
+
+    def theme(self, name, inherits):
+        os.makedirs(os.path.join(self.base, name))
+        with open(os.path.join(self.base, name, "index.theme"), "w") as fh:
+            fh.write(INDEX.format(name=name, inherits=inherits))
+
+    def icon(self, *parts):
+        path = os.path.join(self.base, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, "w").close()
+        return path
+
+    def test_nearest_size_wins(self):
+        self.icon("hicolor", "16x16/apps", "foo.png")
+        big = self.icon("hicolor", "48x48/apps", "foo.png")
+        self.assertEqual(IconTheme("hicolor", [self.base], size=40).find("foo"), big)
+        scalable = self.icon("hicolor", "scalable/apps", "foo.svg")
+        self.assertEqual(IconTheme("hicolor", [self.base], size=128).find("foo"), scalable)
+
+    def test_theme_before_inherited(self):
+        self.icon("hicolor", "48x48/apps", "foo.png")
+        own = self.icon("Custom", "16x16/apps", "foo.png")
+        inherited = self.icon("hicolor", "48x48/apps", "bar.png")
+        theme = IconTheme("Custom", [self.base], size=48)
+        self.assertEqual(theme.find("foo"), own)
+        self.assertEqual(theme.find("bar"), inherited)
+
+    def test_unthemed_and_absolute(self):
+        plain = self.icon("baz.xpm")
+        theme = IconTheme("Missing", [self.base], size=48)
+        self.assertEqual(theme.find("baz"), plain)
+        self.assertEqual(theme.find(plain), plain)
+        self.assertIsNone(theme.find(os.path.join(self.base, "none.png")))
+        self.assertIsNone(theme.find("none"))
+
+
+if __name__ == "__main__":
+    unittest.main()
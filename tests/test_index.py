@@ -0,0 +1,153 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from dotdesktop import scanner
+from dotdesktop.index import INDEX_VERSION, ScanIndex, stat_key
+from dotdesktop.scanner import list_directory, scan_directory
+
+# Well outside the racy window, so records are trusted
+OLD = time.time() - 100
+
+
+class ScanIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        self.apps = os.path.join(self.tmp, "apps")
+        self.index_path = os.path.join(self.tmp, "cache", "scan-index.json")
+        os.makedirs(os.path.join(self.apps, "kde4"))
+        for name in ("a.desktop", "b.desktop", "kde4/c.desktop"):
+            self.write(name)
+        self.age(self.apps, os.path.join(self.apps, "kde4"))
+
+    def write(self, name, text="Name=App\n"):
+        path = os.path.join(self.apps, name)
+        with open(path, "w") as fh:
+            fh.write("[Desktop Entry]\nType=Application\n" + text)
+        self.age(path)
+        return path
+
+    def age(self, *paths):
+        for path in paths:
+            os.utime(path, (OLD, OLD))
+
+    def scan(self):
+        """Scan with the saved index; returns the entries and the files parsed."""
+        parsed = []
+        real = scanner.parse_desktop_entry
+
+        def counting(path):
+            parsed.append(os.path.relpath(path, self.apps))
+            return real(path)
+        index = ScanIndex.load(self.index_path)
+        index.begin_scan()
+        with mock.patch.object(scanner, "parse_desktop_entry", counting):
+            entries = scan_directory(self.apps, index)
+        index.prune()
+        index.save()
+        return entries, sorted(parsed)
+
+    def test_warm_scan_parses_nothing(self):
+        entries, parsed = self.scan()
+        self.assertEqual(parsed, ["a.desktop", "b.desktop", "kde4/c.desktop"])
+        again, parsed = self.scan()
+        self.assertEqual(parsed, [])
+        self.assertEqual(sorted(again), ["a.desktop", "b.desktop", "kde4-c.desktop"])
+        self.assertEqual([e.name for e in again.values()], [e.name for e in entries.values()])
+
+    def test_trusted_listing(self):
+        self.scan()
+        index = ScanIndex.load(self.index_path)
+        self.assertEqual(list_directory(self.apps, index), (["a.desktop", "b.desktop"], ["kde4"], True))
+        self.write("d.desktop")
+        os.utime(self.apps, (OLD + 10, OLD + 10))
+        self.assertEqual(list_directory(self.apps, index),
+                         (["a.desktop", "b.desktop", "d.desktop"], ["kde4"], False))
+
+    def test_changed_file_is_reparsed(self):
+        self.scan()
+        self.write("a.desktop", "Name=Renamed\n")
+        # The directory is unchanged, so its files are trusted until it changes
+        entries, parsed = self.scan()
+        self.assertEqual(parsed, [])
+        os.utime(self.apps, (OLD + 10, OLD + 10))
+        entries, parsed = self.scan()
+        self.assertEqual(parsed, ["a.desktop"])
+        self.assertEqual(entries["a.desktop"].name, "Renamed")
+
+    def test_racy_files_are_not_trusted(self):
+        now = time.time()
+        os.utime(os.path.join(self.apps, "a.desktop"), (now, now))
+        os.utime(self.apps, (now, now))
+        self.scan()
+        index = ScanIndex.load(self.index_path)
+        self.assertNotIn(self.apps, index.dirs)
+        self.assertNotIn(os.path.join(self.apps, "a.desktop"), index.entries)
+        self.assertIn(os.path.join(self.apps, "b.desktop"), index.entries)
+        self.assertEqual(self.scan()[1], ["a.desktop"])
+
+    def test_prune(self):
+        self.scan()
+        os.remove(os.path.join(self.apps, "kde4", "c.desktop"))
+        os.rmdir(os.path.join(self.apps, "kde4"))
+        os.utime(self.apps, (OLD + 10, OLD + 10))
+        self.scan()
+        index = ScanIndex.load(self.index_path)
+        self.assertEqual(sorted(index.entries), [os.path.join(self.apps, n) for n in ("a.desktop", "b.desktop")])
+        self.assertEqual(list(index.dirs), [self.apps])
+
+    def test_unchanged_index_is_not_rewritten(self):
+        self.scan()
+        mtime = os.stat(self.index_path).st_mtime_ns
+        index = ScanIndex.load(self.index_path)
+        index.begin_scan()
+        scan_directory(self.apps, index)
+        index.prune()
+        with mock.patch("dotdesktop.index.os.replace") as replace:
+            index.save()
+        replace.assert_not_called()
+        self.assertEqual(os.stat(self.index_path).st_mtime_ns, mtime)
+
+    def test_unusable_index_is_rebuilt(self):
+        self.scan()
+        with open(self.index_path) as fh:
+            good = json.load(fh)
+        record = next(iter(good["entries"]))
+        for name, data in (("garbage", "{not json"),
+                           ("old version", json.dumps(dict(good, version=INDEX_VERSION - 1))),
+                           ("short key", json.dumps(dict(good, entries={record: [[1, 2], []]}))),
+                           ("wrong shape", json.dumps([]))):
+            with self.subTest(name):
+                with open(self.index_path, "w") as fh:
+                    fh.write(data)
+                index = ScanIndex.load(self.index_path)
+                self.assertTrue(index.load_error)
+                self.assertEqual((index.dirs, index.entries), ({}, {}))
+                self.assertEqual(self.scan()[1], ["a.desktop", "b.desktop", "kde4/c.desktop"])
+                self.assertIsNone(ScanIndex.load(self.index_path).load_error)
+
+    def test_missing_index(self):
+        index = ScanIndex.load(self.index_path)
+        self.assertIsNone(index.load_error)
+        index.save()
+        self.assertFalse(os.path.exists(self.index_path))
+
+    def test_toolkits(self):
+        index = ScanIndex(self.index_path)
+        binary = self.write("a.desktop")
+        key = stat_key(os.stat(binary))
+        index.store_toolkit(binary, key, "qt")
+        index.save()
+        index = ScanIndex.load(self.index_path)
+        self.assertEqual(index.cached_toolkit(binary, key), "qt")
+        self.assertIsNone(index.cached_toolkit(binary, (key[0] + 1,) + key[1:]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import os
+import tempfile
+import unittest
+
+from dotdesktop.mimeinfo import MimeIndex, cache_path, mime_types, rebuild_cache, update_cache
+
+
+def handlers(directory):
+    cache = MimeIndex.load(cache_path(directory))
+    return {mime_type: cache.handlers(mime_type) for mime_type in cache}
+
+
+class MimeIndexTest(unittest.TestCase):
+
+    def test_mime_types(self):
+        self.assertEqual(mime_types("text/plain; text/plain;bogus;image/x+y;;"),
+                         ["text/plain", "image/x+y"])
+
+    def test_parse_text_round_trip(self):
+        text = "[MIME Cache]\napplication/pdf=b.desktop;a.desktop;\ntext/plain=a.desktop;\n"
+        index = MimeIndex.parse(text)
+        self.assertEqual(index.handlers("application/pdf"), ["b.desktop", "a.desktop"])
+        self.assertEqual(index.text(), text)
+        self.assertEqual(MimeIndex.parse(index.text()).text(), text)
+
+    def test_text_sorts_types(self):
+        index = MimeIndex()
+        index.add("a.desktop", ["text/plain", "image/png"])
+        self.assertEqual(index.text(), "[MIME Cache]\nimage/png=a.desktop;\ntext/plain=a.desktop;\n")
+
+    def test_parse_rejects_other_files(self):
+        for text in ("[Desktop Entry]\nName=x\n", "text/plain=a.desktop;\n", "[MIME Cache]\nno equals\n"):
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    MimeIndex.parse(text)
+
+    def test_set_keeps_position(self):
+        index = MimeIndex()
+        index.add("a.desktop", ["text/plain"])
+        index.add("b.desktop", ["text/plain"])
+        changed = index.set("a.desktop", ["text/plain", "text/html"], {"text/plain"})
+        self.assertEqual(changed, {"text/html"})
+        self.assertEqual(index.handlers("text/plain"), ["a.desktop", "b.desktop"])
+        index.set("a.desktop", [], {"text/plain", "text/html"})
+        self.assertEqual(index.handlers("text/plain"), ["b.desktop"])
+        self.assertNotIn("text/html", index)
+
+
+class UpdateCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def write(self, name, mime_type, extra=""):
+        path = os.path.join(self.dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as fh:
+            fh.write(f"[Desktop Entry]\nType=Application\nName=x\nExec=x\nMimeType={mime_type}\n{extra}")
+        return path
+
+    def test_rebuild(self):
+        self.write("a.desktop", "text/plain;")
+        self.write("kde4/b.desktop", "text/plain;image/png;")
+        self.write("c.desktop", "text/html;", "Hidden=true\n")
+        self.assertEqual(rebuild_cache(self.dir), {"text/plain", "image/png"})
+        self.assertEqual(handlers(self.dir), {"image/png": ["kde4-b.desktop"],
+                                              "text/plain": ["a.desktop", "kde4-b.desktop"]})
+
+    def test_add_change_remove(self):
+        self.write("a.desktop", "text/plain;")
+        rebuild_cache(self.dir)
+        added = self.write("b.desktop", "text/plain;text/html;")
+        self.assertEqual(update_cache(self.dir, [added]), {"text/plain", "text/html"})
+        self.assertEqual(handlers(self.dir), {"text/html": ["b.desktop"],
+                                              "text/plain": ["a.desktop", "b.desktop"]})
+        self.write("b.desktop", "text/html;image/png;")
+        self.assertEqual(update_cache(self.dir, [added]), {"text/plain", "image/png"})
+        self.assertEqual(handlers(self.dir)["text/plain"], ["a.desktop"])
+        os.remove(added)
+        self.assertEqual(update_cache(self.dir, [added]), {"text/html", "image/png"})
+        self.assertEqual(handlers(self.dir), {"text/plain": ["a.desktop"]})
+        self.assertEqual(update_cache(self.dir, [added]), set())
+
+    def test_hidden_entry_is_dropped(self):
+        path = self.write("a.desktop", "text/plain;")
+        rebuild_cache(self.dir)
+        self.write("a.desktop", "text/plain;", "Hidden=true\n")
+        self.assertEqual(update_cache(self.dir, [path]), {"text/plain"})
+        self.assertEqual(handlers(self.dir), {})
+
+    def test_corrupt_cache_is_rebuilt(self):
+        path = self.write("a.desktop", "text/plain;")
+        for text in (None, "garbage\n", b"\xff\xfe"):
+            with self.subTest(text=text):
+                if text is None:
+                    if os.path.exists(cache_path(self.dir)):
+                        os.remove(cache_path(self.dir))
+                else:
+                    with open(cache_path(self.dir), "wb") as fh:
+                        fh.write(text if isinstance(text, bytes) else text.encode())
+                update_cache(self.dir, [path])
+                self.assertEqual(handlers(self.dir), {"text/plain": ["a.desktop"]})
+
+    def test_paths_outside_are_ignored(self):
+        self.write("a.desktop", "text/plain;")
+        rebuild_cache(self.dir)
+        with open(cache_path(self.dir)) as fh:
+            before = fh.read()
+        with tempfile.TemporaryDirectory() as other:
+            outside = os.path.join(other, "evil.desktop")
+            with open(outside, "w") as fh:
+                fh.write("[Desktop Entry]\nMimeType=text/plain;\n")
+            sibling = self.dir + "-x" + os.sep + "b.desktop"
+            self.assertEqual(update_cache(self.dir, [outside, sibling, os.path.join(self.dir, "notes.txt")]),
+                             set())
+        with open(cache_path(self.dir)) as fh:
+            self.assertEqual(fh.read(), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import importlib
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from dotdesktop import paths
+from dotdesktop.entry import DesktopEntry
+from dotdesktop.resolver import EntryResolver
+from dotdesktop.scanner import desktop_id, scan_all
+from dotdesktop.writer import override_path
+
+
+class DesktopIdTest(unittest.TestCase):
+
+    def test_desktop_id(self):
+        self.assertEqual(desktop_id("/usr/share/applications", "/usr/share/applications/foo.desktop"),
+                         "foo.desktop")
+        self.assertEqual(desktop_id("/usr/share/applications", "/usr/share/applications/kde4/a/foo.desktop"),
+                         "kde4-a-foo.desktop")
+
+
+class ResolverTest(unittest.TestCase):
+
+    def setUp(self):
+        self.system = "/usr/share/applications"
+        self.local = "/usr/local/share/applications"
+        self.user = "/home/u/.local/share/applications"
+        self.resolver = EntryResolver([self.system, self.local, self.user])
+
+    def add(self, directory, name):
+        entry = DesktopEntry(os.path.join(directory, name))
+        return self.resolver.add(entry), entry
+
+    def test_highest_precedence_wins(self):
+        _, system = self.add(self.system, "foo.desktop")
+        _, user = self.add(self.user, "foo.desktop")
+        _, local = self.add(self.local, "foo.desktop")
+        self.assertIs(self.resolver.winner("foo.desktop"), user)
+        self.assertEqual(self.resolver.shadowed("foo.desktop"), [local, system])
+
+    def test_subdirectory_shadows_flat_name(self):
+        _, system = self.add(self.system, "kde4-foo.desktop")
+        entry_id, user = self.add(self.user, "kde4/foo.desktop")
+        self.assertEqual(entry_id, "kde4-foo.desktop")
+        self.assertIs(self.resolver.winner(entry_id), user)
+        self.assertEqual(self.resolver.shadowed(entry_id), [system])
+
+    def test_removing_override_restores_system_entry(self):
+        _, system = self.add(self.system, "foo.desktop")
+        _, user = self.add(self.user, "foo.desktop")
+        self.assertEqual(self.resolver.remove(user.path), "foo.desktop")
+        self.assertIs(self.resolver.winner("foo.desktop"), system)
+        self.assertEqual(self.resolver.shadowed("foo.desktop"), [])
+        self.resolver.remove(system.path)
+        self.assertIsNone(self.resolver.winner("foo.desktop"))
+
+    def test_set_directory(self):
+        _, system = self.add(self.system, "foo.desktop")
+        user = DesktopEntry(os.path.join(self.user, "foo.desktop"))
+        self.resolver.set_directory(self.user, {"foo.desktop": user})
+        self.assertIs(self.resolver.winner("foo.desktop"), user)
+        self.resolver.set_directory(self.user, {})
+        self.assertIs(self.resolver.winner("foo.desktop"), system)
+
+    def test_root_for(self):
+        self.assertEqual(self.resolver.root_for(self.user + "/kde4/foo.desktop"), self.user)
+        self.assertIsNone(self.resolver.root_for(self.user + "-x/foo.desktop"))
+        self.assertIsNone(self.add("/opt/apps", "foo.desktop")[0])
+
+
+class UserDirTest(unittest.TestCase):
+
+    def tearDown(self):
+        importlib.reload(paths)
+
+    def test_normalized(self):
+        with mock.patch.dict(os.environ, {"XDG_DATA_HOME": "/home/u/.local/share/./",
+                                          "XDG_DATA_DIRS": "/home/u/.local/share:/usr/share"}):
+            importlib.reload(paths)
+        self.assertEqual(paths.USER_DIR, "/home/u/.local/share/applications")
+        self.assertNotIn(paths.USER_DIR, paths.SEARCH_DIRS)
+
+
+class OverrideInPlaceTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.user = os.path.join(tmp.name, "user")
+        self.system = os.path.join(tmp.name, "system")
+        os.makedirs(os.path.join(self.user, "kde4"))
+        os.makedirs(os.path.join(self.system, "kde4"))
+
+    def test_existing_override_is_rewritten(self):
+        nested = os.path.join(self.user, "kde4", "foo.desktop")
+        open(nested, "w").close()
+        self.assertEqual(override_path("kde4-foo.desktop", self.user, nested), nested)
+        # One file per ID, so a save does not add user/kde4-foo.desktop
+        with open(override_path("kde4-foo.desktop", self.user, nested), "w") as fh:
+            fh.write("[Desktop Entry]\nName=Saved\n")
+        merged = scan_all([self.system, self.user])
+        self.assertEqual(list(merged), ["kde4-foo.desktop"])
+        self.assertEqual(merged["kde4-foo.desktop"].path, nested)
+
+    def test_system_entry_gets_flat_override(self):
+        system = os.path.join(self.system, "kde4", "foo.desktop")
+        self.assertEqual(override_path("kde4-foo.desktop", self.user, system),
+                         os.path.join(self.user, "kde4-foo.desktop"))
+
+    def test_unsafe_current(self):
+        elsewhere = os.path.join(self.system, "kde4")
+        os.symlink(elsewhere, os.path.join(self.user, "linked"))
+        for entry_id, current in (("kde4-bar.desktop", os.path.join(self.user, "kde4", "foo.desktop")),
+                                  ("linked-foo.desktop", os.path.join(self.user, "linked", "foo.desktop"))):
+            with self.subTest(current=current):
+                with self.assertRaises(ValueError):
+                    override_path(entry_id, self.user, current)
+
+
+if __name__ == "__main__":
+    unittest.main()
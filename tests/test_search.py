@@ -0,0 +1,112 @@
+import unittest
+
+from dotdesktop.entry import DesktopEntry
+from dotdesktop.search import SearchIndex, parse_query
+
+
+def make_entry(name, **fields):
+    entry = DesktopEntry(f"/usr/share/applications/{name.lower().replace(' ', '-')}.desktop")
+    entry.name = name
+    for attr, value in fields.items():
+        setattr(entry, attr, value)
+    return entry
+
+
+ENTRIES = [
+    make_entry("Firefox", generic_name="Web Browser", categories="Network;WebBrowser;",
+               exec="firefox %u", keywords="internet;www;"),
+    make_entry("Visual Studio Code", categories="Development;IDE;", exec="/usr/share/code/code %F",
+               keywords="editor;vscode;"),
+    make_entry("Text Editor", categories="Utility;TextEditor;", exec="gnome-text-editor %U"),
+    make_entry("Gnome Web", generic_name="Web Browser", categories="Network;",
+               exec="epiphany"),
+]
+
+
+class ParseQueryTest(unittest.TestCase):
+
+    def test_fields(self):
+        self.assertEqual(parse_query("cat:Development exec:electron"),
+                         [("categories", "development"), ("exec", "electron")])
+        self.assertEqual(parse_query("kw:Edit name:text-editor"),
+                         [("keywords", "edit"), ("name", "text"), ("name", "editor")])
+
+    def test_free_terms(self):
+        self.assertEqual(parse_query("  Web  BROWSER "), [(None, "web"), (None, "browser")])
+        # Unknown prefixes are plain text
+        self.assertEqual(parse_query("foo:bar"), [(None, "foo"), (None, "bar")])
+        self.assertEqual(parse_query("cat:"), [])
+        self.assertEqual(parse_query(""), [])
+
+
+class SearchIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = SearchIndex()
+        for slot, entry in enumerate(ENTRIES):
+            self.index.add(slot, entry.filename, entry)
+
+    def slots(self, text):
+        return set(self.index.search(text))
+
+    def test_empty_query_matches_everything(self):
+        self.assertIsNone(self.index.search("  "))
+
+    def test_terms_intersect(self):
+        self.assertEqual(self.slots("web"), {0, 3})
+        self.assertEqual(self.slots("web gnome"), {3})
+        self.assertEqual(self.slots("editor"), {1, 2})
+        self.assertEqual(self.slots("editor code"), {1})
+        self.assertEqual(self.slots("editor nothing"), set())
+
+    def test_field_filters(self):
+        self.assertEqual(self.slots("cat:network"), {0, 3})
+        self.assertEqual(self.slots("cat:development"), {1})
+        self.assertEqual(self.slots("exec:code"), {1})
+        # "editor" is only in Code's keywords, not its name
+        self.assertEqual(self.slots("name:editor"), {2})
+        self.assertEqual(self.slots("kw:editor"), {1})
+
+    def test_ranking(self):
+        scores = self.index.search("edit")
+        # A name prefix beats a keyword prefix
+        self.assertGreater(scores[2], scores[1])
+        scores = self.index.search("fox")
+        # A substring of the name still beats a prefix in Exec
+        self.assertEqual(scores, {0: 40})
+        self.assertEqual(self.index.search("web browser")[0], 50 + 50)
+        self.assertEqual(self.index.search("firefox")[0], 100)
+
+    def test_typing_forward_uses_the_cache(self):
+        self.assertEqual(self.slots("e"), {0, 1, 2, 3})
+        self.assertEqual(self.slots("ed"), {1, 2})
+        self.assertEqual(self.slots("edi"), {1, 2})
+        self.assertEqual(self.slots("edit"), {1, 2})
+
+    def test_add_and_discard_clear_the_cache(self):
+        self.assertEqual(self.slots("edit"), {1, 2})
+        self.index.discard(2, ENTRIES[2].filename, ENTRIES[2])
+        self.assertEqual(self.slots("edit"), {1})
+        self.assertEqual(self.slots("editor"), {1})
+        extra = make_entry("Editorial")
+        self.index.add(7, extra.filename, extra)
+        self.assertEqual(self.slots("edit"), {1, 7})
+        self.assertEqual(self.slots("edito"), {1, 7})
+
+    def test_discard_shared_tokens(self):
+        # "web" and "browser" are shared, so their postings shrink back to one slot
+        self.index.discard(0, ENTRIES[0].filename, ENTRIES[0])
+        self.assertEqual(self.slots("browser"), {3})
+        self.index.discard(3, ENTRIES[3].filename, ENTRIES[3])
+        self.assertEqual(self.slots("browser"), set())
+        self.index.discard(3, ENTRIES[3].filename, ENTRIES[3])
+        self.assertEqual(self.slots("editor"), {1, 2})
+
+    def test_clear(self):
+        self.slots("web")
+        self.index.clear()
+        self.assertEqual(self.slots("web"), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+import io
+import os
+import struct
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from dotdesktop import toolkit
+from dotdesktop.entry import DesktopEntry
+from dotdesktop.index import ScanIndex
+from dotdesktop.toolkit import ToolkitDetector, elf_needed, inspect_program, program_word
+
+# Well outside the racy window, so results are cached
+OLD = time.time() - 100
+VADDR = 0x400000
+
+
+def build_elf(needed, wide=True, order="<", dynamic=True):
+    """A minimal ELF file: one PT_LOAD over the whole file and a PT_DYNAMIC."""
+    strtab = b"\0"
+    offsets = []
+    for name in needed:
+        offsets.append(len(strtab))
+        strtab += name.encode() + b"\0"
+    ehsize, phentsize = (64, 56) if wide else (52, 32)
+    dyn_format = order + ("qQ" if wide else "iI")
+    dyn_off = ehsize + 2 * phentsize
+    dyn_size = struct.calcsize(dyn_format) * (len(needed) + 3)
+    str_off = dyn_off + dyn_size
+    tags = [(1, o) for o in offsets] + [(5, VADDR + str_off), (10, len(strtab)), (0, 0)]
+    size = str_off + len(strtab)
+
+    ident = b"\x7fELF" + bytes([2 if wide else 1, 1 if order == "<" else 2, 1]) + bytes(9)
+    if wide:
+        header = struct.pack(order + "HHIQQQIHHHHHH", 2, 62, 1, VADDR, ehsize, 0, 0,
+                             ehsize, phentsize, 2, 0, 0, 0)
+        phdr = lambda p_type, offset, filesz: struct.pack(order + "IIQQQQQQ", p_type, 4, offset,
+                                                          VADDR + offset, 0, filesz, filesz, 8)
+    else:
+        header = struct.pack(order + "HHIIIIIHHHHHH", 2, 3, 1, VADDR, ehsize, 0, 0,
+                             ehsize, phentsize, 2, 0, 0, 0)
+        phdr = lambda p_type, offset, filesz: struct.pack(order + "IIIIIIII", p_type, offset,
+                                                          VADDR + offset, 0, filesz, filesz, 4, 4)
+    data = ident + header + phdr(1, 0, size) + phdr(2 if dynamic else 4, dyn_off, dyn_size)
+    data += b"".join(struct.pack(dyn_format, tag, value) for tag, value in tags)
+    return data + strtab
+
+
+class ElfNeededTest(unittest.TestCase):
+
+    LIBS = ["libQt6Widgets.so.6", "libc.so.6"]
+
+    def test_formats(self):
+        for wide in (True, False):
+            for order in "<>":
+                with self.subTest(wide=wide, order=order):
+                    self.assertEqual(elf_needed(io.BytesIO(build_elf(self.LIBS, wide, order))), self.LIBS)
+
+    def test_static_binary(self):
+        self.assertEqual(elf_needed(io.BytesIO(build_elf(self.LIBS, dynamic=False))), [])
+        self.assertEqual(elf_needed(io.BytesIO(build_elf([]))), [])
+
+    def test_not_elf(self):
+        for data in (b"", b"#!/bin/sh\nexec foo\n", b"\x7fELF", b"\x7fELF\x03\x01" + bytes(58),
+                     b"\x7fELF\x02\x03" + bytes(58)):
+            with self.subTest(data=data):
+                self.assertIsNone(elf_needed(io.BytesIO(data)))
+
+    def test_truncated(self):
+        data = build_elf(self.LIBS)
+        for length in range(16, len(data)):
+            with self.subTest(length=length):
+                try:
+                    names = elf_needed(io.BytesIO(data[:length]))
+                except struct.error:
+                    # ToolkitDetector.inspect treats this as "unknown"
+                    continue
+                self.assertIsInstance(names, list)
+                self.assertTrue(set(names) <= set(self.LIBS))
+
+    def test_bad_string_offsets(self):
+        data = bytearray(build_elf(self.LIBS))
+        # Point the first DT_NEEDED past the end of the string table
+        struct.pack_into("<qQ", data, 64 + 2 * 56, 1, 10**6)
+        self.assertEqual(elf_needed(io.BytesIO(bytes(data))), ["libc.so.6"])
+
+
+class DetectorTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        self.bin = os.path.join(self.tmp, "bin")
+        os.makedirs(self.bin)
+        env = mock.patch.dict(os.environ, {"PATH": self.bin})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def program(self, name, data, directory=None):
+        path = os.path.join(directory or self.bin, name)
+        with open(path, "wb") as fh:
+            fh.write(data)
+        os.chmod(path, 0o755)
+        os.utime(path, (OLD, OLD))
+        return path
+
+    def entry(self, exec_cmd, categories=""):
+        entry = DesktopEntry("/usr/share/applications/app.desktop")
+        entry.exec = exec_cmd
+        entry.categories = categories
+        return entry
+
+    def test_program_word(self):
+        self.assertEqual(program_word("env FOO=1 BAR=2 app --x %U"), "app")
+        self.assertEqual(program_word('"/opt/My App/app" %f'), "/opt/My App/app")
+        self.assertIsNone(program_word("env FOO=1"))
+        self.assertIsNone(program_word('"unbalanced'))
+
+    def test_inspect_program(self):
+        cases = [
+            ("qt", build_elf(["libQt6Core.so.6", "libc.so.6"])),
+            ("gtk", build_elf(["libgtk-4.so.1"], wide=False)),
+            ("gecko", build_elf(["libxul.so"])),
+            ("qt", b"#!/usr/bin/python3\nfrom PySide6 import QtWidgets\n"),
+            ("electron", b"#!/bin/sh\nexec electron /opt/app/app.asar \"$@\"\n"),
+            (None, b"#!/bin/sh\nexec true\n"),
+            (None, b"plain data, no shebang\n"),
+            (None, build_elf(["libc.so.6"])),
+        ]
+        for i, (expected, data) in enumerate(cases):
+            with self.subTest(i=i, expected=expected):
+                self.assertEqual(inspect_program(self.program(f"app{i}", data)), expected)
+
+    def test_sibling_markers(self):
+        app_dir = os.path.join(self.tmp, "opt", "app")
+        os.makedirs(os.path.join(app_dir, "resources"))
+        binary = self.program("app", build_elf(["libc.so.6"]), app_dir)
+        self.assertIsNone(inspect_program(binary))
+        open(os.path.join(app_dir, "resources", "app.asar"), "w").close()
+        self.assertEqual(inspect_program(binary), "electron")
+
+    def test_env_wrapper(self):
+        self.program("viewer", build_elf(["libQt5Gui.so.5"]))
+        detector = ToolkitDetector()
+        self.assertEqual(detector.detect(self.entry("env QT_SCALE_FACTOR=2 viewer %f")), "qt")
+
+    def test_fallback_to_guess(self):
+        self.program("viewer", build_elf(["libc.so.6"]))
+        detector = ToolkitDetector()
+        self.assertEqual(detector.detect(self.entry("viewer", "GNOME;GTK;")), "gtk")
+        self.assertEqual(detector.detect(self.entry("missing", "KDE;Qt;")), "qt")
+        self.assertIsNone(detector.detect(self.entry("viewer")))
+
+    def test_truncated_binary(self):
+        self.program("broken", build_elf(["libQt6Core.so.6"])[:40])
+        self.assertIsNone(ToolkitDetector().detect(self.entry("broken")))
+
+    def test_results_are_cached_per_binary(self):
+        binary = self.program("viewer", build_elf(["libQt6Core.so.6"]))
+        index = ScanIndex(os.path.join(self.tmp, "index.json"))
+        entries = [self.entry("viewer %f"), self.entry("env A=1 viewer"), self.entry(binary)]
+        detector = ToolkitDetector(index)
+        with mock.patch.object(toolkit, "inspect_program", wraps=inspect_program) as inspected:
+            detector.detect_all(entries)
+            self.assertEqual([detector.cached(e) for e in entries], ["qt"] * 3)
+            self.assertEqual(inspected.call_count, 1)
+            # A new session trusts the index while the binary is unchanged
+            ToolkitDetector(index).detect_all(entries)
+            self.assertEqual(inspected.call_count, 1)
+            with open(binary, "wb") as fh:
+                fh.write(build_elf(["libgtk-3.so.0"]))
+            os.utime(binary, (OLD + 10, OLD + 10))
+            fresh = ToolkitDetector(index)
+            fresh.detect_all(entries)
+            self.assertEqual(inspected.call_count, 2)
+            self.assertEqual(fresh.cached(entries[0]), "gtk")
+
+    def test_forget(self):
+        detector = ToolkitDetector()
+        entry = self.entry("viewer")
+        detector.detect_all([entry])
+        self.assertIsNone(detector.cached(entry))
+        self.program("viewer", build_elf(["libQt6Core.so.6"]))
+        detector.detect_all([entry])
+        self.assertIsNone(detector.cached(entry))
+        detector.forget()
+        detector.detect_all([entry])
+        self.assertEqual(detector.cached(entry), "qt")
+
+
+if __name__ == "__main__":
+    unittest.main()
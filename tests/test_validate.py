@@ -0,0 +1,155 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from dotdesktop.entry import parse_desktop_entry
+from dotdesktop.validate import Checker, ValidationCache, validate_entries
+
+# Well outside the racy window, so records are cached
+OLD = time.time() - 100
+
+
+def messages(issues):
+    return [message for _, message in issues]
+
+
+class Fixture(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        self.bin = os.path.join(self.tmp, "bin")
+        self.apps = os.path.join(self.tmp, "apps")
+        self.icons = os.path.join(self.tmp, "data", "icons")
+        for d in (self.bin, self.apps, self.icons):
+            os.makedirs(d)
+        env = mock.patch.dict(os.environ, {
+            "PATH": self.bin, "HOME": self.tmp,
+            "XDG_DATA_HOME": os.path.join(self.tmp, "data"), "XDG_DATA_DIRS": "/nonexistent"})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def program(self, name):
+        path = os.path.join(self.bin, name)
+        with open(path, "w") as fh:
+            fh.write("#!/bin/sh\n")
+        os.chmod(path, 0o755)
+        os.utime(path, (OLD, OLD))
+        return path
+
+    def entry(self, name, text, mtime=OLD):
+        path = os.path.join(self.apps, name)
+        with open(path, "w") as fh:
+            fh.write("[Desktop Entry]\nType=Application\nName=App\n" + text)
+        os.utime(path, (mtime, mtime))
+        return parse_desktop_entry(path)
+
+
+class CheckerTest(Fixture):
+
+    def test_clean_entry(self):
+        binary = self.program("app")
+        found, issues = Checker().check(self.entry("a.desktop", "Exec=app %U\nCategories=Utility;\n"))
+        self.assertEqual(found, os.path.realpath(binary))
+        self.assertEqual(issues, [])
+
+    def test_missing_program(self):
+        found, issues = Checker().check(self.entry("a.desktop", "Exec=env FOO=1 nothere %f\n"))
+        self.assertIsNone(found)
+        self.assertIn("program not found: nothere", messages(issues))
+
+    def test_field_codes(self):
+        self.program("app")
+        _, issues = Checker().check(self.entry("a.desktop", "Exec=app %U %F %z %d %%\n"))
+        self.assertEqual(sorted(issues), sorted([
+            ("error", "invalid field code %z in Exec"),
+            ("warning", "deprecated field code %d in Exec"),
+            ("error", "more than one of %f %F %u %U in Exec"),
+        ]))
+
+    def test_categories(self):
+        self.program("app")
+        _, issues = Checker().check(self.entry("a.desktop", "Exec=app\nCategories=Utility;Bogus;X-Mine\n"))
+        self.assertEqual(messages(issues), ["unregistered categories (use an X- prefix): Bogus",
+                                            "Categories should end with ';'"])
+
+    def test_icons(self):
+        self.program("app")
+        checker = Checker(frozenset(["known"]))
+        for icon, expected in (("known", []), ("known.png", []),
+                               ("unknown", ["icon not found in any icon theme: unknown"]),
+                               ("/no/such.png", ["icon file not found: /no/such.png"])):
+            with self.subTest(icon=icon):
+                _, issues = checker.check(self.entry("a.desktop", f"Exec=app\nIcon={icon}\n"))
+                self.assertEqual(messages(issues), expected)
+
+    def test_hidden_is_not_checked(self):
+        self.assertEqual(Checker().check(self.entry("a.desktop", "Hidden=true\n")), (None, []))
+
+
+class ValidationCacheTest(Fixture):
+
+    def setUp(self):
+        super().setUp()
+        self.cache_path = os.path.join(self.tmp, "validation.json")
+
+    def run_all(self, entries, **kwargs):
+        cache = ValidationCache.load(self.cache_path)
+        results, checked = validate_entries(entries, cache, **kwargs)
+        cache.save()
+        return results, checked
+
+    def test_unchanged_files_are_cached(self):
+        self.program("app")
+        entries = [self.entry(f"{n}.desktop", "Exec=app\n") for n in "abc"]
+        self.assertEqual(self.run_all(entries)[1], 3)
+        results, checked = self.run_all(entries)
+        self.assertEqual(checked, 0)
+        self.assertEqual(set(results), {e.path for e in entries})
+
+    def test_changed_file_is_checked_again(self):
+        self.program("app")
+        entries = [self.entry(f"{n}.desktop", "Exec=app\n") for n in "ab"]
+        self.run_all(entries)
+        entries[0] = self.entry("a.desktop", "Exec=app %z\n", mtime=OLD + 10)
+        results, checked = self.run_all(entries)
+        self.assertEqual(checked, 1)
+        self.assertIn("invalid field code %z in Exec", messages(results[entries[0].path]))
+
+    def test_changed_binary_is_checked_again(self):
+        binary = self.program("app")
+        entries = [self.entry("a.desktop", "Exec=app\n")]
+        self.run_all(entries)
+        os.utime(binary, (OLD + 10, OLD + 10))
+        self.assertEqual(self.run_all(entries)[1], 1)
+
+    def test_missing_program_is_checked_again(self):
+        entries = [self.entry("a.desktop", "Exec=app\n")]
+        self.assertEqual(messages(self.run_all(entries)[0][entries[0].path]), ["program not found: app"])
+        self.program("app")
+        results, checked = self.run_all(entries)
+        self.assertEqual((checked, results[entries[0].path]), (1, []))
+
+    def test_new_icons_drop_the_cache(self):
+        self.program("app")
+        entries = [self.entry(f"{n}.desktop", "Exec=app\nIcon=foo\n") for n in "ab"]
+        self.run_all(entries)
+        os.makedirs(os.path.join(self.icons, "hicolor"))
+        self.assertEqual(self.run_all(entries)[1], 2)
+
+    def test_filtered_run_keeps_other_records(self):
+        self.program("app")
+        entries = [self.entry(f"{n}.desktop", "Exec=app\n") for n in "abc"]
+        self.run_all(entries)
+        self.assertEqual(self.run_all(entries[:1], prune=False)[1], 0)
+        self.assertEqual(self.run_all(entries)[1], 0)
+        # A full run forgets files that are gone
+        self.run_all(entries[:1])
+        self.assertEqual(self.run_all(entries)[1], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
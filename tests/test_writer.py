@@ -0,0 +1,116 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from dotdesktop import writer
+from dotdesktop.bulk import commit
+from dotdesktop.writer import override_path, write_batch
+
+real_replace = os.replace
+real_stage = writer.stage_file
+
+
+def fail_on(predicate, func):
+    """``func`` wrapped to raise OSError the first time ``predicate(*args)`` holds."""
+    state = {"failed": False}
+
+    def wrapper(*args, **kwargs):
+        if not state["failed"] and predicate(*args):
+            state["failed"] = True
+            raise OSError("injected failure")
+        return func(*args, **kwargs)
+    return wrapper
+
+
+class WriteBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.original = {}
+        for name in ("a", "b", "c", "gone"):
+            path = self.path(name)
+            with open(path, "wb") as fh:
+                fh.write(f"[Desktop Entry]\r\nName={name}\r\n".encode())
+            self.original[path] = self.read(path)
+        # a, b and c are rewritten, new is created, gone is removed
+        self.files = {self.path(n): f"[Desktop Entry]\nName={n}2\n" for n in ("a", "b", "c", "new")}
+        self.removals = [self.path("gone")]
+
+    def path(self, name):
+        return os.path.join(self.dir, name + ".desktop")
+
+    def read(self, path):
+        with open(path, "rb") as fh:
+            return fh.read()
+
+    def assert_untouched(self):
+        self.assertEqual(sorted(os.listdir(self.dir)), sorted(os.path.basename(p) for p in self.original))
+        for path, data in self.original.items():
+            self.assertEqual(self.read(path), data)
+
+    def test_success(self):
+        write_batch(self.files, self.removals)
+        self.assertEqual(sorted(os.listdir(self.dir)), ["a.desktop", "b.desktop", "c.desktop", "new.desktop"])
+        for path, text in self.files.items():
+            self.assertEqual(self.read(path), text.encode())
+
+    def test_staging_fails(self):
+        failing = fail_on(lambda target, text: target == self.path("c"), real_stage)
+        with mock.patch.object(writer, "stage_file", failing):
+            with self.assertRaises(OSError):
+                write_batch(self.files, self.removals)
+        self.assert_untouched()
+
+    def test_nth_rename_fails(self):
+        for n in range(1, 5):
+            with self.subTest(rename=n):
+                renames = []
+
+                def nth_rename(src, dst):
+                    if src.endswith(".tmp"):
+                        renames.append(dst)
+                    return len(renames) == n and src.endswith(".tmp")
+                with mock.patch.object(writer.os, "replace", fail_on(nth_rename, real_replace)):
+                    with self.assertRaises(OSError):
+                        write_batch(self.files, self.removals)
+                self.assert_untouched()
+
+    def test_removal_fails(self):
+        failing = fail_on(lambda src, dst: src == self.path("gone"), real_replace)
+        with mock.patch.object(writer.os, "replace", failing):
+            with self.assertRaises(OSError):
+                commit(self.files, self.removals, self.dir)
+        self.assert_untouched()
+
+    def test_backup_fails(self):
+        failing = fail_on(lambda src, dst: src == self.path("b"), os.link)
+        with mock.patch.object(writer.os, "link", failing):
+            with self.assertRaises(OSError):
+                write_batch(self.files, self.removals)
+        self.assert_untouched()
+
+    def test_stale_backup_is_replaced(self):
+        with open(self.path("a") + ".bak", "w") as fh:
+            fh.write("left over")
+        write_batch(self.files)
+        self.assertFalse(os.path.exists(self.path("a") + ".bak"))
+
+
+class OverridePathTest(unittest.TestCase):
+
+    def test_unsafe_names(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.symlink("/etc/passwd", os.path.join(tmp, "link.desktop"))
+            for name in ("", ".", "..", "a/b.desktop", "a\\b.desktop", "mimeinfo.cache",
+                         ".hidden.desktop", "link.desktop"):
+                with self.subTest(name=name):
+                    with self.assertRaises(ValueError):
+                        override_path(name, tmp)
+            self.assertEqual(override_path("ok.desktop", tmp), os.path.join(tmp, "ok.desktop"))
+
+
+if __name__ == "__main__":
+    unittest.main()